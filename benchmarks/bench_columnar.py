@@ -0,0 +1,82 @@
+"""
+Peak memory of paginated results kept as a list of dicts (get_all_results) against the columns built page by page
+by ColumnBuilder (get_all_results_table), measured with tracemalloc on synthetic wide pages.
+
+    python -m benchmarks.bench_columnar
+"""
+
+import json
+import time
+import tracemalloc
+
+from src.tools.columnar import ColumnBuilder
+
+PAGES = 200
+PAGE_SIZE = 100
+WIDTH = 40
+COLUMNS = ["id", "name", "risk_score", "monitored_service.id"]
+
+
+def page_payloads():
+    for page in range(PAGES):
+        yield json.dumps(
+            [
+                {
+                    "id": page * PAGE_SIZE + row,
+                    "name": f"finding-{page}-{row}",
+                    "risk_score": row % 100,
+                    "monitored_service": {"id": row % 7, "name": f"ms-{row % 7}"},
+                    **{f"field_{column}": f"value {column} {row}" for column in range(WIDTH)},
+                }
+                for row in range(PAGE_SIZE)
+            ]
+        )
+
+
+def measure(label: str, function):
+    payloads = list(page_payloads())
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(payloads)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} peak {peak / 2**20:8.1f} MiB   {elapsed * 1000:8.1f} ms")
+    return result
+
+
+def list_of_dicts(payloads):
+    results = []
+    for payload in payloads:
+        results.extend(json.loads(payload))
+    return results
+
+
+def columns(use_arrow: bool):
+    def build(payloads):
+        builder = ColumnBuilder(COLUMNS, use_arrow=use_arrow)
+        for payload in payloads:
+            builder.add_page(json.loads(payload))
+        return builder.build("dict" if not use_arrow else "arrow")
+
+    return build
+
+
+def main():
+    print(f"{PAGES} pages of {PAGE_SIZE} results with {WIDTH + 4} fields, keeping {len(COLUMNS)} columns")
+    measure("list of dicts", list_of_dicts)
+    measure("columns (python lists)", columns(use_arrow=False))
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow not installed, skipping the Arrow columns")
+        return
+    # pyarrow imports parts of itself on first use, keep that out of the measurement
+    warm_up = ColumnBuilder(COLUMNS, use_arrow=True)
+    warm_up.add_page([{"id": 1}])
+    warm_up.to_arrow()
+    measure("columns (arrow)", columns(use_arrow=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Memory (tracemalloc) and attribute access cost of PolicyRecord against the plain dicts returned by response.json().
+
+    python -m benchmarks.bench_records
+"""
+
+import json
+import timeit
+import tracemalloc
+
+from src.api.v1.core.policy import PolicyRecord
+
+COUNT = 10_000
+
+
+def policy(policy_id: int) -> dict:
+    return {
+        "id": policy_id,
+        "name": f"omni-test-policy-{policy_id}_IS",
+        "policy_type": "asana",
+        "mode": "blacklist",
+        "role": "monitored_service_config",
+        "issue_handling": "notify",
+        "is_runnable": True,
+        "not_runnable_reason": "",
+        "description": "Comprehensive policy used by the posture tests",
+        "monitored_services": [{"id": 79292, "name": "asana"}],
+        "created": "2025-06-01T10:00:00Z",
+        "modified": "2025-06-02T10:00:00Z",
+        "rule_count": 42,
+        "tags": ["omni-test", "posture"],
+    }
+
+
+def measure_memory(label: str, build) -> None:
+    payload = json.dumps([policy(policy_id) for policy_id in range(COUNT)])
+    tracemalloc.start()
+    items = build(json.loads(payload))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {current / COUNT:8.0f} bytes per policy")
+    return items
+
+
+def main():
+    dicts = measure_memory("dict", lambda items: items)
+    records = measure_memory("record", PolicyRecord.from_results)
+
+    dict_access = timeit.timeit(
+        lambda: [item["is_runnable"] and item["id"] for item in dicts], number=20
+    )
+    record_access = timeit.timeit(
+        lambda: [record.is_runnable and record.id for record in records], number=20
+    )
+    print(
+        f"access    dict {dict_access / 20 / COUNT * 1e9:6.1f} ns   record {record_access / 20 / COUNT * 1e9:6.1f} ns"
+    )
+
+
+if __name__ == "__main__":
+    main()
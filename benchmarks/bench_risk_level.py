@@ -0,0 +1,43 @@
+"""
+Benchmark of RiskLevel.from_scores against calling RiskLevel.from_score per score, on 1M scores.
+
+    python -m benchmarks.bench_risk_level
+"""
+
+import random
+import time
+
+from src.enums import RiskLevel
+
+SIZE = 1_000_000
+
+
+def measure(label: str, function, baseline: float | None = None) -> float:
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    speedup = f"{baseline / elapsed:6.1f}x" if baseline else ""
+    print(f"{label:<40} {elapsed * 1000:9.1f} ms   {speedup}")
+    return elapsed
+
+
+def main():
+    rng = random.Random(0)
+    scores = [rng.choice((None, rng.randint(0, 100))) for _ in range(SIZE)]
+
+    baseline = measure(
+        "from_score per score", lambda: [RiskLevel.from_score(s) for s in scores]
+    )
+    measure("from_scores (list)", lambda: RiskLevel.from_scores(scores), baseline)
+
+    try:
+        import numpy
+    except ImportError:
+        print("numpy not installed, skipping the array benchmark")
+        return
+    array = numpy.array([0 if score is None else score for score in scores])
+    measure("from_scores (numpy int array)", lambda: RiskLevel.from_scores(array), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Import time of the conftest files, measured with `python -X importtime`, against a startup budget.
+
+Only the root and tests/ conftest files are measured, the ones every pytest run loads. Test modules, and the conftest
+files next to them, still import `src.enums`, the client and requests when they are collected, since their markers
+and parametrize ids are built from the enums; collecting them pays for those imports whatever is filtered with `-k`.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 400 --top 15
+
+Exits with 1 when the budget is exceeded or a module that should be imported lazily is loaded at startup.
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict
+
+import definitions
+
+CONFTEST_IMPORT = "import conftest, tests.conftest"
+# Imported by fixtures when a test needs them, never while loading the root and tests/ conftest files
+LAZY_MODULES = ("requests", "dotenv", "src.enums", "src.api.v1.omniapiclient", "src.tenants.config")
+
+
+def import_times(statement: str = CONFTEST_IMPORT) -> Dict[str, int]:
+    """
+    Cumulative import time in microseconds per module imported by `statement` in a fresh interpreter
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=definitions.ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the conftest import time")
+    parser.add_argument("--budget-ms", type=float, default=400, help="Allowed import time of the conftest files")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to show")
+    args = parser.parse_args()
+
+    times = import_times()
+    total_ms = sum(times[module] for module in ("conftest", "tests.conftest") if module in times) / 1000
+    for module, cumulative in sorted(times.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{cumulative / 1000:9.1f} ms  {module}")
+    print(f"conftest import time {total_ms:.1f} ms (budget {args.budget_ms:g} ms)")
+
+    eager = [module for module in LAZY_MODULES if module in times]
+    if eager:
+        print(f"Imported at startup, should be lazy: {', '.join(eager)}")
+    sys.exit(1 if eager or total_ms > args.budget_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
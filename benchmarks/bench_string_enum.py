@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of StringEnum lookups against the previous list based implementation.
+
+    python -m benchmarks.bench_string_enum
+"""
+
+import timeit
+
+from src.enums import KnownIntegrationDomains, ServiceTypes
+
+NUMBER = 100_000
+
+
+def legacy_values(enum_class):
+    # StringEnum.values() before the lookup tables: a new list per call, scanned with the custom __eq__
+    return [x for x in enum_class]
+
+
+def legacy_names(enum_class):
+    return list(enum_class.__members__.keys())
+
+
+def report(label: str, legacy: float, current: float):
+    print(
+        f"{label:<45} legacy {legacy / NUMBER * 1e9:8.0f} ns   current {current / NUMBER * 1e9:8.0f} ns   "
+        f"{legacy / current:6.1f}x"
+    )
+
+
+def main():
+    cases = [
+        (
+            "ServiceTypes: last member in values()",
+            lambda: "zoom" in legacy_values(ServiceTypes),
+            lambda: ServiceTypes.contains("zoom"),
+        ),
+        (
+            "ServiceTypes: unknown value in values()",
+            lambda: "not-a-service" in legacy_values(ServiceTypes),
+            lambda: ServiceTypes.contains("not-a-service"),
+        ),
+        (
+            "ServiceTypes: value to member",
+            lambda: next(x for x in legacy_values(ServiceTypes) if x == "zoom"),
+            lambda: ServiceTypes.from_value("zoom"),
+        ),
+        (
+            "ServiceTypes: names()",
+            lambda: legacy_names(ServiceTypes),
+            lambda: ServiceTypes.names(),
+        ),
+        (
+            "KnownIntegrationDomains: base url check",
+            lambda: "https://coretest.int.appomni.com/"
+            in legacy_values(KnownIntegrationDomains),
+            lambda: KnownIntegrationDomains.contains(
+                "https://coretest.int.appomni.com/"
+            ),
+        ),
+    ]
+    for label, legacy, current in cases:
+        report(
+            label,
+            timeit.timeit(legacy, number=NUMBER),
+            timeit.timeit(current, number=NUMBER),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,25 +5,30 @@ import logging
 import definitions
 import os
 import pytest
+from typing import TYPE_CHECKING
 
-
-from src.api.v1.omniapiclient import OmniAPIClient
-from src.tenants.config import TenantConfig
+# requests, dotenv and src.enums are imported by the fixtures that need them, so that loading the conftest files
+# doesn't pay for them; test modules using them still import them when collected, see benchmarks/bench_startup.py
+if TYPE_CHECKING:
+    from src.api.v1.omniapiclient import OmniAPIClient
+    from src.tenants.config import TenantConfig
+    from src.tools.monitored_service_index import MonitoredServiceIndex
 
 LOGGER = logging.getLogger(__name__)
 
+# Seconds every test may spend on API requests, unless it has its own `deadline` marker
+DEADLINE_ENV_VAR = "OMNI_TEST_DEADLINE"
+
+pytest_plugins = ["src.tools.duration_scheduler", "src.tools.parallel_runner"]
+
 # register assertion rewrites is utilities that need it
 pytest.register_assert_rewrite("src.tools.api_utils")
 
 
 # register assertion rewrites is utilities that need it
 def pytest_sessionstart(session):
-    config = TenantConfig(os.getenv("OMNI_ENV"))
     session.results = dict()
     print(f"Running tests for [{os.getenv('OMNI_ENV')}]")
-    print(f"Config: {config}")
-
-    healthcheck(config)
 
     if not os.path.exists(definitions.LOGS_DIR):
         os.mkdir(definitions.LOGS_DIR)
@@ -37,17 +42,25 @@ def pytest_sessionstart(session):
 
 # Test Fixtures
 @pytest.fixture(scope="session")
-def tenant_config():
-    return TenantConfig(os.getenv("OMNI_ENV"))
+def tenant_config() -> "TenantConfig":
+    from src.tenants.config import get_tenant_config
+
+    config = get_tenant_config(os.getenv("OMNI_ENV"))
+    print(f"Config: {config}")
+    return config
 
 
 @pytest.fixture(scope="session")
-def tenant(tenant_config: TenantConfig) -> OmniAPIClient:
+def tenant(tenant_config: "TenantConfig") -> "OmniAPIClient":
     """
-    OmniConnector Session for the current logged in tenant
+    OmniConnector Session for the current logged in tenant. The healthcheck runs once, when the first test
+    requesting the tenant is set up.
 
     :return: Omni Connector Session for making requests for the current tenant
     """
+    from src.api.v1.omniapiclient import OmniAPIClient
+
+    healthcheck(tenant_config)
 
     api_client = OmniAPIClient(
         tenant_config.base_url, verify_ssl=tenant_config.verify_ssl
@@ -57,10 +70,53 @@ def tenant(tenant_config: TenantConfig) -> OmniAPIClient:
     return api_client
 
 
-def healthcheck(config: TenantConfig):
+@pytest.fixture(scope="session")
+def monitored_service_index() -> "MonitoredServiceIndex":
+    """
+    Monitored services per tenant and service type, swept once per session (or reused from a previous run within
+    OMNI_MS_INDEX_TTL seconds)
+
+    :return: Monitored service index shared by all tests
+    """
+    from src.tools.monitored_service_index import (
+        DEFAULT_TTL,
+        TTL_ENV_VAR,
+        MonitoredServiceIndex,
+    )
+
+    return MonitoredServiceIndex(ttl=float(os.getenv(TTL_ENV_VAR, DEFAULT_TTL)))
+
+
+@pytest.fixture(autouse=True)
+def request_deadline(request: pytest.FixtureRequest):
+    """
+    Per-test budget for API requests, set with `@pytest.mark.deadline(seconds)` or OMNI_TEST_DEADLINE. Requests use
+    only the time left and fail with DeadlineExceeded once it is spent, so a stalled tenant fails the test fast.
+
+    :return: Budget of the test in seconds, None without one
+    """
+    marker = request.node.get_closest_marker("deadline")
+    seconds = marker.args[0] if marker else os.getenv(DEADLINE_ENV_VAR)
+    if not seconds:
+        yield None
+        return
+
+    from src.api.deadline import deadline
+
+    with deadline(float(seconds)):
+        yield float(seconds)
+
+
+def healthcheck(config: "TenantConfig"):
+    from src.api.v1.omniapiclient import OmniAPIClient
+    from src.tools.fanout_runner import HEALTHCHECK_PASSED_ENV_VAR
+
     if not config.verify_ssl:
         print("Skipping healthcheck due to SSL verification being disabled")
         return
+    if os.getenv(HEALTHCHECK_PASSED_ENV_VAR) == config.base_url:
+        print(f"Healthcheck already passed for {config.base_url} in the fan-out runner")
+        return
     api_client = OmniAPIClient(config.base_url, verify_ssl=True)
     # Adding a forward slash after the healthcheck as per comment in KAL-504
     response = api_client.get("healthcheck/", allow_redirects=True)
@@ -0,0 +1,46 @@
+"""
+Query the local test results store written by upload_test_results_to_sheets.py
+e.g. p95 duration of the trigger policy scan tests over the last 30 runs:
+
+    python ./scripts/query_test_history.py "test_trigger_policy_scan_for_*" --last-runs 30 --percentile 95
+"""
+
+import os
+import argparse
+import sys
+
+# Make the repository importable when the script is run as `python ./scripts/query_test_history.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from src.tools.results_store import DEFAULT_STORE_PATH, ResultsStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query durations and outcomes from the local test results store')
+    parser.add_argument('pattern', help='Glob matched against the test name, or the full nodeid if it contains "::"')
+    parser.add_argument('--last-runs', type=int, default=30, help='Number of most recent runs to look at')
+    parser.add_argument('--percentile', type=float, default=95, help='Duration percentile to report')
+    parser.add_argument('--environment', help='Only look at runs of this environment')
+    parser.add_argument('--history-db', default=str(DEFAULT_STORE_PATH), help='Path to the results store')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.history_db):
+        print(f"[ERROR] Results store not found: {args.history_db}")
+        sys.exit(1)
+
+    with ResultsStore(args.history_db) as store:
+        stats = store.duration_stats(args.pattern, args.last_runs, args.percentile, args.environment)
+
+    if not stats:
+        print(f"No results for {args.pattern} in the last {args.last_runs} run(s)")
+        return
+
+    percentile_label = f"p{args.percentile:g}"
+    print(f"{'Runs':>5} {'Pass':>6} {'Mean':>9} {percentile_label:>9} {'Max':>9}  Test")
+    for stat in stats:
+        print(f"{stat.runs:>5} {stat.pass_rate:>5.0f}% {stat.mean:>8.2f}s {stat.percentile:>8.2f}s "
+              f"{stat.maximum:>8.2f}s  {stat.nodeid}")
+
+
+if __name__ == '__main__':
+    main()
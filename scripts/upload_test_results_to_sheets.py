@@ -4,12 +4,21 @@ Reads from pytest-json-report output and creates/updates a Google Sheet
 """
 
 import os
+import glob
 import json
 import argparse
 from datetime import datetime, timezone
 import sys
-from typing import Dict, List, Any
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Any, Optional, TextIO, Tuple
 import base64
+import hashlib
+
+# Make the repository importable when the script is run as `python ./scripts/upload_test_results_to_sheets.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from src.tools.json_cache import load_json_cache, update_json_cache  # noqa: E402
+from src.tools.results_store import DEFAULT_STORE_PATH, ResultsStore  # noqa: E402
 
 try:
     import gspread
@@ -19,6 +28,329 @@ except ImportError:
     sys.exit(1)
 
 
+HEADERS = [
+    'Timestamp', 'Environment', 'Job Name', 'Test Name', 'Total Tests',
+    'Passed', 'Failed', 'Skipped', 'Errors', 'Pass Rate',
+    'Duration', 'Build URL', 'Type', 'Details', 'Full Error',
+    'Stack Trace', 'Logs', 'Error Location'
+]
+
+# Hidden worksheet holding one short key and row count per uploaded run, see UploadIndex
+INDEX_WORKSHEET_NAME = '_upload_index'
+DEFAULT_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'logs', 'sheets_upload_index.json')
+
+# Status codes the Sheets API uses for quota exhaustion and transient backend errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+# Strings longer than this are cut while reading; format_results_for_sheets shows at most 1000 characters + '...'
+TRUNCATE_AT = 1001
+# Top level report keys format_results_for_sheets reads besides `tests`
+REPORT_KEYS = ('created', 'duration', 'exitcode', 'summary')
+REPORTED_OUTCOMES = ('failed', 'error', 'skipped')
+
+
+class StreamingReportParser:
+    """
+    Incremental reader for pytest-json-report files. Top level arrays (`tests`, `collectors`, `warnings`) are
+    decoded one element at a time, so memory is bounded by the largest single element instead of the whole report.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = 1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read(self, size: int) -> bool:
+        """Append up to `size` characters to the buffer, dropping the part that was already consumed"""
+        if self.eof:
+            return False
+        if self.pos > self.chunk_size:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        chunk = self.file.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it, '' at the end of the file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._read(self.chunk_size):
+                return self.buffer[self.pos:self.pos + 1]
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {self._peek()!r}")
+        self.pos += 1
+
+    def _decode(self) -> Any:
+        """Decode the next JSON value, reading more of the file until the value is complete"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow geometrically so re-decoding a large element stays linear
+            self._read(max(self.chunk_size, len(self.buffer) - self.pos))
+
+    def _iter_array(self) -> Iterator[Any]:
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self._decode()
+            if self._peek() == ',':
+                self.pos += 1
+                continue
+            self._expect(']')
+            return
+
+    def items(self) -> Iterator[tuple]:
+        """Yield (key, value) for every top level key; array values are yielded as iterators over their elements"""
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode()
+            self._expect(':')
+            if self._peek() == '[':
+                elements = self._iter_array()
+                yield key, elements
+                # Drain whatever the caller did not consume
+                for _ in elements:
+                    pass
+            else:
+                yield key, self._decode()
+            if self._peek() == ',':
+                self.pos += 1
+                continue
+            self._expect('}')
+            return
+
+
+def _truncate(value: Any) -> Any:
+    return value[:TRUNCATE_AT] if isinstance(value, str) else value
+
+
+def _truncate_longrepr(longrepr: Any, has_crash_message: bool) -> Any:
+    """
+    Cut a longrepr to what the sheet shows. Without a crash message format_results_for_sheets takes the failure
+    message from the first 'E   ' line, so the text is kept at least up to the end of that line.
+    """
+    if not isinstance(longrepr, str) or len(longrepr) <= TRUNCATE_AT:
+        return longrepr
+    keep = TRUNCATE_AT
+    if not has_crash_message:
+        offset = 0
+        for line in longrepr.split('\n'):
+            offset += len(line) + 1
+            if line.strip().startswith('E   '):
+                keep = max(keep, offset - 1)
+                break
+    return longrepr[:keep]
+
+
+def _truncate_entries(entries: List[Dict[str, Any]], fields: tuple) -> List[Dict[str, Any]]:
+    """Keep only `fields` of traceback/log entries, and only as many entries as fit in the sheet cell"""
+    kept = []
+    length = 0
+    for entry in entries:
+        kept.append({field: _truncate(entry.get(field, '')) for field in fields})
+        length += sum(len(str(value)) for value in kept[-1].values())
+        if length > TRUNCATE_AT:
+            break
+    return kept
+
+
+def slim_test_entry(test: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a pytest-json-report test entry to the fields format_results_for_sheets uses. Passing tests keep only
+    their phase durations, which is all the local results store needs.
+    """
+    slim = {'nodeid': test.get('nodeid', ''), 'outcome': test.get('outcome')}
+    reported = test.get('outcome') in REPORTED_OUTCOMES
+    for phase in ('setup', 'call', 'teardown'):
+        if phase not in test:
+            continue
+        phase_info = test[phase]
+        crash = phase_info.get('crash', {})
+        slim_phase = {'duration': phase_info.get('duration', 0)}
+        if not reported:
+            slim[phase] = slim_phase
+            continue
+        if crash:
+            slim_phase['crash'] = {
+                'path': crash.get('path', ''),
+                'lineno': crash.get('lineno', ''),
+                'message': _truncate(crash.get('message', '')),
+            }
+        if 'longrepr' in phase_info:
+            slim_phase['longrepr'] = _truncate_longrepr(phase_info['longrepr'], bool(crash.get('message')))
+        if phase_info.get('traceback'):
+            slim_phase['traceback'] = _truncate_entries(phase_info['traceback'], ('path', 'lineno', 'message'))
+        if phase_info.get('log'):
+            slim_phase['log'] = _truncate_entries(phase_info['log'], ('levelname', 'msg'))
+        slim[phase] = slim_phase
+    return slim
+
+
+class BatchedSheetWriter:
+    """Writes rows to a worksheet in large chunks, retrying quota errors with exponential backoff"""
+
+    def __init__(self, worksheet, chunk_size: int = 500, max_retries: int = 6,
+                 initial_backoff: float = 2.0, sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            worksheet: gspread Worksheet (or anything with the same `acell`/`append_rows` API)
+            chunk_size: Maximum number of rows sent in one append request
+            max_retries: Retries per request before the quota error is raised
+            initial_backoff: Seconds to wait before the first retry, doubled on every further retry
+            sleep: Function used to wait between retries
+        """
+        self.worksheet = worksheet
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.sleep = sleep
+
+    def _call(self, func: Callable, *args, **kwargs):
+        """Call a Sheets API method, backing off on retryable errors"""
+        backoff = self.initial_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                status_code = getattr(getattr(e, 'response', None), 'status_code', None)
+                if status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                    raise
+                print(f"[INFO] Sheets API returned {status_code}, retrying in {backoff:.0f}s")
+                self.sleep(backoff)
+                backoff *= 2
+
+    def has_headers(self) -> bool:
+        """Check the first cell only instead of downloading the whole sheet"""
+        return bool(self._call(self.worksheet.acell, 'A1').value)
+
+    def write(self, data_rows: List[List[str]], headers: Optional[List[str]] = None) -> int:
+        """
+        Append rows in chunks, prefixed by the headers when the sheet is still empty
+
+        Returns:
+            Number of append requests sent
+        """
+        rows = list(data_rows)
+        if headers and not self.has_headers():
+            rows.insert(0, headers)
+
+        requests_sent = 0
+        for start in range(0, len(rows), self.chunk_size):
+            self._call(self.worksheet.append_rows, rows[start:start + self.chunk_size])
+            requests_sent += 1
+        return requests_sent
+
+
+def run_key(row: List[str]) -> str:
+    """Short digest of the (timestamp, environment, job name) columns identifying the run a row belongs to"""
+    return hashlib.sha1('\x1f'.join(row[:3]).encode('utf-8')).hexdigest()[:16]
+
+
+class UploadIndex:
+    """
+    Number of rows already uploaded per run. The rows of a run are always formatted in the same order, so the rows
+    past that number are the new ones. The counts live in a hidden worksheet, one row per upload of a run, so any
+    machine can check them with a single read that grows with the number of runs, not tests. They are mirrored to a
+    local JSON file, which spares the read when it already has every run.
+    """
+
+    def __init__(self, spreadsheet_id: str, index_file: Optional[str] = DEFAULT_INDEX_FILE):
+        """
+        Args:
+            spreadsheet_id: ID of the spreadsheet the results are uploaded to
+            index_file: Local JSON mirror of the index, None to keep the index in the spreadsheet only
+        """
+        self.spreadsheet_id = spreadsheet_id
+        self.index_file = index_file
+        self.uploaded: Dict[str, int] = {}
+
+    def _merge(self, counts: Dict[str, int]):
+        for key, count in counts.items():
+            self.uploaded[key] = max(self.uploaded.get(key, 0), count)
+
+    def load_local(self):
+        """Read the counts of the local mirror"""
+        local = load_json_cache(self.index_file, 'local upload index').get(self.spreadsheet_id, {})
+        if isinstance(local, dict):
+            self._merge(local)
+        return self
+
+    def load(self, http_client):
+        """
+        Read the counts from the hidden worksheet with a single values request, without opening the spreadsheet
+
+        Args:
+            http_client: `gspread.Client.http_client` of an authorized client
+        """
+        try:
+            response = http_client.values_get(self.spreadsheet_id, f"'{INDEX_WORKSHEET_NAME}'!A:B")
+        except gspread.exceptions.APIError as e:
+            # The range can not be parsed until the index worksheet exists
+            if getattr(getattr(e, 'response', None), 'status_code', None) != 400:
+                raise
+            return self
+        self._merge({row[0]: int(row[1]) for row in response.get('values', []) if len(row) > 1})
+        return self
+
+    def new_rows(self, data_rows: List[List[str]]) -> Tuple[List[List[str]], Dict[str, int]]:
+        """
+        Return the rows that have not been uploaded yet, and the row count of every run they belong to once they are
+        """
+        runs: Dict[str, List[List[str]]] = {}
+        for row in data_rows:
+            runs.setdefault(run_key(row), []).append(row)
+        rows = []
+        counts = {}
+        for key, run_rows in runs.items():
+            uploaded = self.uploaded.get(key, 0)
+            if len(run_rows) > uploaded:
+                rows.extend(run_rows[uploaded:])
+                counts[key] = len(run_rows)
+        return rows, counts
+
+    def record(self, spreadsheet, counts: Dict[str, int]):
+        """Add the row counts of freshly uploaded runs to the hidden worksheet and the local mirror"""
+        try:
+            worksheet = spreadsheet.worksheet(INDEX_WORKSHEET_NAME)
+        except gspread.WorksheetNotFound:
+            worksheet = spreadsheet.add_worksheet(title=INDEX_WORKSHEET_NAME, rows=1, cols=2)
+            worksheet.hide()
+        BatchedSheetWriter(worksheet).write([[key, str(count)] for key, count in counts.items()])
+        self._merge(counts)
+
+        def update(local: Dict[str, Any]):
+            spreadsheet_counts = local.get(self.spreadsheet_id)
+            local[self.spreadsheet_id] = {
+                **(spreadsheet_counts if isinstance(spreadsheet_counts, dict) else {}),
+                **counts,
+            }
+
+        update_json_cache(self.index_file, update, 'local upload index')
+
+
 class TestResultsUploader:
     def __init__(self, service_account_key: str, spreadsheet_id: str):
         """
@@ -30,6 +362,7 @@ class TestResultsUploader:
         """
         self.spreadsheet_id = spreadsheet_id
         self.client = self._authenticate(service_account_key)
+        self.spreadsheet = None
 
     def _authenticate(self, service_account_key: str) -> gspread.Client:
         """Authenticate with Google Sheets API"""
@@ -61,17 +394,55 @@ class TestResultsUploader:
             print(f"[ERROR] Authentication failed: {e}")
             sys.exit(1)
 
-    def parse_test_results(self, json_file_path: str) -> Dict[str, Any]:
-        """Parse pytest JSON report"""
+    def _open_spreadsheet(self):
+        """Open the spreadsheet once per uploader, opening it reads the spreadsheet's metadata"""
+        if self.spreadsheet is None:
+            self.spreadsheet = self.client.open_by_key(self.spreadsheet_id)
+        return self.spreadsheet
+
+    @staticmethod
+    def iter_test_results(json_file_path: str, test_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the tests of a pytest JSON report, one slim entry at a time (nodeid, outcome and phase durations,
+        what the results store keeps). Meanwhile `test_data` is filled with the report keys the sheet needs and the
+        non-passing tests only; it is complete once the generator is exhausted. pytest-json-report writes `created`,
+        `duration` and `summary` before `tests`, so they are already in `test_data` when the first test is yielded.
+
+        Args:
+            json_file_path: Path to the pytest-json-report file
+            test_data: Dict receiving the report keys and the non-passing tests under `tests`
+        """
+        test_data.setdefault('tests', [])
         try:
             with open(json_file_path, 'r') as f:
-                data = json.load(f)
-            return data
+                for key, value in StreamingReportParser(f).items():
+                    if key == 'tests':
+                        for test in value:
+                            slim = slim_test_entry(test)
+                            if slim['outcome'] in REPORTED_OUTCOMES:
+                                test_data['tests'].append(slim)
+                            yield slim
+                    elif key in REPORT_KEYS:
+                        test_data[key] = value
         except Exception as e:
             print(f"[ERROR] Parsing test results: {e}")
             sys.exit(1)
 
-    def format_results_for_sheets(self, test_data: Dict[str, Any], 
+    @staticmethod
+    def parse_test_results(json_file_path: str) -> Dict[str, Any]:
+        """
+        Parse pytest JSON report incrementally, keeping only the non-passing tests and the fields the sheet needs
+
+        Args:
+            json_file_path: Path to the pytest-json-report file
+        """
+        test_data: Dict[str, Any] = {'tests': []}
+        for _ in TestResultsUploader.iter_test_results(json_file_path, test_data):
+            pass
+        return test_data
+
+    @staticmethod
+    def format_results_for_sheets(test_data: Dict[str, Any],
                                   environment: str, 
                                   job_name: str,
                                   build_url: str = "") -> List[List[str]]:
@@ -182,50 +553,112 @@ class TestResultsUploader:
 
         return rows
 
-    def upload_to_sheets(self, data_rows: List[List[str]], worksheet_name: str = "Test Results"):
-        """Upload data to Google Sheets"""
+    def upload_to_sheets(self, data_rows: List[List[str]], worksheet_name: str = "Test Results",
+                         index_file: Optional[str] = DEFAULT_INDEX_FILE):
+        """
+        Upload the rows that are not in the upload index yet to Google Sheets. A run already uploaded costs no request
+        when the local mirror of the index has it, one small read otherwise.
+        """
         try:
-            spreadsheet = self.client.open_by_key(self.spreadsheet_id)
+            index = UploadIndex(self.spreadsheet_id, index_file).load_local()
+            new_rows, counts = index.new_rows(data_rows)
+            if new_rows:
+                new_rows, counts = index.load(self.client.http_client).new_rows(data_rows)
+            if not new_rows:
+                print(f"All {len(data_rows)} row(s) were already uploaded, nothing to do")
+                return
+
+            spreadsheet = self._open_spreadsheet()
             try:
                 worksheet = spreadsheet.worksheet(worksheet_name)
             except gspread.WorksheetNotFound:
-                headers = [
-                    'Timestamp', 'Environment', 'Job Name', 'Test Name', 'Total Tests', 
-                    'Passed', 'Failed', 'Skipped', 'Errors', 'Pass Rate', 
-                    'Duration', 'Build URL', 'Type', 'Details', 'Full Error', 
-                    'Stack Trace', 'Logs', 'Error Location'
-                ]
-                worksheet = spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=len(headers))
-                worksheet.append_row(headers)
-
-            if worksheet.row_count == 0 or not worksheet.get_all_values():
-                headers = [
-                    'Timestamp', 'Environment', 'Job Name', 'Test Name', 'Total Tests', 
-                    'Passed', 'Failed', 'Skipped', 'Errors', 'Pass Rate', 
-                    'Duration', 'Build URL', 'Type', 'Details', 'Full Error', 
-                    'Stack Trace', 'Logs', 'Error Location'
-                ]
-                worksheet.append_row(headers)
-
-            for row in data_rows:
-                worksheet.append_row(row)
-
-            print(f"Successfully uploaded {len(data_rows)} row(s) to Google Sheets")
+                worksheet = spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=len(HEADERS))
+
+            requests_sent = BatchedSheetWriter(worksheet).write(new_rows, headers=HEADERS)
+            # Recorded after the rows are written: a failure in between causes duplicates, never lost rows
+            index.record(spreadsheet, counts)
+
+            print(f"Successfully uploaded {len(new_rows)} row(s) to Google Sheets in {requests_sent} request(s), "
+                  f"skipped {len(data_rows) - len(new_rows)} already uploaded row(s)")
 
         except Exception as e:
             print(f"[ERROR] Upload failed: {e}")
             sys.exit(1)
 
 
+def expand_json_files(patterns: List[str]) -> List[str]:
+    """Expand file paths and glob patterns, keeping the given order and dropping duplicates"""
+    json_files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for json_file in matches:
+            if json_file not in json_files:
+                json_files.append(json_file)
+    return json_files
+
+
+def _parse_and_format(json_file: str, environment: str, job_name: str, build_url: str,
+                      history_db: Optional[str]) -> Tuple[List[List[str]], bool]:
+    """
+    Parse one report and format its rows; runs in a worker process. The tests stream from the parser into the
+    results store, so only the non-passing ones stay in memory for the sheet.
+
+    Returns:
+        The rows and whether the run was added to the results store (False without a store)
+    """
+    test_data: Dict[str, Any] = {'tests': []}
+    tests = TestResultsUploader.iter_test_results(json_file, test_data)
+    stored = False
+    if history_db:
+        with ResultsStore(history_db) as store:
+            stored = store.add_run(test_data, environment, job_name, build_url, tests=tests)
+    # Read the rest of the report when the store already had the run, or there is no store
+    for _ in tests:
+        pass
+    return TestResultsUploader.format_results_for_sheets(test_data, environment, job_name, build_url), stored
+
+
+def collect_reports(json_files: List[str], environment: str, job_name: str, build_url: str = "",
+                    max_workers: Optional[int] = None,
+                    history_db: Optional[str] = None) -> List[Tuple[List[List[str]], bool]]:
+    """
+    Parse and format several reports in parallel, writing their runs to the results store `history_db` if given
+
+    Returns:
+        (rows, whether the run was added to the results store) per file in file order
+    """
+    if len(json_files) == 1:
+        return [_parse_and_format(json_files[0], environment, job_name, build_url, history_db)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_parse_and_format, json_file, environment, job_name, build_url, history_db)
+            for json_file in json_files
+        ]
+        return [future.result() for future in futures]
+
+
+def collect_rows(json_files: List[str], environment: str, job_name: str, build_url: str = "",
+                 max_workers: Optional[int] = None) -> List[List[str]]:
+    """Parse and format several reports in parallel and merge their rows in file order"""
+    reports = collect_reports(json_files, environment, job_name, build_url, max_workers)
+    return [row for rows, _ in reports for row in rows]
+
+
 def main():
     parser = argparse.ArgumentParser(description='Upload pytest results to Google Sheets')
-    parser.add_argument('--json-file', required=True, help='Path to pytest JSON report file')
+    parser.add_argument('--json-file', required=True, nargs='+',
+                        help='Paths or glob patterns of pytest JSON report files, e.g. "logs/test_results*.json"')
     parser.add_argument('--service-account-key', help='Path to service account JSON file or base64-encoded string')
     parser.add_argument('--spreadsheet-id', help='Google Sheets spreadsheet ID')
     parser.add_argument('--environment', default='unknown', help='Test environment')
     parser.add_argument('--job-name', default='unknown', help='CI job name')
     parser.add_argument('--build-url', default='', help='Build URL')
     parser.add_argument('--worksheet-name', default='Test Results', help='Worksheet name')
+    parser.add_argument('--index-file', default=DEFAULT_INDEX_FILE,
+                        help='Local mirror of the index of uploaded rows')
+    parser.add_argument('--history-db', default=str(DEFAULT_STORE_PATH),
+                        help='Local SQLite results store the runs are also written to, empty to skip')
 
     args = parser.parse_args()
 
@@ -240,19 +673,30 @@ def main():
         print("[ERROR] No spreadsheet ID provided via --spreadsheet-id or GOOGLE_SHEETS_ID env var")
         sys.exit(1)
 
-    if not os.path.exists(args.json_file):
-        print(f"[ERROR] JSON file not found: {args.json_file}")
-        sys.exit(1)
+    json_files = expand_json_files(args.json_file)
+    if not json_files:
+        print(f"[INFO] No JSON files match {' '.join(args.json_file)}, nothing to upload")
+        return
 
-    uploader = TestResultsUploader(service_account_key, spreadsheet_id)
-    test_data = uploader.parse_test_results(args.json_file)
+    for json_file in json_files:
+        if not os.path.exists(json_file):
+            print(f"[ERROR] JSON file not found: {json_file}")
+            sys.exit(1)
 
-    data_rows = uploader.format_results_for_sheets(
-        test_data, args.environment, args.job_name, args.build_url
-    )
+    print(f"[INFO] Processing {len(json_files)} JSON file(s)")
+    reports = collect_reports(json_files, args.environment, args.job_name, args.build_url,
+                              history_db=args.history_db or None)
+    data_rows = [row for rows, _ in reports for row in rows]
+
+    if args.history_db:
+        new_runs = sum(stored for _, stored in reports)
+        print(f"[INFO] Stored {new_runs} new run(s) in {args.history_db}")
+
+    # Authenticate and open the spreadsheet once, after all files have been formatted
+    uploader = TestResultsUploader(service_account_key, spreadsheet_id)
 
     worksheet_name = args.worksheet_name or datetime.now().strftime('%Y-%m-%d')
-    uploader.upload_to_sheets(data_rows, worksheet_name)
+    uploader.upload_to_sheets(data_rows, worksheet_name, index_file=args.index_file)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,112 @@
 from abc import ABC, abstractmethod
+from string import Formatter
+from typing import Dict, Tuple
+
+
+class EndpointPath(str):
+    """
+    Path (or URL) of an endpoint that remembers the template it was formatted from. `label` is stable across calls,
+    e.g. `api/v1/core/policy/{policy_id}/check_ctp_done/`, so it can be used to group requests per endpoint.
+    `cacheable` is False for endpoints whose answer is polled until it changes, see `EndpointTemplate`.
+    """
+
+    def __new__(cls, path: str, label: str, cacheable: bool = True) -> "EndpointPath":
+        endpoint_path = super().__new__(cls, path)
+        endpoint_path.label = label
+        endpoint_path.cacheable = cacheable
+        return endpoint_path
+
+
+class EndpointURL(EndpointPath):
+    """
+    Endpoint formatted from a template bound to a base_url; OmniAPIClient uses it as is instead of prefixing its base_url
+    """
+
+
+class EndpointTemplate:
+    """
+    Endpoint declared relative to the `base_path` of a BaseAPI subclass, e.g.
+    `check_ctp_done = EndpointTemplate("{policy_id}/check_ctp_done/")`.
+
+    The template is compiled once when the class is created; calling it with the placeholder values, positional or by
+    name, returns an `EndpointPath`: `Policy.check_ctp_done(42)` -> `api/v1/core/policy/42/check_ctp_done/`
+    """
+
+    def __init__(self, template: str, cacheable: bool = True):
+        """
+        :param template: Path relative to `base_path`, placeholders in `str.format` syntax
+        :param cacheable: False for status endpoints that are polled until they change; GETs of them ask caches
+            such as `src.tools.api_proxy` for a fresh answer
+        """
+        self.template = template
+        self.cacheable = cacheable
+        self.name = ""
+        self.label = template.split("?", 1)[0]
+        self.fields: Tuple[str, ...] = ()
+        self.base_url = ""
+        self._positional_template = template
+        self._format = template.format
+        self._path_type = EndpointPath
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def compile(self, base_path: str, name: str = "") -> "EndpointTemplate":
+        """
+        Return a copy formatting `base_path + template`. Named placeholders are rewritten to positional ones so every
+        call is a single `str.format`.
+        """
+        compiled = EndpointTemplate(self.template, self.cacheable)
+        compiled.name = name or self.name
+        path_template = base_path + self.template
+        compiled.label = path_template.split("?", 1)[0]
+
+        fields: Dict[str, int] = {}
+        positional = []
+        for literal, field, format_spec, conversion in Formatter().parse(path_template):
+            positional.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is None:
+                continue
+            index = fields.setdefault(field, len(fields))
+            positional.append(
+                "{"
+                + str(index)
+                + (f"!{conversion}" if conversion else "")
+                + (f":{format_spec}" if format_spec else "")
+                + "}"
+            )
+        compiled.fields = tuple(fields)
+        compiled._positional_template = "".join(positional)
+        compiled._format = compiled._positional_template.format
+        return compiled
+
+    def bind(self, base_url: str) -> "EndpointTemplate":
+        """
+        Return a copy that formats full URLs for `base_url`, see `OmniAPIClient.bind`
+        """
+        bound = EndpointTemplate(self.template, self.cacheable)
+        bound.name = self.name
+        bound.label = self.label
+        bound.fields = self.fields
+        bound.base_url = base_url
+        bound._positional_template = self._positional_template
+        bound._format = (
+            base_url.replace("{", "{{").replace("}", "}}") + self._positional_template
+        ).format
+        bound._path_type = EndpointURL
+        return bound
+
+    def __call__(self, *args, **kwargs) -> EndpointPath:
+        if kwargs:
+            args = (*args, *(kwargs[field] for field in self.fields[len(args) :]))
+        if len(args) != len(self.fields):
+            raise TypeError(
+                f"{self.name or self.label} takes {len(self.fields)} argument(s) {self.fields}, got {len(args)}"
+            )
+        return self._path_type(self._format(*args), self.label, self.cacheable)
+
+    def __repr__(self) -> str:
+        return f"EndpointTemplate({self.base_url}{self.label!r})"
 
 
 class BaseAPI(ABC):
@@ -6,6 +114,22 @@ class BaseAPI(ABC):
     Abstract base class for API functionality.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        """
+        Compile the `EndpointTemplate`s of the class, including inherited ones, against its `base_path`
+        """
+        super().__init_subclass__(**kwargs)
+        base_path = getattr(cls, "base_path", None)
+        if not isinstance(base_path, str):
+            return
+        templates: Dict[str, EndpointTemplate] = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, EndpointTemplate):
+                    templates[name] = value
+        for name, template in templates.items():
+            setattr(cls, name, template.compile(base_path, name))
+
     @property
     @abstractmethod
     def base_path(self) -> str:
@@ -0,0 +1,48 @@
+"""
+Deadline shared by every request made in the current context, e.g. one test. OmniAPIClient caps the timeouts of a
+request to the time left and fails fast once the deadline has passed.
+
+    with deadline(120):
+        tenant.get_all_results(Policy.search())
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+_deadline: ContextVar[float | None] = ContextVar("omni_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised instead of sending a request once the deadline of the context has passed
+    """
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Iterator[None]:
+    """
+    Give the requests in the block at most `seconds` in total. A nested deadline can only shorten the outer one;
+    None leaves the current deadline as it is.
+    """
+    if seconds is None:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """
+    Seconds left before the deadline of the current context, None without a deadline
+    """
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return expires - time.monotonic()
@@ -5,7 +5,7 @@ from urllib.parse import urlencode
 from functools import singledispatch
 
 
-from src.api.base_api import BaseAPI
+from src.api.base_api import BaseAPI, EndpointPath
 
 from src.tools.query_handler import QueryParameterHandler
 
@@ -46,9 +46,9 @@ class SearchableMixin:
         default_params_only: bool = False,
         skip_default_params: bool = False,
         base_path_override: str | None = "",
-    ) -> str:
+    ) -> EndpointPath:
         """
-        Return URL for searching items.
+        Return URL for searching items, labelled with the path without the query string.
 
         :param query_params: Additional query parameters provided by the caller.
         :param base_params: Base parameters for the query.
@@ -86,4 +86,5 @@ class SearchableMixin:
         cls.logger.info(f"\tFinal query string in {cls.__name__}: {query_string}")
 
         # Return the full search URL
-        return f"{cls.base_path}{base_path_override}?{query_string}"
+        path = f"{cls.base_path}{base_path_override}"
+        return EndpointPath(f"{path}?{query_string}", label=path)
@@ -0,0 +1,65 @@
+import json
+from typing import Any, Dict, FrozenSet, Iterable, List
+
+
+class Record:
+    """
+    Compact, `__slots__` based view of an API result. Subclasses declare the fields helpers read as `__slots__`; the
+    other fields are kept as one raw JSON string and only decoded when asked for with `record["field"]`.
+    """
+
+    __slots__ = ("_raw",)
+    _fields: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = set()
+        for klass in cls.__mro__:
+            fields.update(
+                slot for slot in getattr(klass, "__slots__", ()) if slot != "_raw"
+            )
+        cls._fields = frozenset(fields)
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "Record":
+        record = cls.__new__(cls)
+        fields = cls._fields
+        for name in fields:
+            setattr(record, name, item.get(name))
+        rest = {key: value for key, value in item.items() if key not in fields}
+        record._raw = json.dumps(rest, separators=(",", ":")) if rest else ""
+        return record
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict[str, Any]]) -> List["Record"]:
+        """
+        Records of a list of results, e.g. `PolicyRecord.from_results(tenant.get_all_results(Policy.search()))`
+        """
+        return [cls.from_dict(item) for item in results]
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._fields:
+            return getattr(self, name)
+        if not self._raw:
+            raise KeyError(name)
+        return json.loads(self._raw)[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        item = json.loads(self._raw) if self._raw else {}
+        item.update({name: getattr(self, name) for name in self._fields})
+        return item
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Record):
+            return NotImplemented
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in sorted(self._fields))
+        return f"{type(self).__name__}({fields})"
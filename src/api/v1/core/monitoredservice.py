@@ -0,0 +1,9 @@
+from src.api.base_api import BaseAPI, EndpointTemplate
+
+from src.api.mixins.searchable_mixin import SearchableMixin
+
+
+class MonitoredService(BaseAPI, SearchableMixin):
+    base_path = "api/v1/core/monitoredservice/"
+
+    get_single_item_url = EndpointTemplate("{item_id}/")
@@ -1,4 +1,5 @@
-from src.api.base_api import BaseAPI
+from src.api.base_api import BaseAPI, EndpointTemplate
+from src.api.records import Record
 
 from src.api.mixins.searchable_mixin import SearchableMixin
 
@@ -6,27 +7,13 @@ from src.api.mixins.searchable_mixin import SearchableMixin
 class Policy(BaseAPI, SearchableMixin):  # SearchableMixin
     base_path = "api/v1/core/policy/"
 
-    @classmethod
-    def baseline_policy(cls, service_type: str):
-        return (
-            cls.base_path
-            + f"?limit=1&offset=0&baseline_policy_for_tenant=true&policy_type={service_type}"
-        )
-
-    @classmethod
-    def rule_options(cls, policy_id: int):
-        return cls.base_path + f"{policy_id}/new_rule_options/"
-
-    @classmethod
-    def check_ctp_done(cls, policy_id: int):
-        return cls.base_path + f"{policy_id}/check_ctp_done/"
-
-    @classmethod
-    def get_single_item_url(cls, item_id: str | int) -> str:
-        """
-        Return URL for fetching a single item. accepting both string and integer as item_id
-        """
-        return f"{cls.base_path}{item_id}/"
+    baseline_policy = EndpointTemplate(
+        "?limit=1&offset=0&baseline_policy_for_tenant=true&policy_type={service_type}"
+    )
+    rule_options = EndpointTemplate("{policy_id}/new_rule_options/")
+    check_ctp_done = EndpointTemplate("{policy_id}/check_ctp_done/", cacheable=False)
+    # Single item URL, accepting both string and integer as item_id
+    get_single_item_url = EndpointTemplate("{item_id}/")
 
 
 # class PolicyNewPattern(BaseAPI, SingleItemMixin, SearchableMixin):
@@ -36,3 +23,18 @@ class Policy(BaseAPI, SearchableMixin):  # SearchableMixin
 #     """
 
 #     base_path = "api/v1/core/policy/"
+
+
+class PolicyRecord(Record):
+    """
+    Policy result with the fields the policy helpers read, see `Record`
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "policy_type",
+        "mode",
+        "is_runnable",
+        "not_runnable_reason",
+    )
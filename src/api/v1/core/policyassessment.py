@@ -1,10 +1,17 @@
-class PolicyAssessment:
+from src.api.base_api import BaseAPI, EndpointTemplate
+from src.api.records import Record
+
+
+class PolicyAssessment(BaseAPI):
     base_path = "api/v1/core/policyassessment/"
 
-    @classmethod
-    def check_done(cls, assessment_id):
-        return cls.base_path + f"{assessment_id}/check_done/"
+    check_done = EndpointTemplate("{assessment_id}/check_done/", cacheable=False)
+    check_status = EndpointTemplate("check_status/?external_id={external_id}", cacheable=False)
+
+
+class PolicyAssessmentRecord(Record):
+    """
+    Policy assessment result with the fields the policy helpers read, see `Record`
+    """
 
-    @classmethod
-    def check_status(cls, external_id):
-        return cls.base_path + f"check_status/?external_id={external_id}"
+    __slots__ = ("id", "policy", "status", "external_id")
@@ -1,40 +1,269 @@
+import contextvars
 import json
 import logging
+import os
+import queue
+import threading
+import time
 from http import HTTPStatus
-from typing import List
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple, TypeVar
 
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
+
+from src.api.base_api import EndpointPath, EndpointTemplate, EndpointURL
+from src.api.deadline import DeadlineExceeded, remaining
+from src.tools.page_size import (
+    PageSizeTuner,
+    default_page_size_tuner,
+    get_limit,
+    set_limit,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+T = TypeVar("T")
+_DONE = object()
+
+# (connect, read) timeouts in seconds of every request, unless the call passes its own `timeout`
+DEFAULT_TIMEOUT = (10.0, 120.0)
+LOGIN_PATH = "api/v1/core/user/login/"
+DEFAULT_HEADERS = MappingProxyType(
+    {
+        "Accept": "application/json",
+        "Content-Type": "application/json;charset=UTF-8",
+    }
+)
+# Connections kept open per host, enough for the thread pools of the helpers
+POOL_MAXSIZE = 32
+# URL of a local `src.tools.api_proxy` sidecar; when set, requests to the tenant are routed through it
+API_PROXY_ENV_VAR = "OMNI_API_PROXY"
+# Headers telling the proxy which tenant, user and TLS verification a request is for
+UPSTREAM_HEADER = "X-Omni-Upstream"
+USER_HEADER = "X-Omni-User"
+VERIFY_SSL_HEADER = "X-Omni-Verify-SSL"
+# Sent with GETs of endpoints that are polled until their answer changes, so no cache answers them
+NO_CACHE_HEADERS = MappingProxyType({"Cache-Control": "no-cache"})
+# Requests that are safe to send again after logging in again
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# A 403 only means an expired session when the body says so; otherwise it is a real permission error
+AUTH_EXPIRED_MARKERS = ("authentication credentials", "csrf failed", "invalid session", "session expired")
+
+
+def is_auth_expired(response: Response) -> bool:
+    if response.status_code == HTTPStatus.UNAUTHORIZED:
+        return True
+    if response.status_code != HTTPStatus.FORBIDDEN:
+        return False
+    text = response.text.lower()
+    return any(marker in text for marker in AUTH_EXPIRED_MARKERS)
+
+
+def build_result_list_from_responses(responses: Iterable[Response]) -> List[dict]:
+    """
+    Concatenate the `results` of paginated responses fetched by the caller. To paginate a path, prefer
+    `OmniAPIClient.iter_pages`, which yields the results of each page without keeping the responses.
+    """
+    return [result for response in responses for result in response.json()["results"]]
+
 
-def build_result_list_from_responses(responses: List[dict]):
-    results = []
-    for response in responses:
-        # if response.status_code == 200 and "results" in response.json():
-        results.extend(response.json()["results"])
-    return results
+def read_ahead(iterator: Iterator[T], depth: int) -> Iterator[T]:
+    """
+    Iterate over `iterator` in a background thread, keeping up to `depth` items ready while the caller processes the
+    current one. Closing the returned generator early (break, exception) stops the thread. A thread waiting to hand
+    over an item is joined; a thread inside a fetch is not waited for, which could take up to the read timeout of the
+    client: it drops the item, closes `iterator` and ends once the fetch returns.
+    """
+    items: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    # Guards `stop` against a fetch starting while the consumer decides whether to join the thread
+    lock = threading.Lock()
+    fetching = False
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch():
+        nonlocal fetching
+        with lock:
+            if stop.is_set():
+                return _DONE
+            fetching = True
+        try:
+            return next(iterator, _DONE)
+        finally:
+            fetching = False
+
+    def produce():
+        try:
+            for item in iter(fetch, _DONE):
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as e:
+            put((_DONE, e))
+        finally:
+            # The iterator is closed by the thread running it, a generator can't be closed from another thread
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+
+    # Run in a copy of the caller's context so the requests of the thread honour the caller's deadline
+    context = contextvars.copy_context()
+    producer = threading.Thread(
+        target=context.run, args=(produce,), name="omni-read-ahead", daemon=True
+    )
+    producer.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        with lock:
+            stop.set()
+            in_fetch = fetching
+        if not in_fetch:
+            producer.join()
 
 
 class OmniAPIClient:
-    def __init__(self, base_url: str, verify_ssl: bool = True):
+    def __init__(
+        self,
+        base_url: str,
+        verify_ssl: bool = True,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        api_proxy: str | None = None,
+    ):
+        """
+        :param base_url: Base URL of the tenant, e.g. `https://coretest.int.appomni.com/`
+        :param verify_ssl: Verify the TLS certificate of the tenant
+        :param timeout: (connect, read) timeouts in seconds, capped by the deadline of the context, see `src.api.deadline`
+        :param api_proxy: URL of a local `src.tools.api_proxy` to route requests through; by default OMNI_API_PROXY,
+            an empty string sends requests to the tenant directly
+        """
         self.base_url = base_url
+        # The session only provides the connection pool and is shared by all threads. Headers are composed per
+        # request from DEFAULT_HEADERS and the immutable auth headers, which a login swaps in one assignment.
         self.session = Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.verify_ssl = verify_ssl
-        self.session.headers.update(
-            {
-                "Accept": "application/json",
-                "Content-Type": "application/json;charset=UTF-8",
-            }
-        )
+        self.timeout = timeout
+        api_proxy = os.getenv(API_PROXY_ENV_VAR, "") if api_proxy is None else api_proxy
+        self.api_proxy = api_proxy.rstrip("/") + "/" if api_proxy else ""
+        self.auth_headers: Mapping[str, str] = MappingProxyType({})
         self.username = ""
         self.password = ""
+        self._login_lock = threading.Lock()
+        self._bound_endpoints: Dict[EndpointTemplate, EndpointTemplate] = {}
+        # Adjusts `limit` of paginated requests per endpoint, None keeps the limit of the request
+        self.page_size_tuner: PageSizeTuner | None = default_page_size_tuner()
+
+    def bind(self, template: EndpointTemplate) -> EndpointTemplate:
+        """
+        Endpoint template with this client's base_url compiled in, e.g. `tenant.bind(Policy.check_ctp_done)(42)`.
+        The bound template is created once per client and formats URLs that are requested without prefixing again.
+        """
+        bound = self._bound_endpoints.get(template)
+        if bound is None:
+            bound = self._bound_endpoints[template] = template.bind(self.base_url)
+        return bound
+
+    def _url(self, path: str) -> str:
+        if isinstance(path, EndpointURL):
+            return path
+        return self.base_url + path
+
+    def _timeout(self, timeout=None) -> Tuple[float, float] | float:
+        """
+        Timeout of the next request: the call's own timeout or the client's, capped by the time left to the deadline
+        """
+        timeout = self.timeout if timeout is None else timeout
+        left = remaining()
+        if left is None:
+            return timeout
+        if left <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded by {-left:.1f}s")
+        if isinstance(timeout, tuple):
+            return tuple(min(part, left) for part in timeout)
+        return min(timeout, left)
+
+    def _request(self, method: str, url: str, **kwargs) -> Response:
+        """
+        Send a request with the client's TLS verification and timeouts; every client call goes through here.
+        When the session expired the client logs in again, and idempotent requests are replayed once.
+        """
+        kwargs["timeout"] = self._timeout(kwargs.get("timeout"))
+        kwargs.setdefault("verify", self.verify_ssl)
+        extra_headers = kwargs.pop("headers", None) or {}
+        auth_headers = self.auth_headers
+        kwargs["headers"] = {**DEFAULT_HEADERS, **auth_headers, **extra_headers}
+        url = self._route(url, kwargs["headers"])
+        response = self.session.request(method, url, **kwargs)
+        if (
+            not self.username
+            or url.endswith(LOGIN_PATH)
+            or not is_auth_expired(response)
+        ):
+            return response
+
+        logger.warning(f"{method} {url} returned {response.status_code}, the session of {self.username} expired")
+        if not self._reauthenticate(auth_headers.get("Authorization")):
+            return response
+        if method.upper() not in IDEMPOTENT_METHODS:
+            # Sending a POST/PATCH again could apply it twice; later requests use the new session
+            return response
+        kwargs["timeout"] = self._timeout(kwargs.get("timeout"))
+        kwargs["headers"] = {**DEFAULT_HEADERS, **self.auth_headers, **extra_headers}
+        self._route(url, kwargs["headers"])
+        return self.session.request(method, url, **kwargs)
+
+    def _route(self, url: str, headers: Dict[str, str]) -> str:
+        """
+        URL to send a request to; with an API proxy, URLs of the tenant are sent to the proxy and `headers` get the
+        tenant and user the proxy should use. The proxy owns the tenant session, so the auth headers are not used.
+        """
+        if not self.api_proxy:
+            return url
+        if url.startswith(self.base_url):
+            url = self.api_proxy + url[len(self.base_url) :]
+        if url.startswith(self.api_proxy):
+            headers[UPSTREAM_HEADER] = self.base_url
+            headers[USER_HEADER] = self.username
+            headers[VERIFY_SSL_HEADER] = "1" if self.verify_ssl else "0"
+        return url
+
+    def _reauthenticate(self, expired_authorization: str | None) -> bool:
+        """
+        Log in again with the stored credentials. Threads hitting the same expired session wait for one login.
+
+        :param expired_authorization: Authorization header the failed request was sent with
+        :return: True if the session was renewed, by this thread or another one meanwhile
+        """
+        with self._login_lock:
+            if self.auth_headers.get("Authorization") != expired_authorization:
+                return True
+            return self.user_login(self.username, self.password).status_code == HTTPStatus.OK
 
     def get(self, path: str, **kwargs) -> Response:
-        url = self.base_url + path
+        url = self._url(path)
+        if not getattr(path, "cacheable", True):
+            kwargs["headers"] = {**NO_CACHE_HEADERS, **(kwargs.get("headers") or {})}
         logger.debug(f"GET {url} {kwargs}")
-        return self.session.get(url, verify=self.verify_ssl, **kwargs)
+        return self._request("GET", url, **kwargs)
 
     def get_uri(self, uri: str) -> Response:
         """
@@ -42,55 +271,154 @@ class OmniAPIClient:
         response.
         """
         logger.debug(f"GET {uri}")
-        return self.session.get(uri, verify=self.verify_ssl)
+        return self._request("GET", uri)
 
-    def get_all_results(self, path: str, page_limit: int = -1, **kwargs) -> List[dict]:
+    def iter_pages(
+        self, path: str, page_limit: int = -1, prefetch: int = 0, **kwargs
+    ) -> Iterator[List[dict]]:
         """
-        Paginates over the results of a GET request and returns a List with all the responses.
+        Paginates over the results of a GET request, yielding the results of one page at a time so callers can
+        process large results without holding every page.
+
+        :param path: Path of the GET request
+        :param page_limit: Maximum number of pages, -1 for all
+        :param prefetch: Number of pages fetched ahead in a background thread while the caller processes the current
+            page, 0 fetches a page only when it is asked for
         """
-        responses = []
-        endpoint_response = self.get(path, **kwargs)
-        responses.append(endpoint_response)
-        page_limit -= 1
-        while "next" in endpoint_response.json().keys() and page_limit:
-            next_url = endpoint_response.json()["next"]
-            if next_url is None or len(endpoint_response.json()["results"]) == 0:
-                break
-            logger.debug(f"GET {next_url}")
-            # using session get() method here because the baseurl is included in the response
-            endpoint_response = self.session.get(
-                next_url,
-                verify=self.verify_ssl,
+        pages = self._fetch_pages(path, page_limit, **kwargs)
+        if prefetch > 0:
+            return read_ahead(pages, prefetch)
+        return pages
+
+    def _fetch_pages(self, path: str, page_limit: int, **kwargs) -> Iterator[List[dict]]:
+        # Page sizes are only tuned for full crawls, a caller passing page_limit expects pages of the size it asked for
+        tuner = self.page_size_tuner if page_limit < 0 else None
+        label = getattr(path, "label", path.split("?", 1)[0])
+        # The label of a plain path may hold IDs, remembering its size between runs would grow the file without bound
+        persist = isinstance(path, EndpointPath)
+        limit = get_limit(path) if tuner else None
+        if limit:
+            limit = tuner.limit_for(label, limit)
+            limited_path = set_limit(path, limit)
+            path = (
+                type(path)(limited_path, path.label, path.cacheable)
+                if isinstance(path, EndpointPath)
+                else limited_path
             )
-            responses.append(endpoint_response)
+        try:
+            started = time.perf_counter()
+            endpoint_response = self.get(path, **kwargs)
+            page = endpoint_response.json()
+            if limit:
+                limit = self._observe_page(tuner, label, persist, limit, endpoint_response, page, started)
+            yield page["results"]
             page_limit -= 1
-        return build_result_list_from_responses(responses)
+            while "next" in page.keys() and page_limit:
+                next_url = page["next"]
+                if next_url is None or len(page["results"]) == 0:
+                    break
+                if limit:
+                    next_url = set_limit(next_url, limit)
+                started = time.perf_counter()
+                # using get_uri() here because the baseurl is included in the response
+                endpoint_response = self.get_uri(next_url)
+                page = endpoint_response.json()
+                if limit:
+                    limit = self._observe_page(tuner, label, persist, limit, endpoint_response, page, started)
+                yield page["results"]
+                page_limit -= 1
+        finally:
+            if tuner:
+                tuner.save()
+
+    @staticmethod
+    def _observe_page(
+        tuner: PageSizeTuner,
+        label: str,
+        persist: bool,
+        limit: int,
+        response: Response,
+        page: dict,
+        started: float,
+    ) -> int:
+        return tuner.observe(
+            label,
+            limit,
+            returned=len(page.get("results") or []),
+            seconds=time.perf_counter() - started,
+            payload_bytes=len(response.content),
+            has_next=bool(page.get("next")),
+            persist=persist,
+        )
+
+    def get_all_results(self, path: str, page_limit: int = -1, **kwargs) -> List[dict]:
+        """
+        Paginates over the results of a GET request and returns a List with all the responses.
+        """
+        results = []
+        for page in self.iter_pages(path, page_limit, **kwargs):
+            results.extend(page)
+        return results
+
+    def get_all_results_table(
+        self,
+        path: str,
+        columns: List[str] | None = None,
+        output: str = "pandas",
+        page_limit: int = -1,
+        prefetch: int = 1,
+        **kwargs,
+    ):
+        """
+        Paginates like `get_all_results` but builds typed columns page by page, see `src.tools.columnar`
+
+        :param path: Path of the GET request
+        :param columns: Fields to keep, dotted names for nested fields; None keeps all fields of the first result
+        :param output: 'pandas' for a DataFrame, 'arrow' for a pyarrow Table or 'dict' for column lists
+        :param page_limit: Maximum number of pages, -1 for all
+        :param prefetch: Pages fetched ahead while a page is converted, see `iter_pages`
+        :return: DataFrame, Table or dict of columns
+        """
+        from src.tools.columnar import ColumnBuilder
+
+        builder = ColumnBuilder(columns)
+        for page in self.iter_pages(path, page_limit, prefetch, **kwargs):
+            builder.add_page(page)
+        return builder.build(output)
+
+    def request(self, method: str, url: str, **kwargs) -> Response:
+        """
+        Send a request of any method to a full URL, with the client's auth headers, timeouts and session renewal
+        """
+        logger.debug(f"{method} {url} {kwargs}")
+        return self._request(method, url, **kwargs)
 
     def post(self, path: str, data=None, json=None, **kwargs):
-        url = self.base_url + path
+        url = self._url(path)
         logger.debug(f"POST {url} data:{data} json:{json}")
-        return self.session.post(url, data, json, verify=self.verify_ssl, **kwargs)
+        return self._request("POST", url, data=data, json=json, **kwargs)
 
     def put(self, path: str, data=None, **kwargs) -> Response:
-        url = self.base_url + path
+        url = self._url(path)
         logger.debug(f"PUT {url} data:{data} {kwargs}")
-        return self.session.put(url, data, verify=self.verify_ssl, **kwargs)
+        return self._request("PUT", url, data=data, **kwargs)
 
     def delete(self, path: str, **kwargs) -> Response:
-        url = self.base_url + path
+        url = self._url(path)
         logger.debug(f"DELETE {url} {kwargs}")
-        return self.session.delete(url, verify=self.verify_ssl, **kwargs)
+        return self._request("DELETE", url, **kwargs)
 
     def patch(self, path, data=None, **kwargs) -> Response:
-        url = self.base_url + path
+        url = self._url(path)
         logger.debug(f"PATCH {url} data:{data} {kwargs}")
-        return self.session.patch(url, data, verify=self.verify_ssl, **kwargs)
+        return self._request("PATCH", url, data=data, **kwargs)
 
     def user_login(self, username, password) -> Response:
         data = json.dumps({"username": username, "password": password})
-        resp = self.post("api/v1/core/user/login/", data=data)
+        resp = self.post(LOGIN_PATH, data=data)
         if resp.status_code == HTTPStatus.OK:
-            self.session.headers.update(
+            # A new mapping, requests in flight keep the headers they were composed with
+            self.auth_headers = MappingProxyType(
                 {
                     "x-csrftoken": resp.json()["csrf"],
                     "Cookie": f"csrftoken={resp.json()['csrf']}; sessionid={resp.json()['session']['id']}",
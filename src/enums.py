@@ -1,21 +1,60 @@
-from enum import Enum
-from typing import List, Any, Literal
+from enum import Enum, EnumMeta
+from typing import Any, Dict, Iterable, List, Literal, Tuple
 
 
-class StringEnum(str, Enum):
+class StringEnumMeta(EnumMeta):
+    """
+    Precomputes the lookup tables of a StringEnum once, when the class is created
+    """
+
+    def __new__(metacls, cls, bases, classdict, **kwargs):
+        enum_class = super().__new__(metacls, cls, bases, classdict, **kwargs)
+        members = tuple(enum_class)
+        enum_class._member_values = members
+        enum_class._member_names = tuple(enum_class.__members__.keys())
+        # Keyed by str(value), matching the comparison done by StringEnum.__eq__
+        enum_class._members_by_value = {str(member.value): member for member in members}
+        return enum_class
+
+
+class StringEnum(str, Enum, metaclass=StringEnumMeta):
+    _member_values: Tuple["StringEnum", ...]
+    _member_names: Tuple[str, ...]
+    _members_by_value: Dict[str, "StringEnum"]
+
     @classmethod
     def names(cls) -> List[str]:
         """
         Return names for all values - for comparing names between matched enums
         """
-        return list(cls.__members__.keys())
+        return list(cls._member_names)
 
     @classmethod
     def values(cls) -> List[str]:
         """
-        Return values for all members - for testing validity without exception
+        Return values for all members - for testing validity without exception.
+        Prefer `contains` for membership checks.
+        """
+        return list(cls._member_values)
+
+    @classmethod
+    def contains(cls, value: Any) -> bool:
+        """
+        O(1) equivalent of `value in cls.values()`
         """
-        return [x for x in cls]
+        return str(value) in cls._members_by_value
+
+    @classmethod
+    def from_value(cls, value: Any) -> "StringEnum":
+        """
+        O(1) lookup of the member whose value equals `value`
+
+        :raises ValueError: if no member has that value
+        """
+        try:
+            return cls._members_by_value[str(value)]
+        except KeyError:
+            raise ValueError(f"{value!r} is not a valid {cls.__name__}") from None
 
     def __eq__(self, other: Any) -> bool:
         """
@@ -483,3 +522,56 @@ class RiskLevel(Enum):
         if 51 <= score <= 75:
             return cls.high
         return cls.critical
+
+    @classmethod
+    def from_scores(cls, scores: Iterable[int | None]) -> List["RiskLevel"]:
+        """
+        Bulk version of `from_score` for many findings/insights at once. Sequences go through a precomputed
+        score -> level table; NumPy arrays are classified with `numpy.searchsorted` when NumPy is installed.
+
+        :param scores: Sequence (or NumPy array) of scores, None is treated as informational
+        :return: RiskLevel per score, in input order
+        """
+        if type(scores).__module__ == "numpy":
+            return _risk_levels_from_array(scores)
+        levels = _RISK_LEVEL_BY_SCORE
+        from_score = cls.from_score
+        # Scores outside the table (e.g. 25.5 or 150) keep the exact semantics of from_score
+        return [levels.get(score) or from_score(score) for score in scores]
+
+
+# Every score from_score can see in practice, mapped once. Equal floats (e.g. 25.0) hash like their int.
+_RISK_LEVEL_BY_SCORE: Dict[Any, RiskLevel] = {
+    None: RiskLevel.informational,
+    **{score: RiskLevel.from_score(score) for score in range(101)},
+}
+# Bands of from_score as (lowest, highest) score. numpy.searchsorted(side="right") on the lowest scores picks the
+# band a score may fall in; scores above that band's highest (76+, NaN, or fractions such as 25.5) are critical.
+_RISK_SCORE_BANDS = (
+    (0, 0, RiskLevel.informational),
+    (1, 25, RiskLevel.low),
+    (26, 50, RiskLevel.medium),
+    (51, 75, RiskLevel.high),
+)
+
+
+def _risk_levels_from_array(scores) -> List[RiskLevel]:
+    import numpy
+
+    scores = numpy.asarray(scores)
+    missing = None
+    if scores.dtype == object:
+        missing = numpy.equal(scores, None)
+        scores = numpy.where(missing, 0, scores).astype(float)
+    lowest = numpy.array([band[0] for band in _RISK_SCORE_BANDS])
+    # Index 0 is "below every band", so the highest score allowed there is -inf
+    highest = numpy.array([-numpy.inf, *[band[1] for band in _RISK_SCORE_BANDS]])
+    levels = numpy.array(
+        [RiskLevel.critical, *[band[2] for band in _RISK_SCORE_BANDS], RiskLevel.critical],
+        dtype=object,
+    )
+    indexes = numpy.searchsorted(lowest, scores, side="right")
+    indexes[~(scores <= highest[indexes])] = len(levels) - 1
+    if missing is not None:
+        indexes[missing] = 1
+    return levels[indexes].tolist()
@@ -1,6 +1,10 @@
 import os
 import ast
-from dotenv import load_dotenv
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from dotenv import dotenv_values
 from src.enums import KnownIntegrationDomains, KnownProductionDomains
 
 import definitions
@@ -9,59 +13,209 @@ import definitions
 Used to store connection configuration for different AO Tenants
 """
 
+TRUE_VALUES = {"true", "1", "yes", "on"}
+FALSE_VALUES = {"false", "0", "no", "off"}
+
+
+def parse_bool(value: str, name: str) -> bool:
+    """
+    Parse a boolean setting without eval; e.g. VERIFY_SSL=True, CircleCI passes values as strings.
+    """
+    normalized = value.strip().lower()
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    raise ValueError(f"{name} must be a boolean (True/False), got {value!r}")
+
+
+def parse_monitored_services(value: str | None) -> Mapping[str, Any]:
+    """
+    Parse PREFERRED_MONITORED_SERVICES, a python dict literal, into a read-only mapping
+    """
+    if not value:
+        return MappingProxyType({})
+    parsed = ast.literal_eval(value)
+    if not isinstance(parsed, dict):
+        raise ValueError(
+            f"PREFERRED_MONITORED_SERVICES must be a dict, got {type(parsed).__name__}"
+        )
+    return MappingProxyType(parsed)
+
+
+@lru_cache(maxsize=None)
+def read_env_file(environment: str, config_path: str) -> Mapping[str, str]:
+    """
+    Read `.env.<environment>` once per process. The values are returned, os.environ is left untouched.
+
+    :param environment: Name of the environment, e.g. 'INT-SMOKE'
+    :param config_path: Directory containing the .env files
+    :return: Read-only mapping of the variables in the file
+    """
+    env_path = os.path.join(config_path, f".env.{environment}")
+    if not os.path.exists(env_path):
+        raise FileNotFoundError(
+            f"No configuration file found for the specified environment: {env_path}"
+        )
+    return MappingProxyType(
+        {key: value for key, value in dotenv_values(env_path).items() if value is not None}
+    )
+
+
+def get_setting(
+    name: str,
+    environment: str | None = None,
+    config_path=definitions.CONFIG_DIR,
+    default: str | None = None,
+) -> str | None:
+    """
+    Look up a variable the way TenantConfig does: variables set in the process environment win over the
+    `.env.<environment>` file (like load_dotenv without override).
+
+    :param name: Variable name, e.g. 'INT_CORE_PW'
+    :param environment: Environment whose .env file is consulted, None for the process environment only
+    :param config_path: Directory containing the .env files
+    :param default: Returned when the variable is set nowhere
+    """
+    if name in os.environ:
+        return os.environ[name]
+    if environment:
+        return read_env_file(environment, str(config_path)).get(name, default)
+    return default
+
 
 class TenantConfig:
+    """
+    Immutable connection configuration of one tenant. Use `get_tenant_config` to share one instance per environment,
+    and `replace` to derive a config for another tenant.
+    """
+
+    __slots__ = (
+        "environment",
+        "base_url",
+        "username",
+        "password",
+        "admin_email",
+        "org_key",
+        "preferred_monitored_services",
+        "verify_ssl",
+    )
+
     def __init__(self, environment=None, config_path=definitions.CONFIG_DIR) -> None:
         """
         Initialize TenantConfig with the name of the environment and optional path to the configuration directory.
 
         :param environment: Name of the environment (e.g., 'integration.coretest', 'production.coretest'). The naming convention is
-        'environment_name.tenant_name'. If environment is not specified, the .env file will be loaded, and it's assumed the necessary
-        environment variables are already set.
+        'environment_name.tenant_name'. If environment is not specified, it's assumed the necessary environment variables are
+        already set.
         :param config_path: Path to the directory containing .env files. Defaults to 'config'.
         """
-        if environment:
-            # Construct the path to the specific .env file based on the environment name
-            env_file_name = f".env.{environment}"
-            env_path = os.path.join(config_path, env_file_name)
-            self.environment = environment
-            # Load the .env file if it exists
-            if os.path.exists(env_path):
-                load_dotenv(dotenv_path=env_path)
-            else:
-                raise FileNotFoundError(
-                    f"No configuration file found for the specified environment: {env_path}"
-                )
-        # Required environment variables
-        self.base_url = self._load_env_var("AO_BASE_URL")
-        self.username = self._load_env_var("AO_USERNAME")
-        self.password = self._load_env_var("AO_PASSWORD")
-        # Optional environment variables
-        self.admin_email = os.getenv("ADMIN_EMAIL")
-        self.org_key = os.getenv("ORG_KEY")
-        self.preferred_monitored_services = ast.literal_eval(
-            os.getenv("PREFERRED_MONITORED_SERVICES")
+
+        def setting(name: str, default: str | None = None) -> str | None:
+            return get_setting(name, environment, config_path, default)
+
+        def required(name: str) -> str:
+            value = setting(name)
+            if not value:
+                raise ValueError(f"Environment variable {name} not set")
+            return value
+
+        self._init(
+            environment=environment,
+            # Required environment variables
+            base_url=required("AO_BASE_URL"),
+            username=required("AO_USERNAME"),
+            password=required("AO_PASSWORD"),
+            # Optional environment variables
+            admin_email=setting("ADMIN_EMAIL"),
+            org_key=setting("ORG_KEY"),
+            preferred_monitored_services=parse_monitored_services(
+                setting("PREFERRED_MONITORED_SERVICES")
+            ),
+            verify_ssl=parse_bool(setting("VERIFY_SSL", "True"), "VERIFY_SSL"),
+        )
+
+    def _init(self, **values) -> None:
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    @classmethod
+    def from_values(
+        cls,
+        base_url: str,
+        username: str,
+        password: str,
+        admin_email: str | None = None,
+        org_key: str | None = None,
+        preferred_monitored_services: Mapping[str, Any] | None = None,
+        verify_ssl: bool = True,
+        environment: str | None = None,
+    ) -> "TenantConfig":
+        """
+        Build a config from explicit values instead of environment variables
+        """
+        config = cls.__new__(cls)
+        config._init(
+            environment=environment,
+            base_url=base_url,
+            username=username,
+            password=password,
+            admin_email=admin_email,
+            org_key=org_key,
+            preferred_monitored_services=MappingProxyType(
+                dict(preferred_monitored_services or {})
+            ),
+            verify_ssl=verify_ssl,
         )
-        # True must be a string so eval does not fail. Circle CI passes value as a string.
-        self.verify_ssl = eval(os.getenv("VERIFY_SSL", "True"))
+        return config
+
+    def replace(self, **changes) -> "TenantConfig":
+        """
+        Return a copy with some values changed; e.g. another tenant in the same environment
+        """
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return self.from_values(**values)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(
+            f"TenantConfig is immutable, use replace() to change {name}"
+        )
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("TenantConfig is immutable")
 
     def __str__(self) -> str:
-        return f"TenantConfig(base_url:{self.base_url}, username:{self.username}, password:********, admin_email:{self.admin_email}, org_key:{self.org_key}, preferred_monitored_services:{self.preferred_monitored_services}, verify_ssl:{self.verify_ssl})"
+        return f"TenantConfig(base_url:{self.base_url}, username:{self.username}, password:********, admin_email:{self.admin_email}, org_key:{self.org_key}, preferred_monitored_services:{dict(self.preferred_monitored_services)}, verify_ssl:{self.verify_ssl})"
 
     def get_name_of_integration_environment(self) -> str:
-        if self.base_url in KnownIntegrationDomains.values():
+        if KnownIntegrationDomains.contains(self.base_url):
             return self.base_url.split("//")[1].split(".")[0]
         else:
             return ""
 
     def get_name_of_production_environment(self) -> str:
-        if self.base_url in KnownProductionDomains.values():
+        if KnownProductionDomains.contains(self.base_url):
             return self.base_url.split("//")[1].split(".")[0]
         else:
             return ""
 
-    def _load_env_var(self, env_var_name: str) -> str:
-        env_var = os.environ.get(env_var_name, None)
-        if not env_var:
-            raise ValueError(f"Environment variable {env_var_name} not set")
-        return env_var
+
+@lru_cache(maxsize=None)
+def _cached_tenant_config(environment: str, config_path: str) -> TenantConfig:
+    return TenantConfig(environment, config_path)
+
+
+def get_tenant_config(
+    environment: str | None = None, config_path=definitions.CONFIG_DIR
+) -> TenantConfig:
+    """
+    Shared TenantConfig of an environment; the .env file is parsed and validated once per process.
+    Without an environment the config is read from the process environment on every call.
+
+    :param environment: Name of the environment, e.g. os.getenv("OMNI_ENV")
+    :param config_path: Directory containing the .env files
+    """
+    if not environment:
+        return TenantConfig()
+    return _cached_tenant_config(environment, str(config_path))
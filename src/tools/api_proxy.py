@@ -0,0 +1,411 @@
+"""
+Local proxy sidecar shared by the test workers of a run. Every worker's `OmniAPIClient` sends its requests to the
+proxy, which talks to the tenants with one client per tenant and user: a pool of keep-alive connections, a single
+login, identical concurrent GETs sent once (single-flight) and GET responses cached for a few seconds. A POST, PUT,
+PATCH or DELETE to a tenant empties the cache of that tenant, so a worker reads what another one just wrote. GETs sent with
+`Cache-Control: no-cache`, like those of the status endpoints polled until they change, bypass the cache.
+
+The proxy holds the tenant sessions of everyone it logs in, so it only listens on 127.0.0.1 by default.
+
+Usage:
+    python -m src.tools.api_proxy --port 8765
+    OMNI_API_PROXY=http://127.0.0.1:8765 pytest --workers 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+from requests import Response
+
+from src.api.v1.omniapiclient import (
+    API_PROXY_ENV_VAR,
+    LOGIN_PATH,
+    UPSTREAM_HEADER,
+    USER_HEADER,
+    VERIFY_SSL_HEADER,
+    OmniAPIClient,
+    is_auth_expired,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CACHE_TTL_ENV_VAR = "OMNI_API_PROXY_CACHE_TTL"
+# Seconds a GET response is served from the cache, 0 disables the cache
+DEFAULT_CACHE_TTL = 2.0
+CACHE_MAX_ENTRIES = 2048
+CACHE_MAX_BYTES = 5 * 2**20
+# Response header telling how the proxy answered: miss, hit (cache), shared (joined an identical request) or pass
+CACHE_STATUS_HEADER = "X-Omni-Proxy"
+MISS = "miss"
+HIT = "hit"
+SHARED = "shared"
+PASS = "pass"
+# Methods that may change what a GET returns; HEAD and OPTIONS are passed through without emptying the cache
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Request headers the proxy replaces with those of its own session, or that only concern the hop to the proxy
+DROPPED_REQUEST_HEADERS = {
+    "authorization",
+    "cookie",
+    "x-csrftoken",
+    "referer",
+    "host",
+    "connection",
+    "keep-alive",
+    "content-length",
+    "transfer-encoding",
+    "accept-encoding",
+    UPSTREAM_HEADER.lower(),
+    USER_HEADER.lower(),
+    VERIFY_SSL_HEADER.lower(),
+}
+# requests already decoded the body and the proxy owns the cookies of the tenant session
+DROPPED_RESPONSE_HEADERS = {
+    "connection",
+    "keep-alive",
+    "content-length",
+    "content-encoding",
+    "transfer-encoding",
+    "set-cookie",
+}
+
+
+@dataclass(frozen=True)
+class ProxiedResponse:
+    status: int
+    headers: Tuple[Tuple[str, str], ...]
+    body: bytes
+
+    @classmethod
+    def from_response(cls, response: Response) -> "ProxiedResponse":
+        return cls(
+            response.status_code,
+            tuple(
+                (name, value)
+                for name, value in response.headers.items()
+                if name.lower() not in DROPPED_RESPONSE_HEADERS
+            ),
+            response.content,
+        )
+
+    @classmethod
+    def error(cls, status: int, detail: str) -> "ProxiedResponse":
+        return cls(
+            status,
+            (("Content-Type", "application/json"),),
+            json.dumps({"detail": detail}).encode(),
+        )
+
+
+class SingleFlight:
+    """
+    Runs a call once for concurrent callers with the same key; the callers arriving while it runs get its result
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[tuple, Future] = {}
+
+    def do(self, key: tuple, call: Callable[[], ProxiedResponse]) -> Tuple[ProxiedResponse, bool]:
+        """
+        :return: The result and whether it was shared with a call already running
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            future.set_result(call())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result(), False
+
+
+class ResponseCache:
+    """
+    GET responses per tenant for `ttl` seconds. A write to a tenant bumps its generation, which drops its entries
+    and keeps responses fetched before the write from being cached after it.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, Tuple[float, ProxiedResponse]] = {}
+        self._generations: Dict[str, int] = {}
+
+    def generation(self, upstream: str) -> int:
+        with self._lock:
+            return self._generations.get(upstream, 0)
+
+    def get(self, key: tuple) -> ProxiedResponse | None:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, response = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            return response
+
+    def put(self, key: tuple, upstream: str, generation: int, response: ProxiedResponse) -> None:
+        """
+        Cache a successful response fetched during `generation` of the tenant `upstream`
+        """
+        if (
+            self.ttl <= 0
+            or response.status != HTTPStatus.OK
+            or len(response.body) > CACHE_MAX_BYTES
+        ):
+            return
+        with self._lock:
+            if self._generations.get(upstream, 0) != generation:
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            while len(self._entries) > self.max_entries:
+                # Entries are kept in insertion order, the first one expires first
+                del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, upstream: str) -> None:
+        with self._lock:
+            self._generations[upstream] = self._generations.get(upstream, 0) + 1
+            for key in [key for key in self._entries if key[0] == upstream]:
+                del self._entries[key]
+
+
+class TenantSession:
+    """
+    Client of one tenant and user shared by all workers, with the login response handed to every worker logging in
+    """
+
+    def __init__(self, upstream: str, verify_ssl: bool):
+        # The proxy talks to the tenant itself, never through another proxy
+        self.client = OmniAPIClient(upstream, verify_ssl=verify_ssl, api_proxy="")
+        self.login_response: ProxiedResponse | None = None
+        self.lock = threading.Lock()
+
+    def login(self, username: str, password: str) -> Tuple[ProxiedResponse, bool]:
+        """
+        Log in unless the session already is with these credentials and no request found it expired since. A worker
+        logging in again after an expired session (`OmniAPIClient._reauthenticate`) gets a new upstream login.
+
+        :return: The login response and whether it is the one of an earlier login
+        """
+        with self.lock:
+            if self.login_response is not None and self.client.password == password:
+                return self.login_response, True
+            response = ProxiedResponse.from_response(self.client.user_login(username, password))
+            if response.status == HTTPStatus.OK:
+                self.login_response = response
+            return response, False
+
+    def expired(self) -> None:
+        """
+        A request was answered with an expired session even after the client's own login, the next worker login
+        logs in upstream again
+        """
+        with self.lock:
+            self.login_response = None
+
+
+class _ProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # All workers connect at the start of a run, the default backlog of 5 would stall some of them
+    request_queue_size = 128
+
+
+class ApiProxy:
+    """
+    HTTP server forwarding the requests of `OmniAPIClient`s to the tenant named in their `X-Omni-Upstream` header
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+    ):
+        """
+        :param host: Interface to listen on
+        :param port: Port to listen on, 0 picks a free one
+        :param cache_ttl: Seconds a GET response is served from the cache, 0 disables the cache
+        """
+        self.cache = ResponseCache(cache_ttl)
+        self.single_flight = SingleFlight()
+        self._sessions: Dict[Tuple[str, str], TenantSession] = {}
+        self._sessions_lock = threading.Lock()
+        self.server = _ProxyServer((host, port), self._handler())
+        self.thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "ApiProxy":
+        self.thread = threading.Thread(target=self.server.serve_forever, name="omni-api-proxy", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "ApiProxy":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def session(self, upstream: str, username: str, verify_ssl: bool = True) -> TenantSession:
+        key = (upstream, username)
+        with self._sessions_lock:
+            if key not in self._sessions:
+                self._sessions[key] = TenantSession(upstream, verify_ssl)
+            return self._sessions[key]
+
+    def forward(
+        self, method: str, path: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[ProxiedResponse, str]:
+        """
+        Answer a request from a worker
+
+        :param method: HTTP method
+        :param path: Path and query relative to the tenant's base_url
+        :param headers: Headers of the worker's request
+        :param body: Body of the worker's request
+        :return: The response and how it was answered (miss, hit, shared or pass)
+        """
+        headers = {name.lower(): value for name, value in headers.items()}
+        upstream = headers.get(UPSTREAM_HEADER.lower())
+        if not upstream:
+            return ProxiedResponse.error(HTTPStatus.BAD_REQUEST, f"{UPSTREAM_HEADER} header is required"), PASS
+        verify_ssl = headers.get(VERIFY_SSL_HEADER.lower(), "1") != "0"
+        if method == "POST" and path == LOGIN_PATH:
+            return self._login(upstream, verify_ssl, body)
+
+        session = self.session(upstream, headers.get(USER_HEADER.lower(), ""), verify_ssl)
+        forwarded = {
+            name: value for name, value in headers.items() if name not in DROPPED_REQUEST_HEADERS
+        }
+        send = partial(self._send, session, method, path, forwarded, body)
+        if method in WRITE_METHODS:
+            # Emptied before the write for the GETs after it, and again once it is applied, since a GET sent while the
+            # write was in flight may have cached what the tenant returned before the write
+            self.cache.invalidate(upstream)
+            try:
+                return send(), PASS
+            finally:
+                self.cache.invalidate(upstream)
+        if method != "GET" or "no-cache" in headers.get("cache-control", ""):
+            return send(), PASS
+
+        key = (upstream, session.client.username, path, tuple(sorted(forwarded.items())))
+        response = self.cache.get(key)
+        if response is not None:
+            return response, HIT
+        generation = self.cache.generation(upstream)
+        # A GET only joins one sent since the last write, never one that may have read the tenant before it
+        response, shared = self.single_flight.do((*key, generation), send)
+        if shared:
+            return response, SHARED
+        self.cache.put(key, upstream, generation, response)
+        return response, MISS
+
+    def _login(self, upstream: str, verify_ssl: bool, body: bytes) -> Tuple[ProxiedResponse, str]:
+        try:
+            credentials = json.loads(body)
+            username, password = credentials["username"], credentials["password"]
+        except (ValueError, KeyError, TypeError):
+            return ProxiedResponse.error(HTTPStatus.BAD_REQUEST, "Login needs a username and a password"), PASS
+        response, shared = self.session(upstream, username, verify_ssl).login(username, password)
+        return response, SHARED if shared else PASS
+
+    @staticmethod
+    def _send(
+        session: TenantSession, method: str, path: str, headers: Dict[str, str], body: bytes
+    ) -> ProxiedResponse:
+        url = session.client.base_url + path
+        try:
+            # The session's client adds its auth headers and logs in again when the session expires
+            response = session.client.request(method, url, headers=headers, data=body or None)
+        except Exception as e:
+            logger.error(f"{method} {url} failed in the API proxy: {e}")
+            return ProxiedResponse.error(HTTPStatus.BAD_GATEWAY, f"{type(e).__name__}: {e}")
+        if session.client.username and is_auth_expired(response):
+            session.expired()
+        return ProxiedResponse.from_response(response)
+
+    def _handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} {format % args}")
+
+            def _forward(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                response, status = proxy.forward(
+                    self.command, self.path.lstrip("/"), dict(self.headers.items()), body
+                )
+                self.send_response(response.status)
+                for name, value in response.headers:
+                    self.send_header(name, value)
+                self.send_header(CACHE_STATUS_HEADER, status)
+                self.send_header("Content-Length", str(len(response.body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(response.body)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _forward
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local API proxy shared by the test workers")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=float(os.getenv(CACHE_TTL_ENV_VAR, DEFAULT_CACHE_TTL)),
+        help="Seconds a GET response is served from the cache, 0 disables the cache",
+    )
+    args = parser.parse_args()
+
+    proxy = ApiProxy(args.host, args.port, args.cache_ttl)
+    print(f"API proxy listening, route the clients through it with\n    export {API_PROXY_ENV_VAR}={proxy.url}")
+    try:
+        proxy.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Builds columns from paginated API results page by page, so a large result never exists as one list of dicts.
+pandas and pyarrow are optional: install them to get a DataFrame or an Arrow table.
+
+    columns = ColumnBuilder(["id", "name", "monitored_service.id"])
+    for page in tenant.iter_pages(Policy.search()):
+        columns.add_page(page)
+    frame = columns.to_pandas()
+"""
+
+from typing import Any, Dict, Iterable, List
+
+PANDAS = "pandas"
+ARROW = "arrow"
+DICT = "dict"
+OUTPUTS = (PANDAS, ARROW, DICT)
+
+_MISSING = object()
+
+
+def get_field(item: Dict[str, Any], column: str) -> Any:
+    """
+    Value of `column` in a result, dotted names reach into nested objects; e.g. `monitored_service.id`
+    """
+    value = item.get(column, _MISSING)
+    if value is not _MISSING:
+        return value
+    value = item
+    for part in column.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class ColumnBuilder:
+    """
+    Accumulates a subset of fields of every result as columns. With pyarrow installed each page is converted to
+    typed Arrow arrays as it arrives and the Python objects of the page are released.
+    """
+
+    def __init__(self, columns: List[str] | None = None, use_arrow: bool | None = None):
+        """
+        :param columns: Fields to keep, dotted names for nested fields. None keeps the fields of the first result.
+        :param use_arrow: Convert pages to Arrow arrays; by default when pyarrow is installed
+        """
+        self.columns = list(columns) if columns else None
+        self._pyarrow = None
+        if use_arrow or use_arrow is None:
+            try:
+                import pyarrow
+
+                self._pyarrow = pyarrow
+            except ImportError:
+                if use_arrow:
+                    raise
+        self._chunks: Dict[str, List[Any]] = {}
+        self.rows = 0
+
+    def add_page(self, results: Iterable[Dict[str, Any]]) -> None:
+        results = list(results)
+        if not results:
+            return
+        if self.columns is None:
+            self.columns = list(results[0])
+        for column in self.columns:
+            values = [get_field(result, column) for result in results]
+            chunks = self._chunks.setdefault(column, [])
+            if self._pyarrow:
+                chunks.append(self._to_arrow(values))
+            else:
+                chunks.extend(values)
+        self.rows += len(results)
+
+    def _to_arrow(self, values: List[Any]):
+        try:
+            return self._pyarrow.array(values)
+        except (self._pyarrow.ArrowInvalid, self._pyarrow.ArrowTypeError):
+            # Mixed types within a page, e.g. ids as int and str; keep them as strings
+            return self._pyarrow.array(
+                [None if value is None else str(value) for value in values]
+            )
+
+    def _arrow_column(self, column: str):
+        pyarrow = self._pyarrow
+        chunks = self._chunks.get(column, [])
+        if not chunks:
+            return pyarrow.chunked_array([], type=pyarrow.null())
+        types = {chunk.type for chunk in chunks if chunk.type != pyarrow.null()}
+        if len(types) == 1:
+            # Pages where the column is all None are typed `null`, cast them to the column's type
+            column_type = types.pop()
+            return pyarrow.chunked_array(
+                [chunk if chunk.type == column_type else chunk.cast(column_type) for chunk in chunks],
+                type=column_type,
+            )
+        if not types:
+            return pyarrow.chunked_array(chunks)
+        # Different types on different pages (e.g. int and float), let Arrow infer one from all values
+        return pyarrow.chunked_array(
+            [self._to_arrow([value for chunk in chunks for value in chunk.to_pylist()])]
+        )
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        if self._pyarrow:
+            return {column: self._arrow_column(column).to_pylist() for column in self.columns or []}
+        return {column: self._chunks.get(column, []) for column in self.columns or []}
+
+    def to_arrow(self):
+        if not self._pyarrow:
+            raise ImportError("pyarrow is required for Arrow output, `pip install pyarrow`")
+        return self._pyarrow.table(
+            {column: self._arrow_column(column) for column in self.columns or []}
+        )
+
+    def to_pandas(self):
+        import pandas
+
+        if self._pyarrow:
+            return self.to_arrow().to_pandas()
+        return pandas.DataFrame(self.to_dict(), columns=self.columns)
+
+    def build(self, output: str = PANDAS):
+        """
+        :param output: 'pandas' for a DataFrame, 'arrow' for a pyarrow Table or 'dict' for column lists
+        """
+        if output == PANDAS:
+            return self.to_pandas()
+        if output == ARROW:
+            return self.to_arrow()
+        if output == DICT:
+            return self.to_dict()
+        raise ValueError(f"output must be one of {OUTPUTS}, got {output!r}")
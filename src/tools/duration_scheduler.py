@@ -0,0 +1,186 @@
+"""
+Pytest plugin that orders and shards tests using durations recorded in previous pytest-json-report files
+(e.g. `logs/test_results.json`).
+
+Usage:
+    pytest --duration-order                         # run the slowest tests first
+    pytest --shard-count 4 --shard-index 0          # run the first of 4 shards with balanced wall time
+    pytest --durations-from "logs/history/*.json"   # read the history from somewhere else
+"""
+
+import glob
+import heapq
+import json
+import logging
+import statistics
+from typing import Dict, Iterable, List
+
+import pytest
+
+import definitions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DURATIONS_GLOB = str(definitions.LOGS_DIR / "test_results*.json")
+# Used for tests that have never been recorded when there is no history at all
+DEFAULT_ESTIMATE = 1.0
+PHASES = ("setup", "call", "teardown")
+
+
+def load_duration_history(paths: Iterable[str]) -> Dict[str, List[float]]:
+    """
+    Read pytest-json-report files and collect the total (setup + call + teardown) duration of every run of each test
+
+    :param paths: Paths to pytest-json-report files. Unreadable files are logged and skipped.
+    :return: Mapping of nodeid to the list of recorded durations in seconds
+    """
+    history: Dict[str, List[float]] = {}
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                report = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping duration history file {path}: {e}")
+            continue
+        for test in report.get("tests", []):
+            nodeid = test.get("nodeid")
+            if not nodeid:
+                continue
+            duration = sum(test.get(phase, {}).get("duration", 0) for phase in PHASES)
+            history.setdefault(nodeid, []).append(duration)
+    return history
+
+
+def build_estimates(history: Dict[str, List[float]]) -> Dict[str, float]:
+    """
+    Reduce the recorded durations to one estimate per test. The median is used so one slow outlier run
+    does not move a test to the front of the queue.
+
+    :param history: Mapping of nodeid to recorded durations, as returned by `load_duration_history`
+    :return: Mapping of nodeid to its estimated duration in seconds
+    """
+    return {
+        nodeid: statistics.median(durations)
+        for nodeid, durations in history.items()
+        if durations
+    }
+
+
+def estimate_for(nodeid: str, estimates: Dict[str, float], default: float) -> float:
+    return estimates.get(nodeid, default)
+
+
+def default_estimate(estimates: Dict[str, float]) -> float:
+    """
+    Tests without history are assumed to take as long as a typical known test
+    """
+    if not estimates:
+        return DEFAULT_ESTIMATE
+    return statistics.median(estimates.values())
+
+
+def order_longest_first(
+    nodeids: List[str], estimates: Dict[str, float], default: float
+) -> List[str]:
+    """
+    Sort nodeids by their estimated duration, longest first. Ties keep their collection order.
+    """
+    return sorted(
+        nodeids, key=lambda nodeid: -estimate_for(nodeid, estimates, default)
+    )
+
+
+def split_into_shards(
+    nodeids: List[str], shard_count: int, estimates: Dict[str, float], default: float
+) -> List[List[str]]:
+    """
+    Split nodeids into `shard_count` shards with balanced estimated wall time, using the longest processing
+    time first heuristic: every test, longest first, goes to the shard with the least work so far.
+
+    :param nodeids: Test nodeids to distribute
+    :param shard_count: Number of shards
+    :param estimates: Mapping of nodeid to its estimated duration
+    :param default: Estimate used for tests without history
+    :return: List of shards; each shard keeps its tests in collection order
+    """
+    if shard_count < 1:
+        raise ValueError(f"shard_count must be at least 1, got {shard_count}")
+    position = {nodeid: index for index, nodeid in enumerate(nodeids)}
+    shards: List[List[str]] = [[] for _ in range(shard_count)]
+    # (load, shard index) - the index breaks ties so shards fill deterministically
+    loads = [(0.0, index) for index in range(shard_count)]
+    for nodeid in order_longest_first(nodeids, estimates, default):
+        load, index = heapq.heappop(loads)
+        shards[index].append(nodeid)
+        heapq.heappush(
+            loads, (load + estimate_for(nodeid, estimates, default), index)
+        )
+    return [sorted(shard, key=position.__getitem__) for shard in shards]
+
+
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("duration_scheduler", "duration aware scheduling")
+    group.addoption(
+        "--duration-order",
+        action="store_true",
+        default=False,
+        help="Run tests longest-first using durations from previous result files",
+    )
+    group.addoption(
+        "--shard-count",
+        type=int,
+        default=1,
+        help="Split the collected tests into this many shards with balanced wall time",
+    )
+    group.addoption(
+        "--shard-index",
+        type=int,
+        default=0,
+        help="Zero based index of the shard to run, used with --shard-count",
+    )
+    group.addoption(
+        "--durations-from",
+        default=DEFAULT_DURATIONS_GLOB,
+        help="Glob of pytest-json-report files to read historical durations from",
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]):
+    duration_order = config.getoption("duration_order")
+    shard_count = config.getoption("shard_count")
+    shard_index = config.getoption("shard_index")
+    if not duration_order and shard_count == 1:
+        return
+    if not 0 <= shard_index < shard_count:
+        raise pytest.UsageError(
+            f"--shard-index must be between 0 and {shard_count - 1}, got {shard_index}"
+        )
+
+    paths = sorted(glob.glob(config.getoption("durations_from")))
+    estimates = build_estimates(load_duration_history(paths))
+    default = default_estimate(estimates)
+    logger.info(
+        f"Loaded duration estimates for {len(estimates)} test(s) from {len(paths)} file(s)"
+    )
+
+    # nodeids may repeat (e.g. duplicate parametrize ids); such items are scheduled together
+    by_nodeid: Dict[str, List[pytest.Item]] = {}
+    for item in items:
+        by_nodeid.setdefault(item.nodeid, []).append(item)
+    selected = list(by_nodeid)
+    if shard_count > 1:
+        shards = split_into_shards(selected, shard_count, estimates, default)
+        selected = shards[shard_index]
+        keep = set(selected)
+        deselected = [item for item in items if item.nodeid not in keep]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        expected = sum(estimate_for(nodeid, estimates, default) for nodeid in selected)
+        print(
+            f"Shard {shard_index + 1}/{shard_count}: {len(selected)} test(s), estimated {expected:.1f}s"
+        )
+    if duration_order:
+        selected = order_longest_first(selected, estimates, default)
+
+    items[:] = [item for nodeid in selected for item in by_nodeid[nodeid]]
@@ -0,0 +1,222 @@
+"""
+Runs the healthcheck and the selected tests against several environments concurrently and merges the outcomes into
+one report with a column per environment. The tests of an environment run only once its healthcheck passed, and
+don't repeat it; their `tenant` fixture logs in.
+
+Usage:
+    python -m src.tools.fanout_runner --environments INT-SMOKE PROD-CORE PROD-EU -- tests/app_factory -k test_trigger
+    python -m src.tools.fanout_runner --environments all -- tests/tests_tenant.py
+"""
+
+import argparse
+import csv
+import http
+import logging
+import sys
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import definitions
+from src.api.v1.omniapiclient import OmniAPIClient
+from src.enums import Environments
+from src.tenants.config import get_tenant_config
+from src.tools.pytest_process import PytestRun, run_pytest
+
+logger = logging.getLogger(__name__)
+
+FANOUT_RESULTS_DIR = definitions.LOGS_DIR / "fanout"
+HEALTHCHECK = "healthcheck"
+# Set for the pytest run of an environment to the base URL whose healthcheck passed, so conftest.py skips it
+HEALTHCHECK_PASSED_ENV_VAR = "OMNI_HEALTHCHECK_PASSED"
+# Outcome of the pytest run itself, an error when it didn't finish or left no report
+PYTEST_RUN = "pytest run"
+PASSED = "passed"
+FAILED = "failed"
+ERROR = "error"
+SKIPPED = "skipped"
+NOT_RUN = "not run"
+
+
+@dataclass
+class EnvironmentResult:
+    environment: str
+    # Outcome per check/test, in the order they were recorded
+    outcomes: Dict[str, str] = field(default_factory=dict)
+    message: str = ""
+
+
+def check_health(client: OmniAPIClient) -> str:
+    """
+    Same check as the `healthcheck` in conftest.py, returning the outcome instead of failing the session
+    """
+    if not client.verify_ssl:
+        return SKIPPED
+    response = client.get("healthcheck/", allow_redirects=True)
+    if response.text != "OK" or response.status_code != http.HTTPStatus.OK:
+        return FAILED
+    return PASSED
+
+
+def read_junit_outcomes(report: ElementTree.Element) -> Dict[str, str]:
+    """
+    Map every test case of a junit xml report to its outcome
+
+    :param report: Root of the report written by `pytest --junitxml`
+    :return: Mapping of `classname::name` to passed/failed/error/skipped
+    """
+    outcomes = {}
+    for testcase in report.iter("testcase"):
+        test_id = f"{testcase.get('classname', '')}::{testcase.get('name', '')}"
+        if testcase.find("failure") is not None:
+            outcomes[test_id] = FAILED
+        elif testcase.find("error") is not None:
+            outcomes[test_id] = ERROR
+        elif testcase.find("skipped") is not None:
+            outcomes[test_id] = SKIPPED
+        else:
+            outcomes[test_id] = PASSED
+    return outcomes
+
+
+def record_pytest_run(result: EnvironmentResult, run: PytestRun) -> None:
+    """
+    Add the outcomes of an environment's pytest run to its result. A run without a report, or with an exit code
+    other than 0, 1 or 5 (interrupted, internal error, usage error, crash), is recorded as an error.
+    """
+    if run.report is not None:
+        result.outcomes.update(read_junit_outcomes(run.report))
+    if not run.completed:
+        result.outcomes[PYTEST_RUN] = ERROR
+        result.message = run.problem
+
+
+def run_environment(environment: str, pytest_args: List[str]) -> EnvironmentResult:
+    """
+    Healthcheck and run the tests against one environment with its own TenantConfig, client and result files
+    """
+    result = EnvironmentResult(environment)
+    try:
+        config = get_tenant_config(environment)
+        client = OmniAPIClient(config.base_url, verify_ssl=config.verify_ssl)
+
+        result.outcomes[HEALTHCHECK] = check_health(client)
+        if result.outcomes[HEALTHCHECK] == FAILED:
+            result.message = f"Healthcheck failed for {config.base_url}"
+            return result
+    except Exception as e:
+        logger.error(f"Fan-out {HEALTHCHECK} failed for {environment}: {e}")
+        result.outcomes[HEALTHCHECK] = ERROR
+        result.message = f"{type(e).__name__}: {e}"
+        return result
+
+    print(f"[{environment}] pytest {' '.join(pytest_args)}")
+    env = {"OMNI_ENV": environment}
+    if result.outcomes[HEALTHCHECK] == PASSED:
+        env[HEALTHCHECK_PASSED_ENV_VAR] = config.base_url
+    run = run_pytest(
+        pytest_args,
+        FANOUT_RESULTS_DIR / environment,
+        env=env,
+        json_report_file=(
+            FANOUT_RESULTS_DIR / f"{environment}.json"
+            if "--json-report" in pytest_args
+            else None
+        ),
+    )
+    record_pytest_run(result, run)
+    print(f"[{environment}] finished with exit code {run.returncode}, log {run.output_file}")
+    return result
+
+
+def merge_results(results: List[EnvironmentResult]) -> List[List[str]]:
+    """
+    Merge the per environment outcomes into rows: a header row, then one row per check/test with a column per environment
+    """
+    test_ids: List[str] = []
+    for result in results:
+        for test_id in result.outcomes:
+            if test_id not in test_ids:
+                test_ids.append(test_id)
+    rows = [["Test", *[result.environment for result in results]]]
+    for test_id in test_ids:
+        rows.append(
+            [test_id, *[result.outcomes.get(test_id, NOT_RUN) for result in results]]
+        )
+    rows.append(["Message", *[result.message for result in results]])
+    return rows
+
+
+def fan_out(
+    environments: List[str], pytest_args: List[str], max_workers: int | None = None
+) -> List[List[str]]:
+    """
+    Run against all environments concurrently; the total time is that of the slowest environment
+
+    :param environments: Environment names, see `src.enums.Environments`
+    :param pytest_args: Arguments for the pytest run of every environment
+    :param max_workers: Maximum number of environments in flight, all of them by default
+    :return: Merged report rows
+    """
+    FANOUT_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_workers or len(environments)) as executor:
+        results = list(
+            executor.map(
+                lambda environment: run_environment(environment, pytest_args),
+                environments,
+            )
+        )
+    return merge_results(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run tests against several environments concurrently"
+    )
+    parser.add_argument(
+        "--environments",
+        nargs="+",
+        required=True,
+        help=f"Environments to run against, or 'all' for {', '.join(map(str, Environments.values()))}",
+    )
+    parser.add_argument(
+        "--max-workers", type=int, help="Maximum number of environments in flight"
+    )
+    parser.add_argument(
+        "--report",
+        default=str(FANOUT_RESULTS_DIR / "report.csv"),
+        help="Where to write the merged report",
+    )
+    parser.add_argument(
+        "pytest_args", nargs=argparse.REMAINDER, help="Arguments for pytest after --"
+    )
+    args = parser.parse_args()
+
+    environments = (
+        [str(environment) for environment in Environments.values()]
+        if args.environments == ["all"]
+        else args.environments
+    )
+    unknown = [env for env in environments if not Environments.contains(env)]
+    if unknown:
+        parser.error(f"Unknown environment(s): {', '.join(unknown)}")
+    pytest_args = [arg for arg in args.pytest_args if arg != "--"]
+
+    rows = fan_out(environments, pytest_args, args.max_workers)
+    with open(args.report, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+    width = max(len(row[0]) for row in rows)
+    for row in rows:
+        print("  ".join([row[0].ljust(width), *[cell.ljust(12) for cell in row[1:]]]))
+    print(f"Report written to {args.report}")
+
+    failed = any(
+        cell in (FAILED, ERROR) for row in rows[1:-1] for cell in row[1:]
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+JSON files the tools keep under `logs/` between runs (policy setup IDs, page sizes, monitored service sweeps).
+Several worker processes may write the same file, so an update re-reads the file, merges into what is on disk and
+replaces it atomically.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def load_json_cache(path: Optional[Union[Path, str]], description: str) -> Dict[str, Any]:
+    """
+    Contents of a JSON cache file, empty when there is no path, no file or the file can't be read
+
+    :param path: File to read, None for a cache kept in memory only
+    :param description: What the file holds, for the warning about an unreadable file
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            contents = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable {description} {path}: {e}")
+        return {}
+    if not isinstance(contents, dict):
+        logger.warning(f"Ignoring {description} {path}: not a JSON object")
+        return {}
+    return contents
+
+
+def update_json_cache(
+    path: Optional[Union[Path, str]],
+    update: Callable[[Dict[str, Any]], None],
+    description: str,
+) -> Dict[str, Any]:
+    """
+    Apply `update` to the current contents of a JSON cache file and write them back
+
+    :param path: File to update, None does nothing
+    :param update: Changes the contents in place, e.g. sets the entries of this process
+    :param description: What the file holds, for the warning about an unreadable file
+    :return: The contents written, including the entries other processes wrote meanwhile
+    """
+    # Merge with the file on disk, other worker processes may have written to it meanwhile
+    contents = load_json_cache(path, description)
+    if not path:
+        return contents
+    update(contents)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(contents, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+    return contents
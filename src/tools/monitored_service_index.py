@@ -0,0 +1,160 @@
+"""
+Per-tenant index of monitored services, built with one paginated sweep and shared by every test of the session.
+The sweep is persisted to `logs/monitored_service_index.json` and reused by later runs until it expires.
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping
+
+import definitions
+from src.api.v1.core.monitoredservice import MonitoredService
+from src.api.v1.omniapiclient import OmniAPIClient
+from src.tools.json_cache import load_json_cache, update_json_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = definitions.LOGS_DIR / "monitored_service_index.json"
+# Seconds a persisted sweep is reused, 0 sweeps once per session without persisting
+TTL_ENV_VAR = "OMNI_MS_INDEX_TTL"
+DEFAULT_TTL = 6 * 60 * 60
+SERVICE_TYPE_FIELD = "service_type"
+# Fields that are false on monitored services that are deactivated or disabled
+ACTIVE_FIELDS = ("is_active", "enabled")
+
+
+def matches(monitored_service: Dict[str, Any], conditions: Mapping[str, Any]) -> bool:
+    """
+    True if every condition equals the field of the same name, e.g. {"is_active": True}
+    """
+    return all(
+        monitored_service.get(field) == value for field, value in conditions.items()
+    )
+
+
+def is_active(monitored_service: Dict[str, Any], conditions: Mapping[str, Any]) -> bool:
+    """
+    True unless the monitored service is deactivated or disabled; fields the conditions ask for are left to them
+    """
+    return all(
+        monitored_service.get(field, True) for field in ACTIVE_FIELDS if field not in conditions
+    )
+
+
+class MonitoredServiceIndex:
+    """
+    Monitored services of every tenant used in the session, grouped by service type. The first lookup for a tenant
+    sweeps `MonitoredService` once (or loads a fresh enough persisted sweep); after that lookups are dict reads.
+    """
+
+    def __init__(self, cache_path: Path | None = DEFAULT_INDEX_PATH, ttl: float = DEFAULT_TTL):
+        """
+        :param cache_path: File to persist the sweeps between runs, None keeps the index in memory only
+        :param ttl: Seconds a persisted sweep is reused; 0 disables persistence
+        """
+        self.cache_path = cache_path if ttl > 0 else None
+        self.ttl = ttl
+        self._by_tenant: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._lookups: Dict[tuple, int | None] = {}
+        self._lock = threading.Lock()
+
+    def services(self, tenant: OmniAPIClient) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Service type mapped to the monitored services of that type in the tenant, ordered by ID
+        """
+        with self._lock:
+            by_service_type = self._by_tenant.get(tenant.base_url)
+            if by_service_type is None:
+                by_service_type = self._by_tenant[tenant.base_url] = self._group(
+                    self._load(tenant.base_url) or self._sweep(tenant)
+                )
+            return by_service_type
+
+    def ms_id(
+        self,
+        tenant: OmniAPIClient,
+        service_type: str,
+        conditions: Mapping[str, Any] | None = None,
+        preferred: Any = None,
+    ) -> int | None:
+        """
+        ID of a monitored service of `service_type` in the tenant
+
+        :param tenant: Omni connector of the tenant
+        :param service_type: Service type, e.g. ServiceTypes.asana
+        :param conditions: Field values the monitored service must have, see the `conditions` marker
+        :param preferred: ID or name of the monitored service to use when it matches, e.g. from
+            PREFERRED_MONITORED_SERVICES
+        :return: Monitored service ID, None if the tenant has no matching monitored service. Without a preferred
+            match only active monitored services are picked, the one with the lowest ID.
+        """
+        conditions = dict(conditions or {})
+        key = (tenant.base_url, str(service_type), json.dumps(conditions, sort_keys=True, default=str), preferred)
+        if key in self._lookups:
+            return self._lookups[key]
+
+        candidates = [
+            monitored_service
+            for monitored_service in self.services(tenant).get(str(service_type), [])
+            if matches(monitored_service, conditions)
+        ]
+        preferred_candidates = [
+            monitored_service
+            for monitored_service in candidates
+            if preferred is not None and preferred in (monitored_service.get("id"), monitored_service.get("name"))
+        ]
+        if preferred is not None and not preferred_candidates:
+            logger.warning(
+                f"Preferred {service_type} monitored service {preferred} not found in {tenant.base_url} "
+                f"with {conditions}, picking an active one"
+            )
+        active_candidates = [
+            monitored_service for monitored_service in candidates if is_active(monitored_service, conditions)
+        ]
+        chosen = (preferred_candidates or active_candidates or [None])[0]
+        self._lookups[key] = chosen["id"] if chosen else None
+        return self._lookups[key]
+
+    def refresh(self, tenant: OmniAPIClient) -> None:
+        """
+        Drop the tenant's sweep so the next lookup sweeps again, e.g. after creating a monitored service
+        """
+        with self._lock:
+            self._by_tenant.pop(tenant.base_url, None)
+            self._lookups = {key: value for key, value in self._lookups.items() if key[0] != tenant.base_url}
+            self._save(tenant.base_url, None)
+
+    @staticmethod
+    def _group(monitored_services: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        by_service_type: Dict[str, List[Dict[str, Any]]] = {}
+        for monitored_service in sorted(monitored_services, key=lambda ms: ms.get("id", 0)):
+            by_service_type.setdefault(str(monitored_service.get(SERVICE_TYPE_FIELD)), []).append(monitored_service)
+        return by_service_type
+
+    def _sweep(self, tenant: OmniAPIClient) -> List[Dict[str, Any]]:
+        logger.info(f"Building the monitored service index of {tenant.base_url}")
+        monitored_services = tenant.get_all_results(MonitoredService.search())
+        self._save(tenant.base_url, monitored_services)
+        return monitored_services
+
+    def _load(self, base_url: str) -> List[Dict[str, Any]] | None:
+        entry = load_json_cache(self.cache_path, "monitored service index").get(base_url)
+        if not entry or time.time() - entry.get("created", 0) > self.ttl:
+            return None
+        logger.info(f"Reusing the monitored service index of {base_url} from a previous run")
+        return entry["monitored_services"]
+
+    def _save(self, base_url: str, monitored_services: List[Dict[str, Any]] | None) -> None:
+        if not self.cache_path:
+            return
+
+        def update(persisted: Dict[str, Any]) -> None:
+            if monitored_services is None:
+                persisted.pop(base_url, None)
+            else:
+                persisted[base_url] = {"created": time.time(), "monitored_services": monitored_services}
+
+        update_json_cache(self.cache_path, update, "monitored service index")
@@ -0,0 +1,167 @@
+"""
+Adaptive `limit` for paginated endpoints. The pagination engine reports the latency and size of every page; the
+tuner doubles the page size of an endpoint while pages are fast and small, halves it when they get slow or large,
+and remembers the size per endpoint label in `logs/page_sizes.json` for later runs. Only labels of endpoint templates
+are remembered; a plain path carries IDs and queries, so its sizes are kept for the process only.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import definitions
+from src.tools.json_cache import load_json_cache, update_json_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZES_PATH = definitions.LOGS_DIR / "page_sizes.json"
+# Set to 0 to always use the limit of the request
+ADAPTIVE_ENV_VAR = "OMNI_ADAPTIVE_PAGE_SIZE"
+MIN_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 1000
+# Pages faster than FAST_PAGE_SECONDS grow, pages slower than SLOW_PAGE_SECONDS or larger than MAX_PAGE_BYTES shrink
+FAST_PAGE_SECONDS = 1.0
+SLOW_PAGE_SECONDS = 5.0
+MAX_PAGE_BYTES = 5 * 2**20
+
+
+def get_limit(url: str) -> int | None:
+    """
+    `limit` query parameter of a path or URL, None if it has none
+    """
+    for name, value in parse_qsl(urlsplit(url).query):
+        if name == "limit":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+def set_limit(url: str, limit: int) -> str:
+    """
+    Replace the `limit` query parameter of a path or URL; URLs without one are returned unchanged.
+    The offset of a `next` link is already past the previous page, so changing the limit skips or repeats nothing.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if not any(name == "limit" for name, _ in query):
+        return url
+    query = [(name, str(limit) if name == "limit" else value) for name, value in query]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class PageSizeTuner:
+    """
+    Page size per endpoint label, within `min_size` and `max_size`
+    """
+
+    def __init__(
+        self,
+        path: Path | None = DEFAULT_PAGE_SIZES_PATH,
+        min_size: int = MIN_PAGE_SIZE,
+        max_size: int = MAX_PAGE_SIZE,
+    ):
+        """
+        :param path: File remembering the page sizes between runs, None keeps them in memory only
+        :param min_size: Smallest page size the tuner picks
+        :param max_size: Largest page size the tuner picks
+        """
+        self.path = path
+        self.min_size = min_size
+        self.max_size = max_size
+        self._sizes: Dict[str, int] = self._load()
+        # Largest page the server returned per label, when it caps `limit` below the requested size
+        self._server_max: Dict[str, int] = {}
+        # Labels whose size changed since the last save and is remembered between runs
+        self._changed: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def limit_for(self, label: str, requested: int) -> int:
+        """
+        Page size to request for `label`; the remembered size, or `requested` for an endpoint not seen before
+        """
+        return self._sizes.get(label, self._clamp(label, requested))
+
+    def observe(
+        self,
+        label: str,
+        limit: int,
+        returned: int,
+        seconds: float,
+        payload_bytes: int,
+        has_next: bool,
+        persist: bool = True,
+    ) -> int:
+        """
+        Record a page and return the page size for the next request of `label`
+
+        :param label: Endpoint label, e.g. `EndpointPath.label`
+        :param limit: `limit` of the request
+        :param returned: Number of results in the page
+        :param seconds: Time to fetch and read the page
+        :param payload_bytes: Size of the response body
+        :param has_next: Whether the response links to a next page
+        :param persist: Whether the size is saved for later runs; False for a label that isn't stable between calls,
+                        such as a path with IDs in it
+        """
+        with self._lock:
+            if has_next and 0 < returned < limit:
+                # The server caps the page size, asking for more only costs bigger requests
+                self._server_max[label] = returned
+            size = limit
+            if seconds > SLOW_PAGE_SECONDS or payload_bytes > MAX_PAGE_BYTES:
+                size = limit // 2
+            elif has_next and seconds < FAST_PAGE_SECONDS and payload_bytes * 2 <= MAX_PAGE_BYTES:
+                size = limit * 2
+            size = self._clamp(label, size)
+            if self._sizes.get(label) != size:
+                logger.debug(f"Page size of {label}: {limit} -> {size} ({seconds:.2f}s, {payload_bytes} bytes)")
+                self._sizes[label] = size
+                if persist:
+                    self._changed.add(label)
+            return size
+
+    def _clamp(self, label: str, size: int) -> int:
+        max_size = min(self.max_size, self._server_max.get(label, self.max_size))
+        return max(self.min_size, min(size, max_size))
+
+    def _load(self) -> Dict[str, int]:
+        try:
+            return {
+                label: int(size) for label, size in load_json_cache(self.path, "page sizes").items()
+            }
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable page sizes {self.path}: {e}")
+            return {}
+
+    def save(self) -> None:
+        """
+        Write the page sizes learned in this process, merged with the ones other processes wrote meanwhile
+        """
+        with self._lock:
+            if not self.path or not self._changed:
+                return
+            changed = {label: self._sizes[label] for label in self._changed}
+            update_json_cache(self.path, lambda sizes: sizes.update(changed), "page sizes")
+            self._changed.clear()
+
+
+_default_tuner: PageSizeTuner | None = None
+_default_tuner_lock = threading.Lock()
+
+
+def default_page_size_tuner() -> PageSizeTuner | None:
+    """
+    Tuner shared by all clients of the process, None when OMNI_ADAPTIVE_PAGE_SIZE=0
+    """
+    global _default_tuner
+    if os.getenv(ADAPTIVE_ENV_VAR, "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    with _default_tuner_lock:
+        if _default_tuner is None:
+            _default_tuner = PageSizeTuner()
+        return _default_tuner
@@ -0,0 +1,247 @@
+"""
+Pytest plugin that runs the collected tests in parallel worker processes with tenant aware affinity.
+
+Tests are grouped by their `tenant` marker (the tenant fixture they run against, `tenant` when unset) and their
+`service_type` marker. A group always runs inside one worker process, so session scoped logins and policy
+fixtures are reused by all of its tests. Every tenant gets at most `--max-per-tenant` worker processes at a time;
+the groups of a tenant are spread over those lanes with balanced estimated wall time.
+
+Usage:
+    pytest --workers 4                      # 4 worker processes, default cap per tenant
+    pytest --workers 6 --max-per-tenant 1   # never hit the same tenant from two workers
+"""
+
+import glob
+import logging
+import os
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+
+import definitions
+from src.tools.duration_scheduler import (
+    build_estimates,
+    default_estimate,
+    estimate_for,
+    load_duration_history,
+    split_into_shards,
+)
+from src.tools.pytest_process import PytestRun, run_pytest
+
+logger = logging.getLogger(__name__)
+
+# Set in the environment of the worker processes so they do not start workers of their own
+WORKER_ENV_VAR = "OMNI_PARALLEL_WORKER"
+PARALLEL_RESULTS_DIR = definitions.LOGS_DIR / "parallel"
+# pytest-json-report file of every worker, matched by the `logs/test_results*.json` glob of the results uploader
+WORKER_JSON_REPORT = "test_results_worker-{index}.json"
+DEFAULT_TENANT = "tenant"
+DEFAULT_MAX_PER_TENANT = 2
+
+
+@dataclass
+class Lane:
+    """
+    A batch of test groups of one tenant that runs in a single worker process
+    """
+
+    tenant: str
+    nodeids: List[str] = field(default_factory=list)
+    estimate: float = 0.0
+
+
+def affinity_key(item: pytest.Item) -> Tuple[str, str]:
+    """
+    Return the (tenant, service_type) key that decides which tests must share a worker
+
+    :param item: Collected test item
+    :return: Tenant fixture name and service type, empty when the test has no `service_type` marker
+    """
+    tenant_marker = item.get_closest_marker("tenant")
+    service_type_marker = item.get_closest_marker("service_type")
+    tenant = (
+        str(tenant_marker.args[0])
+        if tenant_marker and tenant_marker.args
+        else DEFAULT_TENANT
+    )
+    service_type = (
+        str(service_type_marker.args[0])
+        if service_type_marker and service_type_marker.args
+        else ""
+    )
+    return tenant, service_type
+
+
+def plan_lanes(
+    groups: Dict[Tuple[str, str], List[str]],
+    max_per_tenant: int,
+    estimates: Dict[str, float],
+    default: float,
+) -> List[Lane]:
+    """
+    Distribute the affinity groups of each tenant over at most `max_per_tenant` lanes, balancing estimated wall time
+
+    :param groups: Mapping of (tenant, service_type) to the nodeids of the group, in collection order
+    :param max_per_tenant: Maximum number of lanes (and therefore concurrent workers) per tenant
+    :param estimates: Mapping of nodeid to estimated duration
+    :param default: Estimate used for tests without history
+    :return: Lanes ordered longest first, so the slowest work starts first
+    """
+    if max_per_tenant < 1:
+        raise ValueError(f"max_per_tenant must be at least 1, got {max_per_tenant}")
+    groups_by_tenant: Dict[str, List[Tuple[str, str]]] = {}
+    for key in groups:
+        groups_by_tenant.setdefault(key[0], []).append(key)
+
+    lanes: List[Lane] = []
+    for tenant, keys in groups_by_tenant.items():
+        group_estimates = {
+            key: sum(estimate_for(nodeid, estimates, default) for nodeid in groups[key])
+            for key in keys
+        }
+        shards = split_into_shards(
+            keys, min(max_per_tenant, len(keys)), group_estimates, default
+        )
+        for shard in shards:
+            lane = Lane(tenant=tenant)
+            for key in shard:
+                lane.nodeids.extend(groups[key])
+                lane.estimate += group_estimates[key]
+            lanes.append(lane)
+    return sorted(lanes, key=lambda lane: -lane.estimate)
+
+
+def count_failures(report: ElementTree.Element) -> int:
+    """
+    Count failed and errored tests in the root of a junit xml report
+    """
+    suites = [report] if report.tag == "testsuite" else report.findall("testsuite")
+    return sum(
+        int(suite.get("failures", 0)) + int(suite.get("errors", 0)) for suite in suites
+    )
+
+
+def lane_failures(run: PytestRun) -> int:
+    """
+    Number of failures of a lane; at least 1 when the worker wrote no report or did not finish its run
+    """
+    failures = 0 if run.report is None else count_failures(run.report)
+    return failures if run.completed else max(failures, 1)
+
+
+def run_lane(index: int, lane: Lane, extra_args: List[str], json_report: bool) -> int:
+    """
+    Run one lane in a pytest worker process and return the number of failed tests
+
+    :param json_report: Whether the worker writes its own pytest-json-report file
+    """
+    args_file = PARALLEL_RESULTS_DIR / f"worker-{index}.args"
+    args_file.write_text("\n".join(lane.nodeids))
+    print(
+        f"[worker {index}] {lane.tenant}: {len(lane.nodeids)} test(s), estimated {lane.estimate:.1f}s"
+    )
+    run = run_pytest(
+        [f"@{args_file}", *extra_args],
+        PARALLEL_RESULTS_DIR / f"worker-{index}",
+        env={WORKER_ENV_VAR: str(index)},
+        json_report_file=worker_json_report(index) if json_report else None,
+    )
+    failures = lane_failures(run)
+    print(
+        f"[worker {index}] {lane.tenant}: finished with exit code {run.returncode}, {failures} failure(s), "
+        f"log {run.output_file}"
+    )
+    return failures
+
+
+def worker_json_report(index: int) -> Path:
+    return definitions.LOGS_DIR / WORKER_JSON_REPORT.format(index=index)
+
+
+def json_report_requested(config: pytest.Config) -> bool:
+    """
+    Whether the run was started with `--json-report`; always False when pytest-json-report isn't installed
+    """
+    return bool(config.getoption("json_report", False))
+
+
+def remove_worker_json_reports() -> None:
+    """
+    Remove the worker reports of an earlier parallel run, which the `logs/test_results*.json` glob of the results
+    uploader would otherwise upload with the reports of this run
+    """
+    for stale_report in glob.glob(str(worker_json_report("*"))):
+        Path(stale_report).unlink(missing_ok=True)
+
+
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("parallel_runner", "tenant aware parallel execution")
+    group.addoption(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes; tests of the same tenant and service type share a worker",
+    )
+    group.addoption(
+        "--max-per-tenant",
+        type=int,
+        default=DEFAULT_MAX_PER_TENANT,
+        help="Maximum number of workers running against the same tenant at once",
+    )
+    group.addoption(
+        "--worker-args",
+        default="",
+        help="Extra arguments passed to every worker process, e.g. '-k trigger -x'",
+    )
+
+
+def is_controller(config: pytest.Config) -> bool:
+    return config.getoption("workers") > 1 and not os.getenv(WORKER_ENV_VAR)
+
+
+def pytest_sessionstart(session: pytest.Session):
+    if not os.getenv(WORKER_ENV_VAR) and not session.config.option.collectonly:
+        remove_worker_json_reports()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session: pytest.Session):
+    config = session.config
+    if not is_controller(config) or config.option.collectonly or not session.items:
+        return None
+
+    nodeids = list(dict.fromkeys(item.nodeid for item in session.items))
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for item in session.items:
+        members = groups.setdefault(affinity_key(item), [])
+        if item.nodeid not in members:
+            members.append(item.nodeid)
+
+    estimates = build_estimates(
+        load_duration_history(sorted(glob.glob(config.getoption("durations_from"))))
+    )
+    lanes = plan_lanes(
+        groups, config.getoption("max_per_tenant"), estimates, default_estimate(estimates)
+    )
+    workers = min(config.getoption("workers"), len(lanes))
+    print(
+        f"\nRunning {len(nodeids)} test(s) in {len(lanes)} lane(s) on {workers} worker(s)"
+    )
+
+    PARALLEL_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    extra_args = config.getoption("worker_args").split()
+    json_report = json_report_requested(config)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        failures = list(
+            executor.map(
+                lambda indexed_lane: run_lane(*indexed_lane, extra_args, json_report),
+                enumerate(lanes),
+            )
+        )
+
+    session.testsfailed = sum(failures)
+    return True
@@ -0,0 +1,98 @@
+"""
+Runs pytest in a child process, as the parallel and fan-out runners do. Every run gets its own junit xml, output,
+log file and pytest-json-report file, so concurrent runs never write to the same file, and tells whether it finished
+with a report that can be trusted.
+"""
+
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+import definitions
+
+# Exit code pytest uses when no tests were collected
+NO_TESTS_COLLECTED = 5
+# Exit codes of a pytest run that finished: all passed, some failed, none collected. Any other code means the run
+# was interrupted or broken, whatever its report says.
+COMPLETED_RETURNCODES = (0, 1, NO_TESTS_COLLECTED)
+
+
+@dataclass
+class PytestRun:
+    returncode: int
+    # Output of the process
+    output_file: Path
+    # Root of the junit xml report, None when the run left no readable report
+    report: ElementTree.Element | None
+
+    @property
+    def completed(self) -> bool:
+        return self.report is not None and self.returncode in COMPLETED_RETURNCODES
+
+    @property
+    def problem(self) -> str:
+        """
+        Why the run can't be trusted, empty when it completed
+        """
+        if self.report is None:
+            return f"pytest exited with {self.returncode} without a report, see {self.output_file}"
+        if self.returncode not in COMPLETED_RETURNCODES:
+            return f"pytest exited with {self.returncode}, see {self.output_file}"
+        return ""
+
+
+def read_junit_report(junit_xml: Path) -> ElementTree.Element | None:
+    """
+    Root of a junit xml report, None if the report could not be read
+    """
+    try:
+        return ElementTree.parse(junit_xml).getroot()
+    except (OSError, ElementTree.ParseError):
+        return None
+
+
+def run_pytest(
+    args: List[str],
+    files: Path,
+    env: Dict[str, str] | None = None,
+    json_report_file: Path | None = None,
+) -> PytestRun:
+    """
+    Run pytest in a child process and wait for it
+
+    :param args: Arguments for pytest
+    :param files: Path prefix of the files of the run: `<files>.xml` junit report, `<files>.log` output of the
+                  process and `<files>.requests.log` log file (`log_file` of pytest.ini)
+    :param env: Variables added to the environment of the process
+    :param json_report_file: Where pytest-json-report writes its report, None to write none
+    :return: The exit code and the junit report of the run
+    """
+    junit_xml = Path(f"{files}.xml")
+    output_file = Path(f"{files}.log")
+    command = [
+        sys.executable,
+        "-m",
+        "pytest",
+        *args,
+        f"--junitxml={junit_xml}",
+        "-o",
+        f"log_file={files}.requests.log",
+    ]
+    if json_report_file is not None:
+        command += ["--json-report", f"--json-report-file={json_report_file}"]
+        json_report_file.unlink(missing_ok=True)
+    # A report left by a previous run must not be taken for the result of this one
+    junit_xml.unlink(missing_ok=True)
+    with open(output_file, "w") as output:
+        returncode = subprocess.call(
+            command,
+            cwd=definitions.ROOT_DIR,
+            env={**os.environ, **(env or {})},
+            stdout=output,
+            stderr=output,
+        )
+    return PytestRun(returncode, output_file, read_junit_report(junit_xml))
@@ -0,0 +1,232 @@
+"""
+Local SQLite store of test run history with typed columns, used for trend queries without the spreadsheet.
+
+Usage:
+    python scripts/query_test_history.py "test_trigger_policy_scan_for_*" --last-runs 30 --percentile 95
+"""
+
+import itertools
+import math
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import definitions
+
+DEFAULT_STORE_PATH = definitions.LOGS_DIR / "test_history.sqlite"
+# Seconds a writer waits for the run another process is adding; the uploader streams the runs of several reports
+# into the store from parallel processes, each in one transaction lasting as long as the parse of its report
+BUSY_TIMEOUT = 600.0
+PHASES = ("setup", "call", "teardown")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    environment TEXT NOT NULL,
+    job_name TEXT NOT NULL,
+    build_url TEXT NOT NULL DEFAULT '',
+    total INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    error INTEGER NOT NULL DEFAULT 0,
+    duration REAL NOT NULL DEFAULT 0,
+    UNIQUE (created, environment, job_name)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    nodeid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    setup REAL NOT NULL,
+    call REAL NOT NULL,
+    teardown REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_name ON results (name, run_id);
+CREATE INDEX IF NOT EXISTS results_nodeid ON results (nodeid, run_id);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+"""
+
+
+@dataclass
+class DurationStats:
+    nodeid: str
+    runs: int
+    passed: int
+    mean: float
+    percentile: float
+    maximum: float
+
+    @property
+    def pass_rate(self) -> float:
+        return self.passed / self.runs * 100 if self.runs else 0.0
+
+
+def created_timestamp(created: Any) -> float:
+    """
+    pytest-json-report writes `created` as an epoch float; older files may carry an ISO string
+    """
+    if isinstance(created, (int, float)):
+        return float(created)
+    if isinstance(created, str):
+        return datetime.fromisoformat(created.replace("Z", "+00:00")).timestamp()
+    return datetime.now(timezone.utc).timestamp()
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of `values`
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def short_name(nodeid: str) -> str:
+    """
+    Function name of a nodeid, including the parametrize id; e.g. `test_x[asana]` for `tests/a.py::Cls::test_x[asana]`
+    """
+    return nodeid.rsplit("::", 1)[-1]
+
+
+class ResultsStore:
+    """
+    SQLite backed history of test runs. One row per run in `runs` and one row per test per run in `results`.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_run(
+        self,
+        test_data: Dict[str, Any],
+        environment: str,
+        job_name: str,
+        build_url: str = "",
+        tests: Optional[Iterable[Dict[str, Any]]] = None,
+    ) -> bool:
+        """
+        Store a parsed pytest-json-report. A run with the same creation time, environment and job is stored once.
+
+        :param test_data: Report with `created`, `duration`, `summary` and `tests` (slim entries are enough)
+        :param environment: Environment the tests ran against
+        :param job_name: CI job name
+        :param build_url: CI build URL
+        :param tests: Tests to store instead of `test_data["tests"]`, e.g. a generator streaming them from the report
+                      while it fills `test_data`. `created` must be in `test_data` once the first test is out; the
+                      totals are read after the last one.
+        :return: True if the run was added, False if it was already stored
+        """
+        tests = iter(test_data.get("tests", []) if tests is None else tests)
+        # A streaming parser has read the keys before `tests`, among them `created`, once it yields the first test
+        first = list(itertools.islice(tests, 1))
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO runs (created, environment, job_name, build_url) VALUES (?, ?, ?, ?)",
+                (
+                    created_timestamp(test_data.get("created")),
+                    environment,
+                    job_name,
+                    build_url,
+                ),
+            )
+            if not cursor.rowcount:
+                return False
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO results (run_id, nodeid, name, outcome, duration, setup, call, teardown) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._result_rows(run_id, itertools.chain(first, tests)),
+            )
+            summary = test_data.get("summary", {})
+            self.connection.execute(
+                "UPDATE runs SET total = ?, passed = ?, failed = ?, skipped = ?, error = ?, duration = ? "
+                "WHERE run_id = ?",
+                (
+                    summary.get("total", 0),
+                    summary.get("passed", 0),
+                    summary.get("failed", 0),
+                    summary.get("skipped", 0),
+                    summary.get("error", 0),
+                    float(test_data.get("duration", 0)),
+                    run_id,
+                ),
+            )
+        return True
+
+    @staticmethod
+    def _result_rows(run_id: int, tests: Iterable[Dict[str, Any]]):
+        for test in tests:
+            nodeid = test.get("nodeid", "")
+            phases = [float(test.get(phase, {}).get("duration", 0)) for phase in PHASES]
+            yield (
+                run_id,
+                nodeid,
+                short_name(nodeid),
+                test.get("outcome", "unknown"),
+                sum(phases),
+                *phases,
+            )
+
+    def duration_stats(
+        self,
+        pattern: str,
+        last_runs: int = 30,
+        percent: float = 95,
+        environment: Optional[str] = None,
+    ) -> List[DurationStats]:
+        """
+        Duration statistics per test over the most recent runs
+
+        :param pattern: Glob matched against the test name (e.g. `test_trigger_policy_scan_for_*`) or the full nodeid
+        :param last_runs: Number of most recent runs to look at
+        :param percent: Percentile to compute, e.g. 95 for p95
+        :param environment: Only look at runs of this environment
+        :return: Statistics per nodeid, slowest percentile first
+        """
+        run_filter = "WHERE environment = ?" if environment else ""
+        run_params = [environment] if environment else []
+        # Names are matched in SQL with GLOB; nodeid patterns (containing "::" or "/") match the nodeid column
+        column = "nodeid" if "::" in pattern or "/" in pattern else "name"
+        rows = self.connection.execute(
+            f"SELECT nodeid, outcome, duration FROM results WHERE {column} GLOB ? AND run_id IN "
+            f"(SELECT run_id FROM runs {run_filter} ORDER BY created DESC LIMIT ?)",
+            [pattern, *run_params, last_runs],
+        ).fetchall()
+
+        by_nodeid: Dict[str, List[tuple]] = {}
+        for nodeid, outcome, duration in rows:
+            by_nodeid.setdefault(nodeid, []).append((outcome, duration))
+
+        stats = []
+        for nodeid, results in by_nodeid.items():
+            durations = [duration for _, duration in results]
+            stats.append(
+                DurationStats(
+                    nodeid=nodeid,
+                    runs=len(results),
+                    passed=sum(outcome == "passed" for outcome, _ in results),
+                    mean=sum(durations) / len(durations),
+                    percentile=percentile(durations, percent),
+                    maximum=max(durations),
+                )
+            )
+        return sorted(stats, key=lambda stat: -stat.percentile)
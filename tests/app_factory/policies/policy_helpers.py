@@ -1,6 +1,11 @@
+import contextvars
+import logging
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from requests import Response, JSONDecodeError
 from http import HTTPStatus
+from typing import Dict, List
 from pytest_check import check
 
 from src.enums import PolicyModes
@@ -8,6 +13,14 @@ from src.api.v1.core.policyassessment import PolicyAssessment
 from src.api.v1.omniapiclient import OmniAPIClient
 from src.api.v1.core.policy import Policy
 
+logger = logging.getLogger(__name__)
+
+# Concurrent creates in flight per bulk_create_policies call, small enough not to trip the tenant's rate limits
+BULK_CREATE_WORKERS = 8
+EXISTING = "existing"
+CREATED = "created"
+FAILED = "failed"
+
 
 def get_policy_by_name(tenant: OmniAPIClient, policy_name: str) -> dict:
     policy_params = {"limit": 25, "offset": 0, "search": policy_name}
@@ -77,7 +90,7 @@ def create_policy_payload(
 
 
 def get_single_item_url(policy_id: int) -> str:
-    return Policy.base_path + f"{policy_id}/"
+    return Policy.get_single_item_url(policy_id)
 
 
 def check_trigger_policy_scan(tenant: OmniAPIClient, policy_ids_mapping: dict) -> None:
@@ -116,37 +129,137 @@ def check_trigger_policy_scan(tenant: OmniAPIClient, policy_ids_mapping: dict) -
             )
 
 
-def get_or_create_policy(
-    tenant: OmniAPIClient, payload: dict, ms_id: int = None
-) -> int:
+@dataclass
+class PolicyCreateResult:
+    name: str
+    status: str
+    policy_id: int | None = None
+    status_code: int | None = None
+    error: str = ""
+
+
+@dataclass
+class BulkCreateResult:
+    # One result per unique policy name, in payload order
+    results: List[PolicyCreateResult] = field(default_factory=list)
+
+    @property
+    def policy_ids(self) -> Dict[str, int]:
+        """
+        Policy name mapped to its ID, for every existing or created policy
+        """
+        return {
+            result.name: result.policy_id
+            for result in self.results
+            if result.policy_id is not None
+        }
+
+    @property
+    def failed(self) -> List[PolicyCreateResult]:
+        return [result for result in self.results if result.status == FAILED]
+
+    def report(self) -> str:
+        """
+        One line summary plus a line per failed create
+        """
+        counts = {
+            status: sum(result.status == status for result in self.results)
+            for status in (EXISTING, CREATED, FAILED)
+        }
+        lines = [
+            f"{len(self.results)} policies: {counts[EXISTING]} existing, {counts[CREATED]} created, {counts[FAILED]} failed"
+        ]
+        for result in self.failed:
+            lines.append(f"  {result.name}: {result.status_code} {result.error}")
+        return "\n".join(lines)
+
+
+def get_existing_policies(tenant: OmniAPIClient, payloads: List[dict]) -> Dict[str, dict]:
+    """
+    Policy name mapped to the policy for the whole tenant, read with one paginated sweep instead of a search per
+    payload. When all payloads share a policy_type the sweep is narrowed to it.
     """
-    Get or create Policy
+    policy_types = {payload.get("policy_type") for payload in payloads}
+    query_params = {"limit": 100}
+    if len(policy_types) == 1 and None not in policy_types:
+        query_params["policy_type"] = policy_types.pop()
+    policies = tenant.get_all_results(Policy.search(query_params=query_params))
+    existing = {}
+    for policy in policies:
+        # Keep the first match, like the first search result of get_policy_by_name
+        existing.setdefault(policy["name"], policy)
+    return existing
 
-    :param tenant: Omni Connector Session for making requests for the current tenant
-    :param payload: Payload to get/create policy
-    :param ms_id: Monitored service ID of specific service type, Defaults None.
 
-    :return: Policy ID
+def get_existing_policy_ids(tenant: OmniAPIClient, payloads: List[dict]) -> Dict[str, int]:
+    """
+    Policy name mapped to ID, see `get_existing_policies`
+    """
+    return {
+        name: policy["id"]
+        for name, policy in get_existing_policies(tenant, payloads).items()
+    }
+
+
+def create_policy(tenant: OmniAPIClient, payload: dict) -> PolicyCreateResult:
+    """
+    Create one policy, reporting a failure instead of raising
     """
+    name = payload["name"]
     try:
-        policy_json = get_policy_by_name(tenant, payload["name"])
-        if len(policy_json):
-            try:
-                return policy_json[0]["id"]
-            except (KeyError, IndexError) as json_error:
-                check.fail(f"Error retrieving policy ID: {str(json_error)}")
-        else:
-            # If policy doesn't exist, create a Policy with the payload
-            if ms_id:
-                payload["monitored_services"] = [ms_id]
-            return int(
-                get_parameter_response(
-                    tenant.post(Policy.base_path, json=payload),
-                    "id",
-                    HTTPStatus.CREATED,
-                )
-            )
-    except JSONDecodeError as json_decode_error:
-        check.fail(f"JSON Decode Error: {str(json_decode_error)}")
+        response = tenant.post(Policy.base_path, json=payload)
     except Exception as e:
-        check.fail(f"An unexpected error occurred: {str(e)}")
+        return PolicyCreateResult(name, FAILED, error=f"{type(e).__name__}: {e}")
+    if response.status_code != HTTPStatus.CREATED:
+        return PolicyCreateResult(
+            name, FAILED, status_code=response.status_code, error=response.text[:500]
+        )
+    try:
+        policy_id = int(response.json()["id"])
+    except (JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        return PolicyCreateResult(
+            name, FAILED, status_code=response.status_code, error=f"No policy id in response: {e}"
+        )
+    return PolicyCreateResult(name, CREATED, policy_id, response.status_code)
+
+
+def bulk_create_policies(
+    tenant: OmniAPIClient,
+    payloads: List[dict],
+    max_workers: int = BULK_CREATE_WORKERS,
+) -> BulkCreateResult:
+    """
+    Get or create many policies at once, e.g. the IS/NOT policies of every service type when seeding a tenant.
+    Existing policies are looked up with one paginated read, the missing ones are created concurrently with at most
+    `max_workers` requests in flight. A failed create doesn't stop the others; check `failed` or `report()`.
+
+    :param tenant: Omni Connector Session for making requests for the current tenant
+    :param payloads: Policy payloads, see `create_policy_payload`. Payloads with a name seen before are skipped.
+    :param max_workers: Maximum number of concurrent creates
+    :return: Result per unique policy name, in payload order
+    """
+    unique_payloads: Dict[str, dict] = {}
+    for payload in payloads:
+        unique_payloads.setdefault(payload["name"], payload)
+    if not unique_payloads:
+        return BulkCreateResult()
+
+    existing = get_existing_policy_ids(tenant, list(unique_payloads.values()))
+    results: Dict[str, PolicyCreateResult] = {
+        name: PolicyCreateResult(name, EXISTING, existing[name])
+        for name in unique_payloads
+        if name in existing
+    }
+    missing = [payload for name, payload in unique_payloads.items() if name not in existing]
+    if missing:
+        # Worker threads run in copies of the caller's context, so the creates honour the test's deadline
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for result in executor.map(
+                lambda payload: context.copy().run(create_policy, tenant, payload), missing
+            ):
+                results[result.name] = result
+
+    bulk_result = BulkCreateResult([results[name] for name in unique_payloads])
+    logger.info(bulk_result.report())
+    return bulk_result
@@ -0,0 +1,214 @@
+"""
+Declarative setup of test tenant policies: describe the policies a test needs, `plan` diffs them against the tenant
+and `apply` sends only the creates and patches that are missing.
+
+    reconciler = PolicyReconciler(tenant)
+    plan = reconciler.plan([DesiredPolicy("omni-test-asana_IS", ServiceTypes.asana, monitored_services=(ms_id,))])
+    result = reconciler.apply(plan)
+"""
+
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Dict, List, Tuple
+
+from requests import JSONDecodeError
+
+from src.api.v1.core.policy import Policy
+from src.api.v1.omniapiclient import OmniAPIClient
+from src.enums import PolicyModes
+from tests.app_factory.policies.policy_helpers import (
+    BULK_CREATE_WORKERS,
+    create_policy_payload,
+    get_existing_policies,
+)
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+UPDATE = "update"
+
+
+def monitored_service_ids(policy: Dict[str, Any]) -> Tuple[int, ...]:
+    """
+    Sorted IDs of the monitored services attached to a policy; the API may list IDs or monitored service objects
+    """
+    return tuple(
+        sorted(
+            item["id"] if isinstance(item, dict) else int(item)
+            for item in policy.get("monitored_services") or []
+        )
+    )
+
+
+@dataclass(frozen=True)
+class DesiredPolicy:
+    name: str
+    service_type: str
+    mode: str = PolicyModes.blacklist
+    role: str = "monitored_service_config"
+    # Exact set of attached monitored services; None leaves whatever is attached alone
+    monitored_services: Tuple[int, ...] | None = None
+
+    @classmethod
+    def from_payload(
+        cls, payload: Dict[str, Any], monitored_services: Tuple[int, ...] | None = None
+    ) -> "DesiredPolicy":
+        """
+        Desired state of a payload built with `create_policy_payload`
+        """
+        return cls(
+            name=payload["name"],
+            service_type=payload["policy_type"],
+            mode=payload.get("mode", PolicyModes.blacklist),
+            role=payload.get("role", "monitored_service_config"),
+            monitored_services=monitored_services,
+        )
+
+    def payload(self) -> Dict[str, Any]:
+        payload = create_policy_payload(self.name, self.service_type, self.mode, self.role)
+        if self.monitored_services is not None:
+            payload["monitored_services"] = list(self.monitored_services)
+        return payload
+
+    def diff(self, actual: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fields to patch so that `actual` matches this desired state, empty when it already does
+        """
+        changes = {}
+        for name in ("mode", "role"):
+            if name in actual and actual[name] != getattr(self, name):
+                changes[name] = getattr(self, name)
+        if self.monitored_services is not None and monitored_service_ids(actual) != tuple(
+            sorted(self.monitored_services)
+        ):
+            changes["monitored_services"] = list(self.monitored_services)
+        return changes
+
+
+@dataclass
+class PolicyChange:
+    action: str
+    name: str
+    # Full payload for a create, changed fields only for an update
+    payload: Dict[str, Any]
+    policy_id: int | None = None
+
+
+@dataclass
+class Plan:
+    changes: List[PolicyChange] = field(default_factory=list)
+    # Policies already in the desired state, name mapped to ID
+    unchanged: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def is_converged(self) -> bool:
+        return not self.changes
+
+    def __str__(self) -> str:
+        lines = [
+            f"{len(self.changes)} change(s), {len(self.unchanged)} policies unchanged"
+        ]
+        for change in self.changes:
+            target = f" ({change.policy_id})" if change.policy_id else ""
+            lines.append(f"  {change.action} {change.name}{target}: {sorted(change.payload)}")
+        return "\n".join(lines)
+
+
+@dataclass
+class ApplyResult:
+    policy_ids: Dict[str, int] = field(default_factory=dict)
+    # Failed changes with the reason
+    failed: List[Tuple[PolicyChange, str]] = field(default_factory=list)
+
+    def report(self) -> str:
+        lines = [f"{len(self.policy_ids)} policies in the desired state, {len(self.failed)} change(s) failed"]
+        for change, reason in self.failed:
+            lines.append(f"  {change.action} {change.name}: {reason}")
+        return "\n".join(lines)
+
+
+class PolicyReconciler:
+    """
+    Converges the policies of a tenant to a desired state with a bulk read and the minimal set of concurrent writes
+    """
+
+    def __init__(self, tenant: OmniAPIClient, max_workers: int = BULK_CREATE_WORKERS):
+        """
+        :param tenant: Omni Connector Session for making requests for the tenant
+        :param max_workers: Maximum number of concurrent creates/patches
+        """
+        self.tenant = tenant
+        self.max_workers = max_workers
+
+    def plan(self, desired: List[DesiredPolicy]) -> Plan:
+        """
+        Fetch the actual policies in bulk and compute the creates and patches needed to reach `desired`
+        """
+        unique: Dict[str, DesiredPolicy] = {}
+        for policy in desired:
+            unique.setdefault(policy.name, policy)
+        plan = Plan()
+        if not unique:
+            return plan
+
+        actual = get_existing_policies(
+            self.tenant, [policy.payload() for policy in unique.values()]
+        )
+        for name, policy in unique.items():
+            if name not in actual:
+                plan.changes.append(PolicyChange(CREATE, name, policy.payload()))
+                continue
+            changes = policy.diff(actual[name])
+            if changes:
+                plan.changes.append(PolicyChange(UPDATE, name, changes, actual[name]["id"]))
+            else:
+                plan.unchanged[name] = actual[name]["id"]
+        logger.info(f"Policy plan for {self.tenant.base_url}\n{plan}")
+        return plan
+
+    def apply(self, plan: Plan) -> ApplyResult:
+        """
+        Send the planned creates and patches concurrently; a failed change doesn't stop the others
+        """
+        result = ApplyResult(policy_ids=dict(plan.unchanged))
+        if plan.changes:
+            # Worker threads run in copies of the caller's context, so the changes honour the test's deadline
+            context = contextvars.copy_context()
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for change, policy_id, reason in executor.map(
+                    lambda change: context.copy().run(self._apply_change, change), plan.changes
+                ):
+                    if reason:
+                        result.failed.append((change, reason))
+                    else:
+                        result.policy_ids[change.name] = policy_id
+        if result.failed:
+            logger.error(result.report())
+        return result
+
+    def reconcile(self, desired: List[DesiredPolicy]) -> ApplyResult:
+        return self.apply(self.plan(desired))
+
+    def _apply_change(self, change: PolicyChange) -> Tuple[PolicyChange, int | None, str]:
+        try:
+            if change.action == CREATE:
+                response = self.tenant.post(Policy.base_path, json=change.payload)
+                expected_status = HTTPStatus.CREATED
+            else:
+                response = self.tenant.patch(
+                    Policy.get_single_item_url(change.policy_id), json=change.payload
+                )
+                expected_status = HTTPStatus.OK
+        except Exception as e:
+            return change, None, f"{type(e).__name__}: {e}"
+        if response.status_code != expected_status:
+            return change, None, f"status {response.status_code} {response.text[:500]}"
+        if change.action == UPDATE:
+            return change, change.policy_id, ""
+        try:
+            return change, int(response.json()["id"]), ""
+        except (JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            return change, None, f"No policy id in response: {e}"
@@ -0,0 +1,140 @@
+"""
+Registry that performs policy setup steps once and shares the resulting IDs between tests and modules
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List
+
+import definitions
+from src.api.v1.core.policy import Policy
+from src.api.v1.omniapiclient import OmniAPIClient
+from src.tools.json_cache import load_json_cache, update_json_cache
+
+logger = logging.getLogger(__name__)
+
+# Set to a truthy value to keep policy IDs between runs; cached IDs are validated before they are reused
+REUSE_ENV_VAR = "OMNI_REUSE_POLICY_SETUP"
+DEFAULT_CACHE_PATH = definitions.LOGS_DIR / "policy_setup_cache.json"
+
+
+def payload_hash(payloads: Any) -> str:
+    """
+    Stable hash of the policy payload(s) a setup step was created from
+    """
+    encoded = json.dumps(payloads, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def policies_exist(
+    tenant: OmniAPIClient, policy_ids: Dict[str, int], payloads: List[Dict[str, Any]]
+) -> bool:
+    """
+    Validate IDs cached by a previous run: every policy must still exist and carry the name from its payload
+    """
+    expected_names = {payload.get("name") for payload in payloads}
+    for policy_id in policy_ids.values():
+        response = tenant.get(Policy.get_single_item_url(policy_id))
+        if response.status_code != HTTPStatus.OK:
+            return False
+        if response.json().get("name") not in expected_names:
+            return False
+    return True
+
+
+class PolicySetupRegistry:
+    """
+    Caches policy setup results keyed by tenant, service type and payload hash. Within a session every key is set
+    up once; with persistence enabled the IDs are also written to `cache_path` and reused by later runs after
+    `policies_exist` confirms they are still valid.
+    """
+
+    def __init__(self, cache_path: Path | None = None):
+        """
+        :param cache_path: File to persist policy IDs between runs. None keeps the registry in memory only.
+        """
+        self.cache_path = cache_path
+        self._policy_ids: Dict[str, Dict[str, int]] = {}
+        self._persisted: Dict[str, Dict[str, int]] = self._load()
+        self._done: set = set()
+        # Guards the dicts and the cache file; every key has its own lock held during its setup
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    @staticmethod
+    def key(tenant: OmniAPIClient, service_type: str, payloads: Any) -> str:
+        return f"{tenant.base_url}|{service_type}|{payload_hash(payloads)}"
+
+    def get_or_create_policy_ids(
+        self,
+        tenant: OmniAPIClient,
+        service_type: str,
+        payloads: List[Dict[str, Any]],
+        setup: Callable[[], Dict[str, int]],
+    ) -> Dict[str, int]:
+        """
+        Return the policy IDs for `payloads`, running `setup` only when neither this session nor a valid previous
+        run already produced them
+
+        :param tenant: Omni connector of the tenant the policies live in
+        :param service_type: Service type of the policies
+        :param payloads: Policy payloads the IDs are created from
+        :param setup: Callable that searches/creates the policies and returns polarity type mapped to policy ID
+        :return: Polarity type mapped to its policy ID
+        """
+        key = self.key(tenant, service_type, payloads)
+        with self._key_lock(key):
+            if key in self._policy_ids:
+                return dict(self._policy_ids[key])
+
+            cached = self._persisted.get(key)
+            if cached and policies_exist(tenant, cached, payloads):
+                logger.info(f"Reusing policy setup from a previous run for {key}")
+                self._policy_ids[key] = cached
+                return dict(cached)
+
+            policy_ids = setup()
+            # A failed lookup leaves None behind; don't share it with other tests
+            if all(isinstance(policy_id, int) for policy_id in policy_ids.values()):
+                self._policy_ids[key] = policy_ids
+                with self._lock:
+                    self._save(key, policy_ids)
+            return dict(policy_ids)
+
+    def run_once(self, key: Hashable, setup: Callable[[], bool]) -> bool:
+        """
+        Run a setup step (e.g. attaching a monitored service to policies) once per session for `key`. A step that
+        reports a failure is not recorded, the next test needing it runs it again.
+
+        :param key: Identifies the step, e.g. tenant, monitored service and policy IDs
+        :param setup: Callable performing the step and returning whether it succeeded
+        :return: True if the step succeeded, in this call or an earlier one
+        """
+        with self._key_lock(key):
+            if key in self._done:
+                return True
+            if not setup():
+                return False
+            self._done.add(key)
+            return True
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        """
+        Lock of one key, so steps of different tenants or policies run concurrently and a step runs once
+        """
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _load(self) -> Dict[str, Dict[str, int]]:
+        return load_json_cache(self.cache_path, "policy setup cache")
+
+    def _save(self, key: str, policy_ids: Dict[str, int]) -> None:
+        if not self.cache_path:
+            return
+        self._persisted = update_json_cache(
+            self.cache_path, lambda persisted: persisted.update({key: policy_ids}), "policy setup cache"
+        )
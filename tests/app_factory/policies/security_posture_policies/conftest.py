@@ -1,24 +1,50 @@
+import os
 import pytest
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
+from pytest_check import check
 from tests.app_factory.policies.security_posture_policies.security_posture_policy_helpers import (
-    add_monitored_service,
     IS_ID,
     NOT_ID,
     ALL_ID,
 )
-from tests.app_factory.policies.policy_helpers import get_or_create_policy
+from tests.app_factory.policies.policy_reconciler import DesiredPolicy, PolicyReconciler
+from tests.app_factory.policies.policy_setup_registry import (
+    DEFAULT_CACHE_PATH,
+    REUSE_ENV_VAR,
+    PolicySetupRegistry,
+)
+
+# The index is built by the root conftest's fixture, it is only needed here for the annotation
+if TYPE_CHECKING:
+    from src.tools.monitored_service_index import MonitoredServiceIndex
+
+
+@pytest.fixture(scope="session")
+def policy_setup_registry() -> PolicySetupRegistry:
+    """
+    Session wide registry so policies of the same tenant, service type and payload are set up once and shared by
+    every test module. Set OMNI_REUSE_POLICY_SETUP to also reuse (validated) policy IDs from previous runs.
+
+    :return: Policy setup registry
+    """
+    cache_path = DEFAULT_CACHE_PATH if os.getenv(REUSE_ENV_VAR) else None
+    return PolicySetupRegistry(cache_path=cache_path)
 
 
 @pytest.fixture()
 def get_or_create_polarity_policy_ids(
     request: pytest.FixtureRequest,
     list_all_policy_polarity_payload: List[Dict[str, Any]],
+    service_type: str,
+    policy_setup_registry: PolicySetupRegistry,
 ) -> Dict[str, int]:
     """
     Returns a List of policy id for the policy with BOTH polarity rules for passed tenant in a tenant marker
 
     :param request: pytest request to fetch `tenant` marker's value
     :param list_all_policy_polarity_payload: List of policy payload for both polarity IS and IS NOT policies
+    :param service_type: Service type of the policies
+    :param policy_setup_registry: Registry sharing the policy ids between tests
 
     :return: List of policy ids
     """
@@ -34,41 +60,83 @@ def get_or_create_polarity_policy_ids(
         else request.getfixturevalue(tenant_marker.args[0])
     )
 
-    # Iterate for both polarity policies IS & NOT and fetch the policy id of that policy
-    for index, policy_polarity_payload in enumerate(list_all_policy_polarity_payload):
-        polarity_policy_ids_mapping[polarity_types[index]] = get_or_create_policy(
-            selected_tenant, policy_polarity_payload
+    def setup() -> Dict[str, int]:
+        # One bulk read for all polarity policies IS & NOT, creating only the missing ones
+        result = PolicyReconciler(selected_tenant).reconcile(
+            [DesiredPolicy.from_payload(payload) for payload in list_all_policy_polarity_payload]
         )
-
-    return polarity_policy_ids_mapping
+        if result.failed:
+            check.fail(result.report())
+        for index, policy_polarity_payload in enumerate(
+            list_all_policy_polarity_payload
+        ):
+            polarity_policy_ids_mapping[polarity_types[index]] = result.policy_ids.get(
+                policy_polarity_payload["name"]
+            )
+        return polarity_policy_ids_mapping
+
+    return policy_setup_registry.get_or_create_policy_ids(
+        selected_tenant, service_type, list_all_policy_polarity_payload, setup
+    )
 
 
 @pytest.fixture()
-def ms_id(service_type: str) -> int:
+def ms_id(
+    request: pytest.FixtureRequest,
+    service_type: str,
+    monitored_service_index: "MonitoredServiceIndex",
+) -> int:
     """
-    Returns monitored service id
+    Returns the id of a monitored service of the service type in the tenant of the tenant marker. Use the `conditions`
+    marker to require field values, e.g. `@pytest.mark.conditions(is_active=True)`. For the default tenant a match
+    from PREFERRED_MONITORED_SERVICES is used first.
+
+    :param request: pytest request to fetch `tenant` and `conditions` markers' values
     :param service_type: Service type
+    :param monitored_service_index: Monitored services per tenant, swept once per session
     :return: Monitored service id
     """
-    if service_type == "asana":
-        return 79292
-    elif service_type == "auth0":
-        return 79297
-    return 79286
+    tenant_marker = request.node.get_closest_marker("tenant")
+    conditions_marker = request.node.get_closest_marker("conditions")
+    conditions = {}
+    if conditions_marker:
+        conditions = {**(conditions_marker.args[0] if conditions_marker.args else {}), **conditions_marker.kwargs}
+
+    # If no value in tenant marker is passed, default tenant from OMNI_ENV is selected
+    if tenant_marker:
+        selected_tenant = request.getfixturevalue(tenant_marker.args[0])
+        preferred = None
+    else:
+        selected_tenant = request.getfixturevalue("tenant")
+        preferred = request.getfixturevalue("tenant_config").preferred_monitored_services.get(str(service_type))
+
+    monitored_service_id = monitored_service_index.ms_id(selected_tenant, service_type, conditions, preferred)
+    if monitored_service_id is None:
+        pytest.fail(
+            f"No active {service_type} monitored service matching {conditions} in {selected_tenant.base_url}, "
+            f"set PREFERRED_MONITORED_SERVICES to pick one"
+        )
+    return monitored_service_id
 
 
 @pytest.fixture()
 def add_monitored_service_to_policy(
     request: pytest.FixtureRequest,
     ms_id: int,
+    list_all_policy_polarity_payload: List[Dict[str, Any]],
     get_or_create_polarity_policy_ids,
+    policy_setup_registry: PolicySetupRegistry,
 ):
     """
-    Attaches an MS to both policies so that rbac rules can be created with rbac elements for passed tenant in a tenant marker
+    Attaches an MS to both policies so that rbac rules can be created with rbac elements for passed tenant in a tenant marker.
+    Policies that already have exactly this MS attached are not patched; the check runs once per session for the same
+    tenant, MS and policies.
 
     :param request: pytest request to fetch `tenant` marker's value
+    :param list_all_policy_polarity_payload: List of policy payload for both polarity IS and IS NOT policies
     :param get_or_create_polarity_policy_ids: Fixture to get polarity type mapped with its policy ID
     :param ms_id: Monitored service id
+    :param policy_setup_registry: Registry tracking the setup steps already done in this session
 
     :return: None
     """
@@ -81,8 +149,19 @@ def add_monitored_service_to_policy(
         else request.getfixturevalue(tenant_marker.args[0])
     )
 
-    add_monitored_service(
-        tenant=selected_tenant,
-        service_ms_id=ms_id,
-        list_of_policies=list(get_or_create_polarity_policy_ids.values()),
+    def attach_monitored_service() -> bool:
+        result = PolicyReconciler(selected_tenant).reconcile(
+            [
+                DesiredPolicy.from_payload(payload, monitored_services=(ms_id,))
+                for payload in list_all_policy_polarity_payload
+            ]
+        )
+        if result.failed:
+            check.fail(f"Monitored Service {ms_id} could not be attached\n{result.report()}")
+        return not result.failed
+
+    list_of_policies = list(get_or_create_polarity_policy_ids.values())
+    policy_setup_registry.run_once(
+        ("add_monitored_service", selected_tenant.base_url, ms_id, tuple(list_of_policies)),
+        attach_monitored_service,
     )
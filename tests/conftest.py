@@ -1,10 +1,24 @@
 import os
 import pytest
+from typing import TYPE_CHECKING
 
-from src.api.v1.omniapiclient import OmniAPIClient
-from src.tenants.config import TenantConfig
+# Imported lazily, like the root conftest, to keep loading the conftest files fast
+if TYPE_CHECKING:
+    from src.api.v1.omniapiclient import OmniAPIClient
+    from src.tenants.config import TenantConfig
+
+
+def _password(name: str) -> str | None:
+    from src.tenants.config import get_setting
+
+    return get_setting(name, os.getenv("OMNI_ENV"))
+
+
+def _login(tenant_config: "TenantConfig") -> "OmniAPIClient":
+    from tests.helper import get_tenant_from_config
+
+    return get_tenant_from_config(tenant_config)
 
-from tests.helper import get_tenant_from_config
 
 """
 Coretest Tenant
@@ -12,45 +26,47 @@ Coretest Tenant
 
 
 @pytest.fixture(scope="session")
-def tenant_config_coretest():
-    config = TenantConfig()
-    config.base_url = "https://coretest.int.appomni.com/"
-    config.username = "coretest@appomni.com"
-    config.password = os.getenv("INT_CORE_PW")
-    if config.password is None:
+def tenant_config_coretest(tenant_config: "TenantConfig") -> "TenantConfig":
+    password = _password("INT_CORE_PW")
+    if password is None:
         raise ValueError("INT_CORE_PW environment variable is not set.")
-    return config
+    return tenant_config.replace(
+        base_url="https://coretest.int.appomni.com/",
+        username="coretest@appomni.com",
+        password=password,
+    )
 
 
 @pytest.fixture(scope="session")
-def coretest_tenant(tenant_config_coretest) -> OmniAPIClient:
+def coretest_tenant(tenant_config_coretest) -> "OmniAPIClient":
     """
     OmniConnector Session for the current logged in tenant.
 
     :return: Omni Connector Session for making requests for the current tenant.
     """
-    return get_tenant_from_config(tenant_config_coretest)
+    return _login(tenant_config_coretest)
 
 
 @pytest.fixture(scope="session")
-def tenant_config_msftdev():
-    config = TenantConfig()
-    config.base_url = "https://msftagentdev.int.appomni.com/"
-    config.username = "omni-test-connections"
-    config.password = os.getenv("INT_MSFTDEV_PW")
-    if config.password is None:
+def tenant_config_msftdev(tenant_config: "TenantConfig") -> "TenantConfig":
+    password = _password("INT_MSFTDEV_PW")
+    if password is None:
         raise ValueError("INT_MSFTDEV_PW environment variable is not set.")
-    return config
+    return tenant_config.replace(
+        base_url="https://msftagentdev.int.appomni.com/",
+        username="omni-test-connections",
+        password=password,
+    )
 
 
 @pytest.fixture(scope="session")
-def msft_tenant(tenant_config_msftdev) -> OmniAPIClient:
+def msft_tenant(tenant_config_msftdev) -> "OmniAPIClient":
     """
     OmniConnector Session for the current logged in tenant.
 
     :return: Omni Connector Session for making requests for the current tenant.
     """
-    return get_tenant_from_config(tenant_config_msftdev)
+    return _login(tenant_config_msftdev)
 
 
 """
@@ -59,24 +75,25 @@ Slack Tenant
 
 
 @pytest.fixture(scope="session")
-def tenant_config_slackdev():
-    config = TenantConfig()
-    config.base_url = "https://slackdev.int.appomni.com/"
-    config.username = "omni-test-reports"
-    config.password = os.getenv("INT_SLACK_PW")
-    if config.password is None:
+def tenant_config_slackdev(tenant_config: "TenantConfig") -> "TenantConfig":
+    password = _password("INT_SLACK_PW")
+    if password is None:
         raise ValueError("INT_SLACK_PW environment variable is not set.")
-    return config
+    return tenant_config.replace(
+        base_url="https://slackdev.int.appomni.com/",
+        username="omni-test-reports",
+        password=password,
+    )
 
 
 @pytest.fixture(scope="session")
-def slack_tenant(tenant_config_slackdev) -> OmniAPIClient:
+def slack_tenant(tenant_config_slackdev) -> "OmniAPIClient":
     """
     OmniConnector Session for the current logged in tenant.
 
     :return: Omni Connector Session for making requests for the current tenant.
     """
-    return get_tenant_from_config(tenant_config_slackdev)
+    return _login(tenant_config_slackdev)
 
 
 """
@@ -85,21 +102,22 @@ Smoketest Tenant
 
 
 @pytest.fixture(scope="session")
-def tenant_config_smoketest():
-    config = TenantConfig()
-    config.base_url = "https://smoketest.int.appomni.com/"
-    config.username = "omni-test-pipeline"
-    config.password = os.getenv("INT_SMOKE_PIPELINE_PW")
-    if config.password is None:
+def tenant_config_smoketest(tenant_config: "TenantConfig") -> "TenantConfig":
+    password = _password("INT_SMOKE_PIPELINE_PW")
+    if password is None:
         raise ValueError("INT_SMOKE_PIPELINE_PW environment variable is not set.")
-    return config
+    return tenant_config.replace(
+        base_url="https://smoketest.int.appomni.com/",
+        username="omni-test-pipeline",
+        password=password,
+    )
 
 
 @pytest.fixture(scope="session")
-def smoketest_tenant(tenant_config_smoketest) -> OmniAPIClient:
+def smoketest_tenant(tenant_config_smoketest) -> "OmniAPIClient":
     """
     OmniConnector Session for the current logged in tenant.
 
     :return: Omni Connector Session for making requests for the current tenant.
     """
-    return get_tenant_from_config(tenant_config_smoketest)
+    return _login(tenant_config_smoketest)
@@ -0,0 +1,94 @@
+"""
+Local stand-in for a tenant's API, served by a ThreadingHTTPServer on 127.0.0.1 for client concurrency tests
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+LOGIN_PATH = "/api/v1/core/user/login/"
+ECHO_PATH = "/api/v1/echo/"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Every client thread opens its own connection at once, the default backlog of 5 would stall them for a second
+    request_queue_size = 128
+
+
+class StubTenant:
+    """
+    Accepts only the session of the latest login. After `expire_every` echo requests the session expires, like a
+    tenant does during a long run. `GET /api/v1/echo/?n=..` answers with the query and the request's headers.
+    """
+
+    def __init__(self, expire_every: int = 0):
+        self.expire_every = expire_every
+        self.lock = threading.Lock()
+        self.session_id = 0
+        self.logins = 0
+        self.requests = 0
+        self.server = _Server(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def __enter__(self) -> "StubTenant":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: dict):
+                encoded = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path != LOGIN_PATH:
+                    return self._send(404, {"detail": "Not found."})
+                with stub.lock:
+                    stub.logins += 1
+                    stub.session_id += 1
+                    session_id = stub.session_id
+                self._send(200, {"csrf": f"csrf{session_id}", "session": {"id": f"s{session_id}"}})
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path != ECHO_PATH:
+                    return self._send(404, {"detail": "Not found."})
+                with stub.lock:
+                    stub.requests += 1
+                    valid = f"session s{stub.session_id}"
+                    if stub.expire_every and stub.requests % stub.expire_every == 0:
+                        stub.session_id += 1
+                if self.headers.get("Authorization") != valid:
+                    return self._send(403, {"detail": "Authentication credentials were not provided."})
+                self._send(
+                    200,
+                    {
+                        "query": dict(parse_qsl(url.query)),
+                        "authorization": self.headers.get("Authorization"),
+                        "request_id": self.headers.get("X-Request-Id"),
+                    },
+                )
+
+        return Handler
@@ -0,0 +1,206 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.api.base_api import BaseAPI, EndpointTemplate
+from src.api.v1.omniapiclient import API_PROXY_ENV_VAR, UPSTREAM_HEADER, OmniAPIClient
+from src.tools.api_proxy import (
+    CACHE_STATUS_HEADER,
+    HIT,
+    MISS,
+    PASS,
+    SHARED,
+    ApiProxy,
+    ProxiedResponse,
+    SingleFlight,
+)
+from tests.unit.stub_tenant import StubTenant
+
+WORKERS = 4
+UPSTREAM = {UPSTREAM_HEADER: "https://tenant.invalid/"}
+
+
+class Echo(BaseAPI):
+    base_path = "api/v1/echo/"
+
+    page = EndpointTemplate("?n={n}")
+    status = EndpointTemplate("?status={n}", cacheable=False)
+
+
+@pytest.fixture
+def stub():
+    with StubTenant() as stub:
+        yield stub
+
+
+def proxy_client(stub: StubTenant, proxy: ApiProxy) -> OmniAPIClient:
+    client = OmniAPIClient(stub.base_url, verify_ssl=False, api_proxy=proxy.url)
+    client.session.trust_env = False
+    return client
+
+
+def test_client_routes_through_the_proxy_from_the_environment(monkeypatch):
+    monkeypatch.setenv(API_PROXY_ENV_VAR, "http://127.0.0.1:8765")
+    client = OmniAPIClient("https://tenant.example.com/")
+    headers = {}
+
+    assert client.api_proxy == "http://127.0.0.1:8765/"
+    assert client._route("https://tenant.example.com/api/v1/core/policy/?limit=50", headers) == (
+        "http://127.0.0.1:8765/api/v1/core/policy/?limit=50"
+    )
+    assert headers["X-Omni-Upstream"] == "https://tenant.example.com/"
+    assert OmniAPIClient("https://tenant.example.com/", api_proxy="").api_proxy == ""
+
+
+def test_workers_share_one_login(stub):
+    with ApiProxy(port=0, cache_ttl=0) as proxy:
+        clients = [proxy_client(stub, proxy) for _ in range(WORKERS)]
+        for client in clients:
+            assert client.user_login("omni-test", "secret").status_code == 200
+
+        for number, client in enumerate(clients):
+            response = client.get(f"api/v1/echo/?n={number}")
+            assert response.status_code == 200
+            assert response.json()["query"] == {"n": str(number)}
+
+    assert stub.logins == 1
+
+
+def test_get_responses_are_cached_until_a_write(stub):
+    with ApiProxy(port=0, cache_ttl=60) as proxy:
+        client = proxy_client(stub, proxy)
+        client.user_login("omni-test", "secret")
+
+        statuses = [client.get("api/v1/echo/?n=1").headers[CACHE_STATUS_HEADER] for _ in range(3)]
+        assert statuses == [MISS, HIT, HIT]
+        assert stub.requests == 1
+
+        assert client.post("api/v1/echo/", json={}).headers[CACHE_STATUS_HEADER] == PASS
+        assert client.get("api/v1/echo/?n=1").headers[CACHE_STATUS_HEADER] == MISS
+        no_cache = client.get("api/v1/echo/?n=1", headers={"Cache-Control": "no-cache"})
+        assert no_cache.headers[CACHE_STATUS_HEADER] == PASS
+        assert stub.requests == 3
+
+
+def test_polled_status_endpoints_bypass_the_cache(stub):
+    with ApiProxy(port=0, cache_ttl=60) as proxy:
+        client = proxy_client(stub, proxy)
+        client.user_login("omni-test", "secret")
+
+        assert [client.get(Echo.page(1)).headers[CACHE_STATUS_HEADER] for _ in range(2)] == [MISS, HIT]
+        assert [client.get(Echo.status(1)).headers[CACHE_STATUS_HEADER] for _ in range(2)] == [PASS, PASS]
+        assert [client.get(client.bind(Echo.status)(1)).headers[CACHE_STATUS_HEADER] for _ in range(2)] == [
+            PASS,
+            PASS,
+        ]
+        assert stub.requests == 5
+
+
+def test_worker_login_after_an_expired_session_logs_in_upstream(stub):
+    with ApiProxy(port=0, cache_ttl=0) as proxy:
+        client = proxy_client(stub, proxy)
+        client.user_login("omni-test", "secret")
+        assert client.user_login("omni-test", "secret").headers[CACHE_STATUS_HEADER] == SHARED
+        assert stub.logins == 1
+
+        # the proxy got an expired session answer even after its own login, as when the tenant expires it twice
+        proxy.session(stub.base_url, "omni-test").expired()
+        assert client.user_login("omni-test", "secret").headers[CACHE_STATUS_HEADER] == PASS
+        assert stub.logins == 2
+        assert client.user_login("omni-test", "secret").headers[CACHE_STATUS_HEADER] == SHARED
+
+
+def test_proxy_logs_in_again_when_the_session_expires():
+    with StubTenant(expire_every=3) as stub, ApiProxy(port=0, cache_ttl=0) as proxy:
+        clients = [proxy_client(stub, proxy) for _ in range(WORKERS)]
+        for client in clients:
+            client.user_login("omni-test", "secret")
+
+        responses = [clients[number % WORKERS].get(f"api/v1/echo/?n={number}") for number in range(12)]
+
+    assert [response.status_code for response in responses] == [200] * 12
+    assert stub.logins > 1
+    # The workers kept the session of their one login through the proxy
+    assert all(client.auth_headers["Authorization"] == "session s1" for client in clients)
+
+
+def test_single_flight_runs_concurrent_calls_once():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ProxiedResponse(200, (), b"ok")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(single_flight.do, ("tenant", "path"), call)
+        started.wait(5)
+        followers = [executor.submit(single_flight.do, ("tenant", "path"), call) for _ in range(2)]
+        # Give the followers time to join the running call
+        time.sleep(0.2)
+        release.set()
+
+        assert leader.result() == (ProxiedResponse(200, (), b"ok"), False)
+        assert [future.result()[1] for future in followers] == [True, True]
+    assert len(calls) == 1
+
+
+class VersionedTenant:
+    """
+    `ApiProxy._send` stand-in: GETs answer with the number of writes applied, a write can be held in flight
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.sent = []
+        self.write_started = threading.Event()
+        self.release_write = threading.Event()
+        self.release_write.set()
+
+    def send(self, session, method, path, headers, body) -> ProxiedResponse:
+        self.sent.append(method)
+        if method == "POST":
+            self.write_started.set()
+            self.release_write.wait(5)
+            self.version += 1
+        return ProxiedResponse(200, (), str(self.version).encode())
+
+
+@pytest.fixture
+def tenant(monkeypatch):
+    tenant = VersionedTenant()
+    monkeypatch.setattr(ApiProxy, "_send", staticmethod(tenant.send))
+    return tenant
+
+
+def test_get_overlapping_a_write_is_not_served_after_it(tenant):
+    proxy = ApiProxy(port=0, cache_ttl=60)
+    tenant.release_write.clear()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        write = executor.submit(proxy.forward, "POST", "api/v1/echo/", UPSTREAM, b"{}")
+        assert tenant.write_started.wait(5)
+        # Sent while the write is in flight, the GET reads the tenant before the write is applied
+        assert proxy.forward("GET", "api/v1/echo/", UPSTREAM, b"") == (ProxiedResponse(200, (), b"0"), MISS)
+        tenant.release_write.set()
+        assert write.result()[1] == PASS
+
+    assert proxy.forward("GET", "api/v1/echo/", UPSTREAM, b"") == (ProxiedResponse(200, (), b"1"), MISS)
+    proxy.server.server_close()
+
+
+def test_head_and_options_pass_through_without_emptying_the_cache(tenant):
+    proxy = ApiProxy(port=0, cache_ttl=60)
+    statuses = [
+        proxy.forward(method, "api/v1/echo/", UPSTREAM, b"")[1]
+        for method in ("GET", "HEAD", "OPTIONS", "HEAD", "GET")
+    ]
+
+    assert statuses == [MISS, PASS, PASS, PASS, HIT]
+    assert tenant.sent == ["GET", "HEAD", "OPTIONS", "HEAD"]
+    proxy.server.server_close()
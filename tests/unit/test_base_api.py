@@ -0,0 +1,50 @@
+import pytest
+
+from src.api.base_api import BaseAPI, EndpointPath, EndpointTemplate, EndpointURL
+from src.api.v1.core.policy import Policy
+from src.api.v1.core.policyassessment import PolicyAssessment
+from src.api.v1.omniapiclient import OmniAPIClient
+
+
+def test_templates_format_paths_with_labels():
+    path = Policy.check_ctp_done(42)
+    assert path == "api/v1/core/policy/42/check_ctp_done/"
+    assert isinstance(path, EndpointPath)
+    assert path.label == "api/v1/core/policy/{policy_id}/check_ctp_done/"
+    assert Policy.get_single_item_url("7") == "api/v1/core/policy/7/"
+    assert Policy.rule_options(policy_id=3) == "api/v1/core/policy/3/new_rule_options/"
+    assert PolicyAssessment.check_status("abc") == "api/v1/core/policyassessment/check_status/?external_id=abc"
+    assert PolicyAssessment.check_status("abc").label == "api/v1/core/policyassessment/check_status/"
+    assert Policy.baseline_policy("asana").endswith("&policy_type=asana")
+    with pytest.raises(TypeError):
+        Policy.check_ctp_done()
+
+
+def test_subclass_templates_follow_its_base_path():
+    class Parent(BaseAPI):
+        base_path = "api/v1/parent/"
+        item = EndpointTemplate("{item_id}/{item_id}/")
+
+    class Child(Parent):
+        base_path = "api/v1/child/"
+
+    assert Parent.item(1) == "api/v1/parent/1/1/"
+    assert Child.item(1) == "api/v1/child/1/1/"
+
+
+def test_bound_templates_are_not_prefixed_again():
+    client = OmniAPIClient("https://tenant.example.com/")
+    bound = client.bind(Policy.check_ctp_done)
+    assert client.bind(Policy.check_ctp_done) is bound
+    url = bound(42)
+    assert isinstance(url, EndpointURL)
+    assert url == "https://tenant.example.com/api/v1/core/policy/42/check_ctp_done/"
+    assert url.label == Policy.check_ctp_done.label
+    assert client._url(url) == url
+    assert client._url(Policy.check_ctp_done(42)) == url
+
+
+def test_search_is_labelled_without_query():
+    path = Policy.search(query_params={"name": "x"})
+    assert path.startswith("api/v1/core/policy/?")
+    assert path.label == "api/v1/core/policy/"
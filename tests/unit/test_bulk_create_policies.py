@@ -0,0 +1,57 @@
+import threading
+from types import SimpleNamespace
+
+from tests.app_factory.policies.policy_helpers import (
+    CREATED,
+    EXISTING,
+    FAILED,
+    bulk_create_policies,
+    create_policy_payload,
+)
+
+
+class FakeTenant:
+    def __init__(self, existing: dict, failing: set):
+        self.existing = existing
+        self.failing = failing
+        self.searches = []
+        self.posts = []
+        self.lock = threading.Lock()
+
+    def get_all_results(self, path: str, page_limit: int = -1, **kwargs):
+        self.searches.append(path)
+        return [{"name": name, "id": policy_id} for name, policy_id in self.existing.items()]
+
+    def post(self, path: str, data=None, json=None, **kwargs):
+        with self.lock:
+            self.posts.append(json["name"])
+            policy_id = 100 + len(self.posts)
+        if json["name"] in self.failing:
+            return SimpleNamespace(status_code=400, text="bad payload", json=lambda: {})
+        return SimpleNamespace(status_code=201, text="", json=lambda: {"id": policy_id})
+
+
+def test_bulk_create_reads_once_and_reports_partial_failures():
+    payloads = [
+        create_policy_payload(f"omni-test-{service_type}_IS", service_type)
+        for service_type in ("asana", "box", "zoom", "slack")
+    ]
+    tenant = FakeTenant(
+        existing={"omni-test-asana_IS": 1}, failing={"omni-test-zoom_IS"}
+    )
+
+    result = bulk_create_policies(tenant, payloads + payloads[:1], max_workers=2)
+
+    assert len(tenant.searches) == 1
+    assert sorted(tenant.posts) == ["omni-test-box_IS", "omni-test-slack_IS", "omni-test-zoom_IS"]
+    assert [r.name for r in result.results] == [p["name"] for p in payloads]
+    assert [r.status for r in result.results] == [EXISTING, CREATED, FAILED, CREATED]
+    assert result.failed[0].status_code == 400
+    assert set(result.policy_ids) == {"omni-test-asana_IS", "omni-test-box_IS", "omni-test-slack_IS"}
+    assert "1 existing, 2 created, 1 failed" in result.report()
+
+
+def test_single_policy_type_narrows_the_read():
+    tenant = FakeTenant(existing={}, failing=set())
+    bulk_create_policies(tenant, [create_policy_payload("omni-test-box_IS", "box")])
+    assert "policy_type=%22box%22" in tenant.searches[0]
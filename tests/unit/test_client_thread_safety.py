@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api.v1.omniapiclient import OmniAPIClient
+from tests.unit.stub_tenant import StubTenant
+
+THREADS = 32
+REQUESTS_PER_THREAD = 25
+EXPIRE_EVERY = 300
+
+
+def test_shared_client_under_concurrent_load_and_relogins():
+    with StubTenant(expire_every=EXPIRE_EVERY) as stub:
+        client = OmniAPIClient(stub.base_url, verify_ssl=False)
+        # Talk to the stub directly, whatever proxy the environment configures
+        client.session.trust_env = False
+        assert client.user_login("omni-test", "secret").status_code == 200
+
+        def worker(thread: int):
+            mismatches = []
+            for number in range(REQUESTS_PER_THREAD):
+                request_id = f"{thread}-{number}"
+                response = client.get(
+                    f"api/v1/echo/?n={request_id}", headers={"X-Request-Id": request_id}
+                )
+                body = response.json()
+                if (
+                    response.status_code != 200
+                    or body["query"]["n"] != request_id
+                    or body["request_id"] != request_id
+                ):
+                    mismatches.append((request_id, response.status_code, body))
+            return mismatches
+
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            mismatches = [m for result in executor.map(worker, range(THREADS)) for m in result]
+
+        assert mismatches == []
+        expiries = stub.requests // EXPIRE_EVERY
+        # One login per expiry (plus the first), not one per thread that noticed it
+        assert stub.logins <= 1 + expiries * 2
+        assert client.auth_headers["Authorization"] == f"session s{stub.session_id}"
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.api.v1.omniapiclient import OmniAPIClient, build_result_list_from_responses
+from src.tools.columnar import ColumnBuilder
+
+PAGES = [
+    [
+        {"id": 1, "name": "a", "score": None, "monitored_service": {"id": 7}},
+        {"id": 2, "name": "b", "score": None, "monitored_service": None},
+    ],
+    [{"id": 3, "name": "c", "score": 40, "monitored_service": {"id": 8}}],
+]
+COLUMNS = ["id", "score", "monitored_service.id"]
+EXPECTED = {"id": [1, 2, 3], "score": [None, None, 40], "monitored_service.id": [7, None, 8]}
+
+
+def build(use_arrow: bool) -> ColumnBuilder:
+    builder = ColumnBuilder(COLUMNS, use_arrow=use_arrow)
+    for page in PAGES:
+        builder.add_page(page)
+    return builder
+
+
+def test_columns_without_optional_dependencies():
+    builder = build(use_arrow=False)
+    assert builder.rows == 3
+    assert builder.build("dict") == EXPECTED
+    with pytest.raises(ValueError):
+        builder.build("csv")
+
+
+def test_arrow_and_pandas_output():
+    pytest.importorskip("pyarrow")
+    pandas = pytest.importorskip("pandas")
+    table = build(use_arrow=True).build("arrow")
+    assert table.column_names == COLUMNS
+    # The all-None first page doesn't prevent the column from being typed as integers
+    assert str(table.schema.field("score").type) == "int64"
+    assert table.to_pydict() == EXPECTED
+    frame = build(use_arrow=True).build("pandas")
+    assert list(frame.columns) == COLUMNS
+    assert frame["score"].sum() == 40
+    assert isinstance(build(use_arrow=False).build("pandas"), pandas.DataFrame)
+
+
+def test_client_streams_pages_into_the_table():
+    client = OmniAPIClient("https://fake.invalid/")
+    pages = [
+        {"results": PAGES[0], "next": "https://fake.invalid/api/v1/x/?offset=2"},
+        {"results": PAGES[1], "next": None},
+    ]
+    client.session.request = lambda method, url, **kwargs: SimpleNamespace(
+        json=lambda: pages[1] if "offset=2" in url else pages[0]
+    )
+
+    assert [len(page) for page in client.iter_pages("api/v1/x/")] == [2, 1]
+    assert len(client.get_all_results("api/v1/x/")) == 3
+    assert client.get_all_results("api/v1/x/", page_limit=1) == PAGES[0]
+    assert client.get_all_results_table("api/v1/x/", COLUMNS, output="dict") == EXPECTED
+
+
+def test_results_of_responses_are_concatenated():
+    responses = [SimpleNamespace(json=lambda page=page: {"results": page}) for page in PAGES]
+    assert build_result_list_from_responses(responses) == PAGES[0] + PAGES[1]
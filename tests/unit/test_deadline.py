@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from src.api.deadline import DeadlineExceeded, deadline, remaining
+from src.api.v1.omniapiclient import OmniAPIClient
+
+
+def test_nested_deadline_only_shortens():
+    assert remaining() is None
+    with deadline(10):
+        with deadline(60):
+            assert remaining() <= 10
+        with deadline(1):
+            assert remaining() <= 1
+        with deadline(None):
+            assert 1 < remaining() <= 10
+    assert remaining() is None
+
+
+def test_client_timeouts_are_capped_by_the_deadline():
+    client = OmniAPIClient("https://fake.invalid/", timeout=(5, 30))
+    sent = []
+    client.session.request = lambda method, url, **kwargs: sent.append(kwargs["timeout"])
+
+    client.get("api/v1/x/")
+    client.post("api/v1/x/", json={}, timeout=3)
+    with deadline(2):
+        client.patch("api/v1/x/1/", json={})
+    assert sent[:2] == [(5, 30), 3]
+    assert all(0 < part <= 2 for part in sent[2])
+
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            client.delete("api/v1/x/1/")
+    assert len(sent) == 3
+
+
+@pytest.mark.deadline(5)
+def test_marker_sets_the_budget(request_deadline):
+    assert request_deadline == 5
+    assert 0 < remaining() <= 5
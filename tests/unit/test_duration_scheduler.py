@@ -0,0 +1,64 @@
+import json
+
+from src.tools.duration_scheduler import (
+    build_estimates,
+    default_estimate,
+    load_duration_history,
+    order_longest_first,
+    split_into_shards,
+)
+
+
+def write_report(path, durations: dict):
+    tests = [
+        {
+            "nodeid": nodeid,
+            "outcome": "passed",
+            "setup": {"duration": setup},
+            "call": {"duration": call},
+            "teardown": {"duration": 0.0},
+        }
+        for nodeid, (setup, call) in durations.items()
+    ]
+    path.write_text(json.dumps({"tests": tests}))
+    return str(path)
+
+
+def test_history_sums_phases_and_uses_median(tmp_path):
+    paths = [
+        write_report(tmp_path / "a.json", {"t::a": (1.0, 2.0)}),
+        write_report(tmp_path / "b.json", {"t::a": (1.0, 100.0)}),
+        write_report(tmp_path / "c.json", {"t::a": (1.0, 4.0), "t::b": (0.5, 0.5)}),
+    ]
+    estimates = build_estimates(load_duration_history(paths))
+    assert estimates == {"t::a": 5.0, "t::b": 1.0}
+
+
+def test_unreadable_history_is_skipped(tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    assert load_duration_history([str(broken), str(tmp_path / "missing.json")]) == {}
+    assert default_estimate({}) == 1.0
+
+
+def test_longest_first_keeps_collection_order_for_ties():
+    estimates = {"a": 1.0, "b": 5.0, "c": 1.0}
+    assert order_longest_first(["a", "b", "c", "d"], estimates, 3.0) == [
+        "b",
+        "d",
+        "a",
+        "c",
+    ]
+
+
+def test_shards_are_balanced_and_cover_every_test():
+    estimates = {"a": 10.0, "b": 6.0, "c": 5.0, "d": 4.0, "e": 1.0}
+    nodeids = ["e", "d", "c", "b", "a"]
+    shards = split_into_shards(nodeids, 2, estimates, 1.0)
+
+    assert sorted(nodeid for shard in shards for nodeid in shard) == sorted(nodeids)
+    loads = [sum(estimates[nodeid] for nodeid in shard) for shard in shards]
+    assert max(loads) == 14.0
+    # each shard keeps collection order
+    for shard in shards:
+        assert shard == [nodeid for nodeid in nodeids if nodeid in shard]
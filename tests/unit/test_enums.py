@@ -0,0 +1,45 @@
+import pytest
+
+from src.enums import Environments, RiskLevel, ServiceTypes, WorkflowCSVHeaders
+
+
+def test_lookup_tables_match_members():
+    assert ServiceTypes.values() == list(ServiceTypes)
+    assert ServiceTypes.names() == list(ServiceTypes.__members__)
+    assert "asana" in ServiceTypes.values()
+
+
+def test_contains_and_from_value():
+    assert Environments.contains("INT-SMOKE")
+    assert Environments.contains(Environments.prod_eu)
+    assert not Environments.contains("INT-Smoke")
+    assert ServiceTypes.from_value("zoom") is ServiceTypes.zoom
+    # values declared with a trailing comma are still looked up by their string
+    assert WorkflowCSVHeaders.from_value("Finding Status") is WorkflowCSVHeaders.finding_status
+    with pytest.raises(ValueError):
+        ServiceTypes.from_value("not-a-service")
+
+
+def test_callers_get_lists_they_can_change():
+    values = ServiceTypes.values()
+    values.append("new")
+    names = ServiceTypes.names() + ["new"]
+    assert not ServiceTypes.contains("new")
+    assert "new" not in ServiceTypes.values()
+    assert len(names) == len(ServiceTypes.names()) + 1
+
+
+RISK_SCORES = [None, 0, 1, 25, 25.5, 26, 50, 51, 75, 75.0, 76, 100, 101, -1, 0.5, float("nan")]
+
+
+def test_from_scores_matches_from_score():
+    assert RiskLevel.from_scores(RISK_SCORES) == [RiskLevel.from_score(score) for score in RISK_SCORES]
+    assert RiskLevel.from_scores(iter([None, 30])) == [RiskLevel.informational, RiskLevel.medium]
+
+
+def test_from_scores_numpy_array():
+    numpy = pytest.importorskip("numpy")
+    expected = [RiskLevel.from_score(score) for score in RISK_SCORES]
+    assert RiskLevel.from_scores(numpy.array(RISK_SCORES, dtype=object)) == expected
+    integers = numpy.arange(-5, 120)
+    assert RiskLevel.from_scores(integers) == [RiskLevel.from_score(int(score)) for score in integers]
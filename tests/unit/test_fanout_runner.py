@@ -0,0 +1,100 @@
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.tools import fanout_runner
+from src.tools.fanout_runner import (
+    ERROR,
+    FANOUT_RESULTS_DIR,
+    HEALTHCHECK_PASSED_ENV_VAR,
+    PYTEST_RUN,
+    EnvironmentResult,
+    merge_results,
+    read_junit_outcomes,
+    record_pytest_run,
+    run_environment,
+)
+from src.tools.pytest_process import PytestRun
+
+JUNIT_XML = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" errors="1" failures="1" skipped="1" tests="4">
+<testcase classname="tests.tests_tenant" name="test_tenant" time="0.1"/>
+<testcase classname="tests.tests_tenant" name="test_coretest" time="0.1"><failure message="boom"/></testcase>
+<testcase classname="tests.tests_tenant" name="test_slack_tenant" time="0.1"><error message="setup"/></testcase>
+<testcase classname="tests.tests_tenant" name="test_msft_tenant" time="0.1"><skipped message="skip"/></testcase>
+</testsuite></testsuites>
+"""
+
+
+def test_junit_outcomes():
+    assert read_junit_outcomes(ElementTree.fromstring(JUNIT_XML)) == {
+        "tests.tests_tenant::test_tenant": "passed",
+        "tests.tests_tenant::test_coretest": "failed",
+        "tests.tests_tenant::test_slack_tenant": "error",
+        "tests.tests_tenant::test_msft_tenant": "skipped",
+    }
+
+
+def test_merged_report_has_a_column_per_environment():
+    smoke = EnvironmentResult(
+        "INT-SMOKE", {"healthcheck": "passed", "t::a": "passed", "t::b": "failed"}
+    )
+    eu = EnvironmentResult(
+        "PROD-EU", {"healthcheck": "failed"}, message="Healthcheck failed"
+    )
+    assert merge_results([smoke, eu]) == [
+        ["Test", "INT-SMOKE", "PROD-EU"],
+        ["healthcheck", "passed", "failed"],
+        ["t::a", "passed", "not run"],
+        ["t::b", "failed", "not run"],
+        ["Message", "", "Healthcheck failed"],
+    ]
+
+
+def test_a_run_without_report_or_that_did_not_finish_is_an_error():
+    log_file = Path("INT-SMOKE.log")
+    report = ElementTree.fromstring(JUNIT_XML)
+
+    missing = EnvironmentResult("INT-SMOKE")
+    record_pytest_run(missing, PytestRun(0, log_file, None))
+    assert missing.outcomes == {PYTEST_RUN: ERROR}
+    assert "without a report" in missing.message
+
+    finished = EnvironmentResult("INT-SMOKE")
+    record_pytest_run(finished, PytestRun(1, log_file, report))
+    assert PYTEST_RUN not in finished.outcomes
+
+    interrupted = EnvironmentResult("INT-SMOKE")
+    record_pytest_run(interrupted, PytestRun(2, log_file, report))
+    assert interrupted.outcomes[PYTEST_RUN] == ERROR
+    assert "exited with 2" in interrupted.message
+
+
+def test_environments_run_with_their_own_files_and_skip_the_repeated_healthcheck(monkeypatch):
+    config = SimpleNamespace(base_url="https://smoketest.int.example.com/", verify_ssl=True)
+    runs = []
+
+    def run_pytest(args, files, env=None, json_report_file=None):
+        runs.append((files, env, json_report_file))
+        return PytestRun(0, Path(f"{files}.log"), ElementTree.fromstring(JUNIT_XML))
+
+    monkeypatch.setattr(fanout_runner, "get_tenant_config", lambda environment: config)
+    monkeypatch.setattr(fanout_runner, "check_health", lambda client: "passed")
+    monkeypatch.setattr(fanout_runner, "run_pytest", run_pytest)
+
+    result = run_environment("INT-SMOKE", ["tests/tests_tenant.py", "--json-report"])
+    run_environment("PROD-EU", ["tests/tests_tenant.py"])
+
+    assert result.outcomes["healthcheck"] == "passed"
+    assert runs == [
+        (
+            FANOUT_RESULTS_DIR / "INT-SMOKE",
+            {"OMNI_ENV": "INT-SMOKE", HEALTHCHECK_PASSED_ENV_VAR: config.base_url},
+            FANOUT_RESULTS_DIR / "INT-SMOKE.json",
+        ),
+        (
+            FANOUT_RESULTS_DIR / "PROD-EU",
+            {"OMNI_ENV": "PROD-EU", HEALTHCHECK_PASSED_ENV_VAR: config.base_url},
+            None,
+        ),
+    ]
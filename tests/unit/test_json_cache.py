@@ -0,0 +1,22 @@
+from src.tools.json_cache import load_json_cache, update_json_cache
+
+
+def test_updates_merge_with_what_other_processes_wrote(tmp_path):
+    path = tmp_path / "logs" / "cache.json"
+    update_json_cache(path, lambda contents: contents.update({"a": 1}), "cache")
+    # another process writing its own entry in between
+    update_json_cache(path, lambda contents: contents.update({"b": 2}), "cache")
+
+    assert load_json_cache(path, "cache") == {"a": 1, "b": 2}
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_missing_or_unreadable_files_are_empty(tmp_path):
+    path = tmp_path / "cache.json"
+    assert load_json_cache(None, "cache") == {}
+    assert load_json_cache(path, "cache") == {}
+    path.write_text("{not json")
+    assert load_json_cache(path, "cache") == {}
+    path.write_text("[1, 2]")
+    assert load_json_cache(path, "cache") == {}
+    assert update_json_cache(None, lambda contents: contents.update({"a": 1}), "cache") == {}
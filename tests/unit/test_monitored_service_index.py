@@ -0,0 +1,59 @@
+import json
+import time
+
+from src.tools.monitored_service_index import MonitoredServiceIndex
+
+MONITORED_SERVICES = [
+    {"id": 12, "name": "asana-prod", "service_type": "asana", "is_active": True},
+    {"id": 5, "name": "asana-old", "service_type": "asana", "is_active": False},
+    {"id": 7, "name": "auth0", "service_type": "auth0", "is_active": True},
+    {"id": 3, "name": "zoom-disabled", "service_type": "zoom", "is_active": True, "enabled": False},
+]
+
+
+class FakeTenant:
+    base_url = "https://fake.invalid/"
+
+    def __init__(self):
+        self.sweeps = []
+
+    def get_all_results(self, path: str, page_limit: int = -1, **kwargs):
+        self.sweeps.append(path)
+        return [dict(monitored_service) for monitored_service in MONITORED_SERVICES]
+
+
+def test_one_sweep_serves_every_lookup(tmp_path):
+    index = MonitoredServiceIndex(cache_path=tmp_path / "index.json")
+    tenant = FakeTenant()
+
+    assert index.ms_id(tenant, "asana") == 12
+    assert index.ms_id(tenant, "asana", {"is_active": True}) == 12
+    assert index.ms_id(tenant, "asana", preferred="asana-prod") == 12
+    assert index.ms_id(tenant, "asana", preferred=999) == 12
+    assert index.ms_id(tenant, "asana", preferred="asana-old") == 5
+    assert index.ms_id(tenant, "asana", {"is_active": False}) == 5
+    assert index.ms_id(tenant, "auth0") == 7
+    assert index.ms_id(tenant, "zoom") is None
+    assert len(tenant.sweeps) == 1
+    assert tenant.sweeps[0].startswith("api/v1/core/monitoredservice/?")
+
+
+def test_persisted_sweep_is_reused_until_it_expires(tmp_path):
+    cache_path = tmp_path / "index.json"
+    MonitoredServiceIndex(cache_path=cache_path).ms_id(FakeTenant(), "auth0")
+
+    tenant = FakeTenant()
+    assert MonitoredServiceIndex(cache_path=cache_path).ms_id(tenant, "auth0") == 7
+    assert tenant.sweeps == []
+
+    persisted = json.loads(cache_path.read_text())
+    persisted[FakeTenant.base_url]["created"] = time.time() - 3600
+    cache_path.write_text(json.dumps(persisted))
+    MonitoredServiceIndex(cache_path=cache_path, ttl=60).ms_id(tenant, "auth0")
+    assert len(tenant.sweeps) == 1
+
+
+def test_zero_ttl_does_not_persist(tmp_path):
+    cache_path = tmp_path / "index.json"
+    MonitoredServiceIndex(cache_path=cache_path, ttl=0).ms_id(FakeTenant(), "auth0")
+    assert not cache_path.exists()
@@ -0,0 +1,84 @@
+import json
+from types import SimpleNamespace
+
+from src.api.v1.core.policy import Policy
+from src.api.v1.omniapiclient import OmniAPIClient
+from src.tools.page_size import PageSizeTuner, get_limit, set_limit
+
+LABEL = "api/v1/core/policy/"
+
+
+def test_limit_is_rewritten_in_paths_and_next_links():
+    assert get_limit("api/v1/core/policy/?limit=100&offset=0") == 100
+    assert get_limit("api/v1/core/policy/") is None
+    assert set_limit("https://t.invalid/api/v1/x/?offset=200&limit=100", 400) == (
+        "https://t.invalid/api/v1/x/?offset=200&limit=400"
+    )
+    assert set_limit("api/v1/x/?cursor=abc", 400) == "api/v1/x/?cursor=abc"
+
+
+def test_tuner_grows_shrinks_and_respects_bounds():
+    tuner = PageSizeTuner(path=None, min_size=25, max_size=400)
+    assert tuner.limit_for(LABEL, 100) == 100
+    assert tuner.observe(LABEL, 100, 100, 0.2, 10_000, has_next=True) == 200
+    assert tuner.observe(LABEL, 200, 200, 0.2, 10_000, has_next=True) == 400
+    assert tuner.observe(LABEL, 400, 400, 0.2, 10_000, has_next=True) == 400
+    assert tuner.observe(LABEL, 400, 400, 9.0, 10_000, has_next=True) == 200
+    assert tuner.limit_for(LABEL, 100) == 200
+    # The last page doesn't say anything about larger pages
+    assert tuner.observe(LABEL, 200, 3, 0.1, 100, has_next=False) == 200
+
+
+def test_server_cap_is_remembered():
+    tuner = PageSizeTuner(path=None)
+    assert tuner.observe(LABEL, 500, 250, 0.2, 10_000, has_next=True) == 250
+    assert tuner.observe(LABEL, 250, 250, 0.2, 10_000, has_next=True) == 250
+
+
+def test_sizes_persist_between_runs(tmp_path):
+    path = tmp_path / "page_sizes.json"
+    tuner = PageSizeTuner(path=path)
+    tuner.observe(LABEL, 100, 100, 0.1, 1000, has_next=True)
+    tuner.save()
+    assert json.loads(path.read_text()) == {LABEL: 200}
+    assert PageSizeTuner(path=path).limit_for(LABEL, 100) == 200
+
+
+def test_client_crawls_with_growing_pages():
+    client = OmniAPIClient("https://fake.invalid/")
+    client.page_size_tuner = PageSizeTuner(path=None)
+    requested = []
+
+    def page(url):
+        requested.append(url)
+        offset = int(dict(part.split("=") for part in url.split("?")[1].split("&")).get("offset", 0))
+        limit = get_limit(url)
+        total = 1500
+        results = list(range(offset, min(offset + limit, total)))
+        next_url = f"https://fake.invalid/{LABEL}?limit={limit}&offset={offset + limit}" if offset + limit < total else None
+        body = {"results": results, "next": next_url}
+        return SimpleNamespace(json=lambda: body, content=json.dumps(body).encode())
+
+    client.session.request = lambda method, url, **kwargs: page(url)
+
+    assert client.get_all_results(Policy.search()) == list(range(1500))
+    assert [get_limit(url) for url in requested] == [100, 200, 400, 800]
+    # A page_limit caller gets the page size it asked for
+    assert len(client.get_all_results(Policy.search(), page_limit=1)) == 100
+
+
+def test_only_endpoint_template_sizes_persist(tmp_path):
+    path = tmp_path / "page_sizes.json"
+    client = OmniAPIClient("https://fake.invalid/")
+    client.page_size_tuner = PageSizeTuner(path=path)
+
+    def page(url):
+        results = [0] * get_limit(url)
+        body = {"results": results, "next": None if "offset=1" in url else f"{url}&offset=1"}
+        return SimpleNamespace(json=lambda: body, content=json.dumps(body).encode())
+
+    client.session.request = lambda method, url, **kwargs: page(url)
+
+    client.get_all_results(Policy.search())
+    client.get_all_results(f"{LABEL}1234/assessments/?limit=100")
+    assert json.loads(path.read_text()) == {LABEL: 200}
@@ -0,0 +1,58 @@
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.tools.parallel_runner import json_report_requested, lane_failures, plan_lanes
+from src.tools.pytest_process import PytestRun
+
+REPORT = ElementTree.fromstring('<testsuite name="pytest" errors="1" failures="2" tests="4"/>')
+PASSED_REPORT = ElementTree.fromstring('<testsuite name="pytest" errors="0" failures="0" tests="4"/>')
+
+
+def test_groups_stay_together_and_tenants_are_capped():
+    groups = {
+        ("tenant", "asana"): ["a1", "a2"],
+        ("tenant", "auth0"): ["b1"],
+        ("tenant", "confluence"): ["c1"],
+        ("slack_tenant", ""): ["s1", "s2"],
+    }
+    estimates = {"a1": 5.0, "a2": 5.0, "b1": 6.0, "c1": 3.0, "s1": 1.0, "s2": 1.0}
+    lanes = plan_lanes(groups, 2, estimates, 1.0)
+
+    lanes_by_tenant = {}
+    for lane in lanes:
+        lanes_by_tenant.setdefault(lane.tenant, []).append(lane)
+    assert len(lanes_by_tenant["tenant"]) == 2
+    assert len(lanes_by_tenant["slack_tenant"]) == 1
+
+    # every group runs in exactly one lane
+    for nodeids in groups.values():
+        assert sum(set(nodeids) <= set(lane.nodeids) for lane in lanes) == 1
+
+    # longest lane first
+    assert [lane.estimate for lane in lanes] == [10.0, 9.0, 2.0]
+
+
+def test_lane_failures_do_not_trust_a_missing_report_or_a_broken_run():
+    def failures(returncode, report):
+        return lane_failures(PytestRun(returncode, Path("worker-0.log"), report))
+
+    assert failures(0, PASSED_REPORT) == 0
+    assert failures(1, REPORT) == 3
+    assert failures(5, PASSED_REPORT) == 0
+    # no report: the worker crashed before writing one
+    assert failures(0, None) == 1
+    # interrupted, internal error and usage error runs fail even when the report they left counts no failures
+    assert [failures(returncode, PASSED_REPORT) for returncode in (2, 3, 4, -9)] == [1, 1, 1, 1]
+    assert failures(2, REPORT) == 3
+
+
+def test_workers_write_json_reports_only_when_the_run_asked_for_one():
+    def config(**options):
+        return SimpleNamespace(getoption=lambda name, default=None: options.get(name, default))
+
+    # pytest-json-report sets a default report file whether or not --json-report was passed
+    assert json_report_requested(config(json_report=True, json_report_file=".report.json"))
+    assert not json_report_requested(config(json_report=False, json_report_file=".report.json"))
+    # plugin not installed
+    assert not json_report_requested(config())
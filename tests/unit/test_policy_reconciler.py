@@ -0,0 +1,90 @@
+import threading
+from types import SimpleNamespace
+
+from tests.app_factory.policies.policy_helpers import create_policy_payload
+from tests.app_factory.policies.policy_reconciler import (
+    CREATE,
+    UPDATE,
+    DesiredPolicy,
+    PolicyReconciler,
+)
+
+
+class FakeTenant:
+    base_url = "https://fake.invalid/"
+
+    def __init__(self, policies: list):
+        self.policies = {policy["name"]: dict(policy) for policy in policies}
+        self.reads = 0
+        self.writes = []
+        self.lock = threading.Lock()
+
+    def get_all_results(self, path: str, page_limit: int = -1, **kwargs):
+        self.reads += 1
+        return [dict(policy) for policy in self.policies.values()]
+
+    def post(self, path: str, data=None, json=None, **kwargs):
+        with self.lock:
+            self.writes.append(("post", json["name"]))
+            policy = {**json, "id": 100 + len(self.policies)}
+            self.policies[json["name"]] = policy
+        return SimpleNamespace(status_code=201, text="", json=lambda: policy)
+
+    def patch(self, path, data=None, json=None, **kwargs):
+        policy_id = int(path.rstrip("/").split("/")[-1])
+        with self.lock:
+            self.writes.append(("patch", policy_id, tuple(sorted(json))))
+            policy = next(p for p in self.policies.values() if p["id"] == policy_id)
+            policy.update(json)
+        return SimpleNamespace(status_code=200, text="", json=lambda: policy)
+
+
+def desired(ms_id=None):
+    return [
+        DesiredPolicy.from_payload(
+            create_policy_payload(f"omni-test-asana_{polarity}", "asana"),
+            monitored_services=(ms_id,) if ms_id else None,
+        )
+        for polarity in ("IS", "NOT")
+    ]
+
+
+def test_plan_creates_missing_and_patches_only_drift():
+    tenant = FakeTenant(
+        [
+            {
+                "id": 1,
+                "name": "omni-test-asana_IS",
+                "mode": "blacklist",
+                "role": "monitored_service_config",
+                "monitored_services": [{"id": 9}],
+            }
+        ]
+    )
+    reconciler = PolicyReconciler(tenant)
+
+    plan = reconciler.plan(desired(ms_id=9))
+    assert [(change.action, change.name) for change in plan.changes] == [(CREATE, "omni-test-asana_NOT")]
+    assert plan.unchanged == {"omni-test-asana_IS": 1}
+    assert plan.changes[0].payload["monitored_services"] == [9]
+
+    result = reconciler.apply(plan)
+    assert not result.failed
+    assert set(result.policy_ids) == {"omni-test-asana_IS", "omni-test-asana_NOT"}
+
+    plan = reconciler.plan(desired(ms_id=10))
+    assert [change.action for change in plan.changes] == [UPDATE, UPDATE]
+    assert all(change.payload == {"monitored_services": [10]} for change in plan.changes)
+
+
+def test_converged_tenant_costs_one_read():
+    tenant = FakeTenant([])
+    reconciler = PolicyReconciler(tenant)
+    reconciler.reconcile(desired(ms_id=3))
+    writes = len(tenant.writes)
+
+    plan = reconciler.plan(desired(ms_id=3))
+    assert plan.is_converged
+    assert reconciler.apply(plan).policy_ids.keys() == {"omni-test-asana_IS", "omni-test-asana_NOT"}
+    assert len(tenant.writes) == writes
+    assert tenant.reads == 2
@@ -0,0 +1,116 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from tests.app_factory.policies.policy_setup_registry import PolicySetupRegistry
+
+PAYLOADS = [{"name": "omni-test-policy_IS"}]
+
+
+class FakeTenant:
+    base_url = "https://fake.invalid/"
+
+    def __init__(self, existing: dict):
+        self.existing = existing
+
+    def get(self, path: str, **kwargs):
+        policy_id = int(path.rstrip("/").split("/")[-1])
+        if policy_id not in self.existing:
+            return SimpleNamespace(status_code=404, json=lambda: {})
+        return SimpleNamespace(
+            status_code=200, json=lambda: {"name": self.existing[policy_id]}
+        )
+
+
+def test_setup_runs_once_per_key():
+    registry = PolicySetupRegistry()
+    tenant = FakeTenant({})
+    calls = []
+
+    def setup():
+        calls.append(1)
+        return {"polarity_is_policy_id": 11}
+
+    for _ in range(3):
+        assert registry.get_or_create_policy_ids(tenant, "asana", PAYLOADS, setup) == {
+            "polarity_is_policy_id": 11
+        }
+    registry.get_or_create_policy_ids(tenant, "auth0", PAYLOADS, setup)
+    assert len(calls) == 2
+
+
+def test_failed_setup_is_not_cached():
+    registry = PolicySetupRegistry()
+    results = iter([{"polarity_is_policy_id": None}, {"polarity_is_policy_id": 7}])
+    tenant = FakeTenant({})
+
+    def setup():
+        return next(results)
+
+    registry.get_or_create_policy_ids(tenant, "asana", PAYLOADS, setup)
+    assert registry.get_or_create_policy_ids(tenant, "asana", PAYLOADS, setup) == {
+        "polarity_is_policy_id": 7
+    }
+
+
+def test_persisted_ids_are_validated_before_reuse(tmp_path):
+    cache_path = tmp_path / "cache.json"
+    first_run = PolicySetupRegistry(cache_path=cache_path)
+    first_run.get_or_create_policy_ids(
+        FakeTenant({}), "asana", PAYLOADS, lambda: {"polarity_is_policy_id": 5}
+    )
+
+    def fail():
+        raise AssertionError("setup should be reused from the previous run")
+
+    valid = FakeTenant({5: "omni-test-policy_IS"})
+    assert PolicySetupRegistry(cache_path=cache_path).get_or_create_policy_ids(
+        valid, "asana", PAYLOADS, fail
+    ) == {"polarity_is_policy_id": 5}
+
+    deleted = FakeTenant({})
+    assert PolicySetupRegistry(cache_path=cache_path).get_or_create_policy_ids(
+        deleted, "asana", PAYLOADS, lambda: {"polarity_is_policy_id": 9}
+    ) == {"polarity_is_policy_id": 9}
+
+
+def test_run_once():
+    registry = PolicySetupRegistry()
+    calls = []
+
+    def attach() -> bool:
+        calls.append(1)
+        return True
+
+    for _ in range(2):
+        assert registry.run_once(("attach", 1, (2, 3)), attach)
+    assert calls == [1]
+
+
+def test_run_once_retries_a_failed_step():
+    registry = PolicySetupRegistry()
+    outcomes = iter([False, True])
+    calls = []
+
+    def attach() -> bool:
+        calls.append(1)
+        return next(outcomes)
+
+    assert not registry.run_once(("attach", 1, (2, 3)), attach)
+    assert registry.run_once(("attach", 1, (2, 3)), attach)
+    assert registry.run_once(("attach", 1, (2, 3)), attach)
+    assert calls == [1, 1]
+
+
+def test_steps_of_different_keys_run_concurrently():
+    registry = PolicySetupRegistry()
+    both_started = threading.Barrier(2, timeout=5)
+
+    def attach() -> bool:
+        # Only passes when the other key's step runs at the same time
+        both_started.wait()
+        return True
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda key: registry.run_once(key, attach), [("attach", 1), ("attach", 2)]))
+    assert results == [True, True]
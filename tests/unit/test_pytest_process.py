@@ -0,0 +1,35 @@
+import textwrap
+
+from src.tools.pytest_process import run_pytest
+
+
+def test_runs_write_their_own_files_and_drop_a_stale_report(tmp_path):
+    test_file = tmp_path / "test_sample.py"
+    test_file.write_text(
+        textwrap.dedent(
+            """
+            import logging
+
+
+            def test_logs():
+                logging.getLogger("sample").warning("from the child run")
+            """
+        )
+    )
+    files = tmp_path / "run-0"
+    (tmp_path / "run-0.xml").write_text("<testsuite failures='3'/>")
+
+    run = run_pytest([str(test_file), "-p", "no:cacheprovider"], files)
+
+    assert run.completed, run.problem
+    assert run.report.find(".//testcase").get("name") == "test_logs"
+    assert run.output_file == tmp_path / "run-0.log"
+    assert "from the child run" in (tmp_path / "run-0.requests.log").read_text()
+
+
+def test_a_run_that_did_not_finish_is_not_trusted(tmp_path):
+    run = run_pytest(["--no-such-option"], tmp_path / "run-1")
+
+    assert not run.completed
+    assert run.report is None
+    assert "without a report" in run.problem
@@ -0,0 +1,106 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.api.v1.omniapiclient import OmniAPIClient, read_ahead
+
+TIMEOUT = 5
+
+
+def producer_thread() -> threading.Thread:
+    return next(thread for thread in threading.enumerate() if thread.name == "omni-read-ahead")
+
+
+def test_next_page_is_fetched_while_the_current_one_is_processed():
+    fetched = [threading.Event() for _ in range(3)]
+
+    def pages():
+        for number, event in enumerate(fetched):
+            event.set()
+            yield [number]
+
+    results = []
+    for page in read_ahead(pages(), depth=1):
+        # Fetched sequentially, the next page would only be fetched after this one is processed
+        number = page[0]
+        if number + 1 < len(fetched):
+            assert fetched[number + 1].wait(TIMEOUT)
+        results.append(page)
+    assert results == [[0], [1], [2]]
+
+
+def test_early_stop_cancels_the_producer():
+    fetched = []
+    waiting = threading.Event()
+    closed = threading.Event()
+
+    def pages():
+        try:
+            for number in range(100):
+                fetched.append(number)
+                if number == 2:
+                    # Page 1 fills the queue, the producer now waits to hand over page 2
+                    waiting.set()
+                yield [number]
+        finally:
+            closed.set()
+
+    iterator = read_ahead(pages(), depth=1)
+    assert next(iterator) == [0]
+    assert waiting.wait(TIMEOUT)
+    producer = producer_thread()
+    iterator.close()
+
+    producer.join(TIMEOUT)
+    assert not producer.is_alive()
+    assert closed.is_set()
+    assert fetched == [0, 1, 2]
+
+
+def test_close_does_not_wait_for_a_fetch_in_progress():
+    in_fetch = threading.Event()
+    release = threading.Event()
+    closed = threading.Event()
+
+    def pages():
+        try:
+            yield [0]
+            in_fetch.set()
+            release.wait(TIMEOUT)
+            yield [1]
+        finally:
+            closed.set()
+
+    iterator = read_ahead(pages(), depth=1)
+    assert next(iterator) == [0]
+    assert in_fetch.wait(TIMEOUT)
+    producer = producer_thread()
+    iterator.close()
+
+    assert producer.is_alive() and not closed.is_set()
+    release.set()
+    producer.join(TIMEOUT)
+    assert not producer.is_alive()
+    assert closed.is_set()
+
+
+def test_producer_errors_reach_the_consumer():
+    def pages():
+        yield [1]
+        raise ValueError("broken page")
+
+    iterator = read_ahead(pages(), depth=1)
+    assert next(iterator) == [1]
+    with pytest.raises(ValueError, match="broken page"):
+        next(iterator)
+
+
+def test_client_prefetches_next_links():
+    client = OmniAPIClient("https://fake.invalid/")
+    pages = {
+        "https://fake.invalid/api/v1/x/": {"results": [1], "next": "https://fake.invalid/?offset=1"},
+        "https://fake.invalid/?offset=1": {"results": [2], "next": None},
+    }
+    client.session.request = lambda method, url, **kwargs: SimpleNamespace(json=lambda: pages[url])
+    assert list(client.iter_pages("api/v1/x/", prefetch=2)) == [[1], [2]]
@@ -0,0 +1,36 @@
+import pytest
+
+from src.api.v1.core.policy import PolicyRecord
+from src.api.v1.core.policyassessment import PolicyAssessmentRecord
+
+POLICY = {
+    "id": 11,
+    "name": "omni-test-asana_IS",
+    "policy_type": "asana",
+    "mode": "blacklist",
+    "is_runnable": False,
+    "not_runnable_reason": "No monitored services",
+    "monitored_services": [{"id": 9}],
+    "description": "",
+}
+
+
+def test_record_keeps_untouched_fields_raw():
+    policy = PolicyRecord.from_dict(POLICY)
+    assert policy.id == 11
+    assert policy.is_runnable is False
+    assert policy["name"] == "omni-test-asana_IS"
+    assert policy["monitored_services"] == [{"id": 9}]
+    assert policy.get("missing", "default") == "default"
+    with pytest.raises(KeyError):
+        policy["missing"]
+    assert policy.to_dict() == POLICY
+    assert not hasattr(policy, "__dict__")
+
+
+def test_missing_fields_are_none():
+    assessment = PolicyAssessmentRecord.from_dict({"id": 3})
+    assert assessment.id == 3
+    assert assessment.status is None
+    assert assessment.to_dict() == {"id": 3, "policy": None, "status": None, "external_id": None}
+    assert PolicyAssessmentRecord.from_results([{"id": 3}]) == [assessment]
@@ -0,0 +1,76 @@
+from src.tools.results_store import ResultsStore, percentile
+
+
+def make_run(created: float, durations: dict) -> dict:
+    return {
+        "created": created,
+        "duration": sum(durations.values()),
+        "summary": {"total": len(durations), "passed": len(durations)},
+        "tests": [
+            {
+                "nodeid": nodeid,
+                "outcome": "failed" if duration > 50 else "passed",
+                "setup": {"duration": 1.0},
+                "call": {"duration": duration - 1.0},
+            }
+            for nodeid, duration in durations.items()
+        ],
+    }
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 95) == 95
+    assert percentile(values, 100) == 100
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 95) == 0.0
+
+
+def test_runs_are_stored_once(tmp_path):
+    with ResultsStore(tmp_path / "history.sqlite") as store:
+        run = make_run(1.0, {"tests/a.py::test_a": 2.0})
+        assert store.add_run(run, "INT-SMOKE", "job")
+        assert not store.add_run(run, "INT-SMOKE", "job")
+        assert store.add_run(run, "PROD-CORE", "job")
+
+
+def test_duration_stats_over_last_runs(tmp_path):
+    asana = "tests/policies/test_asana.py::test_trigger_policy_scan_for_asana"
+    auth0 = "tests/policies/test_auth0.py::test_trigger_policy_scan_for_auth0"
+    other = "tests/test_other.py::test_other"
+    with ResultsStore(tmp_path / "history.sqlite") as store:
+        # the oldest run is outside the window
+        store.add_run(make_run(0.0, {asana: 1000.0, auth0: 1000.0}), "INT-SMOKE", "job")
+        for run in range(1, 21):
+            store.add_run(
+                make_run(float(run), {asana: float(run), auth0: 60.0, other: 1.0}),
+                "INT-SMOKE",
+                "job",
+            )
+        store.add_run(make_run(30.0, {asana: 500.0}), "PROD-CORE", "job")
+
+        stats = store.duration_stats(
+            "test_trigger_policy_scan_for_*", last_runs=20, environment="INT-SMOKE"
+        )
+
+    assert [stat.nodeid for stat in stats] == [auth0, asana]
+    auth0_stats, asana_stats = stats
+    assert auth0_stats.runs == 20 and auth0_stats.pass_rate == 0
+    assert asana_stats.percentile == 19.0
+    assert asana_stats.maximum == 20.0
+    assert asana_stats.mean == 10.5
+
+
+def test_runs_stream_into_the_store(tmp_path):
+    run = make_run(1.0, {"tests/a.py::test_a": 2.0, "tests/a.py::test_b": 3.0})
+    streamed = {"created": run["created"]}
+
+    def stream_tests():
+        yield from run["tests"]
+        # keys after `tests` in the report are only known once all tests are out
+        streamed.update(summary=run["summary"], duration=run["duration"])
+
+    with ResultsStore(tmp_path / "history.sqlite") as store:
+        assert store.add_run(streamed, "INT-SMOKE", "job", tests=stream_tests())
+        assert store.connection.execute("SELECT total, duration FROM runs").fetchone() == (2, 5.0)
+        assert [stat.runs for stat in store.duration_stats("test_*")] == [1, 1]
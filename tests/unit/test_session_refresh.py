@@ -0,0 +1,86 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from src.api.v1.omniapiclient import OmniAPIClient
+
+
+class FakeServer:
+    """
+    Accepts the session of the latest login only; `expire()` invalidates it like the tenant does after a while
+    """
+
+    def __init__(self):
+        self.session_id = 0
+        self.logins = 0
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def expire(self):
+        self.session_id += 1000
+
+    def request(self, method, url, **kwargs):
+        if url.endswith("user/login/"):
+            with self.lock:
+                self.logins += 1
+                self.session_id += 1
+                session_id = self.session_id
+            time.sleep(0.01)
+            body = {"csrf": "token", "session": {"id": str(session_id)}}
+            return SimpleNamespace(status_code=200, text="", json=lambda: body)
+        self.calls.append(method)
+        if kwargs["headers"].get("Authorization") != f"session {self.session_id}":
+            return SimpleNamespace(
+                status_code=403, text='{"detail":"Authentication credentials were not provided."}', json=dict
+            )
+        return SimpleNamespace(status_code=200, text="ok", json=dict)
+
+
+def logged_in_client() -> tuple:
+    client = OmniAPIClient("https://fake.invalid/")
+    server = FakeServer()
+    client.session.request = server.request
+    client.user_login("omni-test", "secret")
+    return client, server
+
+
+def test_expired_session_is_renewed_and_get_replayed():
+    client, server = logged_in_client()
+    assert client.get("api/v1/x/").status_code == 200
+    server.expire()
+    assert client.get("api/v1/x/").status_code == 200
+    assert server.logins == 2
+    assert len(server.calls) == 3
+
+
+def test_post_is_not_replayed_but_later_calls_work():
+    client, server = logged_in_client()
+    server.expire()
+    assert client.post("api/v1/x/", json={}).status_code == 403
+    assert server.logins == 2
+    assert client.post("api/v1/x/", json={}).status_code == 200
+
+
+def test_concurrent_expiries_log_in_once():
+    client, server = logged_in_client()
+    server.expire()
+    statuses = []
+    threads = [
+        threading.Thread(target=lambda: statuses.append(client.get("api/v1/x/").status_code))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * 8
+    assert server.logins == 2
+
+
+def test_permission_errors_are_not_treated_as_expiry():
+    client, server = logged_in_client()
+    client.session.request = lambda method, url, **kwargs: SimpleNamespace(
+        status_code=403, text='{"detail":"You do not have permission"}', json=dict
+    )
+    assert client.get("api/v1/x/").status_code == 403
+    assert server.logins == 1
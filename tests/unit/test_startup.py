@@ -0,0 +1,8 @@
+from benchmarks.bench_startup import LAZY_MODULES, import_times
+
+
+def test_conftest_does_not_import_heavy_modules():
+    # A fresh interpreter, this session has already imported everything
+    imported = import_times()
+    assert "conftest" in imported
+    assert not imported.keys() & set(LAZY_MODULES)
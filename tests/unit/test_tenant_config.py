@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from src.tenants.config import TenantConfig, get_setting, get_tenant_config, parse_bool
+
+ENV_FILE = """AO_BASE_URL=https://smoketest.int.appomni.com/
+AO_USERNAME=omni-test-pipeline
+AO_PASSWORD=secret
+PREFERRED_MONITORED_SERVICES={"asana": 79292}
+VERIFY_SSL=false
+INT_CORE_PW=core-secret
+"""
+
+
+@pytest.fixture()
+def config_dir(tmp_path, monkeypatch):
+    for line in ENV_FILE.splitlines():
+        monkeypatch.delenv(line.split("=")[0], raising=False)
+    (tmp_path / ".env.UNIT-TEST").write_text(ENV_FILE)
+    return tmp_path
+
+
+def test_config_is_parsed_once_and_shared(config_dir):
+    config = get_tenant_config("UNIT-TEST", config_dir)
+    assert config is get_tenant_config("UNIT-TEST", config_dir)
+    assert config.base_url == "https://smoketest.int.appomni.com/"
+    assert config.verify_ssl is False
+    assert config.preferred_monitored_services == {"asana": 79292}
+    assert "AO_BASE_URL" not in os.environ
+    assert get_setting("INT_CORE_PW", "UNIT-TEST", config_dir) == "core-secret"
+
+
+def test_config_is_immutable(config_dir):
+    config = get_tenant_config("UNIT-TEST", config_dir)
+    with pytest.raises(AttributeError):
+        config.base_url = "https://coretest.int.appomni.com/"
+    with pytest.raises(TypeError):
+        config.preferred_monitored_services["asana"] = 1
+
+    coretest = config.replace(base_url="https://coretest.int.appomni.com/")
+    assert coretest.base_url == "https://coretest.int.appomni.com/"
+    assert coretest.username == config.username
+    assert config.base_url == "https://smoketest.int.appomni.com/"
+
+
+def test_process_environment_wins_over_env_file(config_dir, monkeypatch):
+    monkeypatch.setenv("AO_USERNAME", "someone-else")
+    assert TenantConfig("UNIT-TEST", config_dir).username == "someone-else"
+
+
+def test_invalid_values_are_rejected(config_dir):
+    (config_dir / ".env.BROKEN").write_text(ENV_FILE.replace("false", "__import__('os')"))
+    with pytest.raises(ValueError):
+        TenantConfig("BROKEN", config_dir)
+    with pytest.raises(FileNotFoundError):
+        TenantConfig("MISSING", config_dir)
+    assert parse_bool(" True ", "VERIFY_SSL") is True
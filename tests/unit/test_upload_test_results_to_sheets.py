@@ -0,0 +1,337 @@
+import io
+import json
+import shutil
+import tracemalloc
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+gspread = pytest.importorskip("gspread")
+
+import definitions  # noqa: E402
+from scripts import upload_test_results_to_sheets  # noqa: E402
+from scripts.upload_test_results_to_sheets import (  # noqa: E402
+    HEADERS,
+    BatchedSheetWriter,
+    collect_reports,
+    collect_rows,
+    expand_json_files,
+)
+from src.tools.results_store import ResultsStore  # noqa: E402
+
+SAMPLE_REPORT = definitions.LOGS_DIR / "test_results.json"
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.text = "quota"
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": "quota", "status": ""}}
+
+
+class FakeWorksheet:
+    """Local stand-in for gspread.Worksheet that counts API requests"""
+
+    def __init__(self, values=None, failures=None):
+        self.values = list(values or [])
+        self.failures = list(failures or [])
+        self.requests = []
+
+    def _request(self, name):
+        self.requests.append(name)
+        if self.failures:
+            raise gspread.exceptions.APIError(FakeResponse(self.failures.pop(0)))
+
+    def acell(self, label):
+        self._request("acell")
+        value = self.values[0][0] if self.values else None
+        return SimpleNamespace(value=value)
+
+    def append_rows(self, rows):
+        self._request("append_rows")
+        self.values.extend(rows)
+
+    def get_all_values(self):
+        raise AssertionError("the whole sheet must not be downloaded")
+
+    def append_row(self, row):
+        raise AssertionError("rows must be sent in batches")
+
+
+def make_rows(count):
+    return [[str(i)] * len(HEADERS) for i in range(count)]
+
+
+def test_rows_are_sent_in_chunks_with_headers_on_empty_sheet():
+    worksheet = FakeWorksheet()
+    requests_sent = BatchedSheetWriter(worksheet, chunk_size=100).write(
+        make_rows(250), headers=HEADERS
+    )
+
+    assert requests_sent == 3
+    assert worksheet.requests == ["acell"] + ["append_rows"] * 3
+    assert worksheet.values[0] == HEADERS
+    assert len(worksheet.values) == 251
+
+
+def test_existing_headers_are_not_repeated():
+    worksheet = FakeWorksheet(values=[HEADERS])
+    BatchedSheetWriter(worksheet).write(make_rows(2), headers=HEADERS)
+    assert worksheet.values.count(HEADERS) == 1
+    assert len(worksheet.values) == 3
+
+
+def test_quota_errors_are_retried_with_backoff():
+    waits = []
+    worksheet = FakeWorksheet(values=[HEADERS], failures=[429, 429])
+    BatchedSheetWriter(worksheet, initial_backoff=1.0, sleep=waits.append).write(
+        make_rows(1), headers=HEADERS
+    )
+    assert waits == [1.0, 2.0]
+    assert len(worksheet.values) == 2
+
+
+def test_non_retryable_errors_are_raised():
+    worksheet = FakeWorksheet(values=[HEADERS], failures=[403])
+    with pytest.raises(gspread.exceptions.APIError):
+        BatchedSheetWriter(worksheet, sleep=lambda _: None).write(make_rows(1))
+
+
+def test_retries_are_bounded():
+    worksheet = FakeWorksheet(failures=[503] * 10)
+    with pytest.raises(gspread.exceptions.APIError):
+        BatchedSheetWriter(worksheet, max_retries=2, sleep=lambda _: None).write(
+            make_rows(1), headers=HEADERS
+        )
+    assert worksheet.requests == ["acell"] * 3
+
+
+def test_glob_and_paths_are_expanded_once_in_order(tmp_path):
+    for name in ["test_results_b.json", "test_results_a.json"]:
+        (tmp_path / name).write_text("{}")
+    explicit = str(tmp_path / "test_results_b.json")
+    assert expand_json_files([explicit, str(tmp_path / "test_results*.json")]) == [
+        explicit,
+        str(tmp_path / "test_results_a.json"),
+    ]
+
+
+def test_multiple_reports_are_merged_into_one_batch(tmp_path):
+    json_files = []
+    for shard in range(3):
+        json_file = tmp_path / f"test_results_{shard}.json"
+        shutil.copy(SAMPLE_REPORT, json_file)
+        json_files.append(str(json_file))
+
+    uploader = upload_test_results_to_sheets.TestResultsUploader
+    single = uploader.format_results_for_sheets(
+        uploader.parse_test_results(str(SAMPLE_REPORT)), "int", "job"
+    )
+    merged = collect_rows(json_files, "int", "job", max_workers=2)
+    assert merged == single * 3
+
+
+def make_report(
+    test_count: int, log_records: int, outcomes=("passed", "failed", "skipped", "error")
+) -> dict:
+    log = [
+        {"name": "root", "msg": f"record {i} " + "x" * 200, "levelname": "INFO"}
+        for i in range(log_records)
+    ]
+    tests = []
+    for i in range(test_count):
+        outcome = outcomes[i % len(outcomes)]
+        call = {"duration": 1.5, "outcome": outcome, "log": log}
+        if outcome == "failed":
+            call["longrepr"] = "context line\n" * 200 + f"E   AssertionError: {i}\nmore"
+            call["traceback"] = [
+                {"path": "tests/x.py", "lineno": n, "message": "m" * 50}
+                for n in range(100)
+            ]
+            if i % 8 == 1:
+                call["crash"] = {"path": "tests/x.py", "lineno": 3, "message": "boom"}
+        if outcome == "skipped":
+            call["longrepr"] = "Skipped: not today"
+        tests.append(
+            {
+                "nodeid": f"tests/test_x.py::test_{i}",
+                "outcome": outcome,
+                "setup": {"duration": 0.25, "outcome": "passed"},
+                "call": call,
+                "teardown": {"duration": 0.125, "outcome": "passed"},
+            }
+        )
+    return {
+        "created": 1753192313.70928,
+        "duration": 12.5,
+        "exitcode": 1,
+        "collectors": [{"nodeid": f"c{i}", "result": []} for i in range(50)],
+        "summary": {"passed": 1, "failed": 1, "total": test_count},
+        "tests": tests,
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_streaming_parser_decodes_every_value(chunk_size):
+    report = make_report(test_count=8, log_records=3)
+    report["environment"] = {"Python": "3.11", "empty": {}, "list": []}
+    text = json.dumps(report, indent=2)
+
+    parser = upload_test_results_to_sheets.StreamingReportParser(
+        io.StringIO(text), chunk_size=chunk_size
+    )
+    decoded = {
+        key: list(value) if key in ("tests", "collectors") else value
+        for key, value in parser.items()
+    }
+    assert decoded == report
+
+
+def test_streaming_parse_formats_the_same_rows(tmp_path):
+    report = make_report(test_count=16, log_records=20)
+    json_file = tmp_path / "report.json"
+    json_file.write_text(json.dumps(report, indent=2))
+
+    uploader = upload_test_results_to_sheets.TestResultsUploader
+    parsed = uploader.parse_test_results(str(json_file))
+
+    assert all(test["outcome"] != "passed" for test in parsed["tests"])
+    assert uploader.format_results_for_sheets(
+        parsed, "int", "job"
+    ) == uploader.format_results_for_sheets(report, "int", "job")
+
+
+def test_upload_memory_is_bounded_with_many_passing_tests(tmp_path):
+    json_file = tmp_path / "report.json"
+    outcomes = ["passed"] * 999 + ["failed"]
+    json_file.write_text(json.dumps(make_report(test_count=20000, log_records=0, outcomes=outcomes)))
+    file_size = json_file.stat().st_size
+    history_db = str(tmp_path / "history.sqlite")
+
+    tracemalloc.start()
+    [(rows, stored)] = collect_reports([str(json_file)], "int", "job", history_db=history_db)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # the passing tests went to the results store without being kept
+    assert peak < file_size / 4
+    assert stored
+    assert len(rows) == 1 + 20
+    with ResultsStore(history_db) as store:
+        assert store.connection.execute("SELECT count(*) FROM results").fetchone() == (20000,)
+        assert store.connection.execute("SELECT total, duration FROM runs").fetchone() == (20000, 12.5)
+
+
+class FakeSpreadsheet:
+    id = "fake-spreadsheet"
+
+    def __init__(self):
+        self.worksheets = {}
+        self.requests = []
+
+    def worksheet(self, title):
+        self.requests.append("worksheet")
+        if title not in self.worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self.worksheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        self.requests.append("add_worksheet")
+        self.worksheets[title] = FakeWorksheet()
+        self.worksheets[title].hide = lambda: self.requests.append("hide")
+        return self.worksheets[title]
+
+
+def make_uploader(spreadsheet):
+    uploader = upload_test_results_to_sheets.TestResultsUploader.__new__(
+        upload_test_results_to_sheets.TestResultsUploader
+    )
+    uploader.spreadsheet_id = spreadsheet.id
+    uploader.spreadsheet = None
+
+    def open_by_key(key):
+        # Opening a spreadsheet fetches its metadata, one request
+        spreadsheet.requests.append("open_by_key")
+        return spreadsheet
+
+    def values_get(spreadsheet_id, range_name):
+        assert spreadsheet_id == spreadsheet.id
+        spreadsheet.requests.append("values_get")
+        title = range_name.split("!")[0].strip("'")
+        if title not in spreadsheet.worksheets:
+            raise gspread.exceptions.APIError(FakeResponse(400))
+        return {"values": spreadsheet.worksheets[title].values}
+
+    uploader.client = SimpleNamespace(
+        open_by_key=open_by_key, http_client=SimpleNamespace(values_get=values_get)
+    )
+    return uploader
+
+
+def all_requests(spreadsheet):
+    return spreadsheet.requests + [
+        request
+        for worksheet in spreadsheet.worksheets.values()
+        for request in worksheet.requests
+    ]
+
+
+def test_reupload_costs_one_small_read_and_no_writes(tmp_path):
+    uploader_module = upload_test_results_to_sheets
+    rows = uploader_module.collect_rows([str(SAMPLE_REPORT)], "int", "job")
+    spreadsheet = FakeSpreadsheet()
+    index_file = str(tmp_path / "index.json")
+
+    make_uploader(spreadsheet).upload_to_sheets(rows, "Results", index_file=index_file)
+    results = spreadsheet.worksheets["Results"]
+    assert results.values == [uploader_module.HEADERS] + rows
+
+    # one row for the whole run
+    index = spreadsheet.worksheets[uploader_module.INDEX_WORKSHEET_NAME]
+    assert index.values == [[uploader_module.run_key(rows[0]), str(len(rows))]]
+    assert "hide" in spreadsheet.requests
+
+    # a fresh machine: no local index, the hidden worksheet alone prevents duplicates
+    before = Counter(all_requests(spreadsheet))
+    make_uploader(spreadsheet).upload_to_sheets(rows, "Results", index_file=None)
+    assert Counter(all_requests(spreadsheet)) - before == Counter(["values_get"])
+    assert len(results.values) == len(rows) + 1
+
+    # the local mirror has the run, no request at all
+    before = Counter(all_requests(spreadsheet))
+    make_uploader(spreadsheet).upload_to_sheets(rows, "Results", index_file=index_file)
+    assert Counter(all_requests(spreadsheet)) == before
+
+
+def test_rows_with_the_same_test_name_in_one_run_are_all_uploaded(tmp_path):
+    rows = [
+        ["2026-01-01 00:00:00 UTC", "int", "job", "tests/a.py::test_x", "1", "FAILED"],
+        ["2026-01-01 00:00:00 UTC", "int", "job", "tests/a.py::test_x", "1", "PASSED"],
+        ["2026-01-01 00:00:00 UTC", "int", "job", "tests/a.py::test_y", "1", "FAILED"],
+    ]
+    spreadsheet = FakeSpreadsheet()
+    index_file = str(tmp_path / "index.json")
+    make_uploader(spreadsheet).upload_to_sheets(rows, "Results", index_file=index_file)
+    make_uploader(spreadsheet).upload_to_sheets(rows, "Results", index_file=index_file)
+    assert spreadsheet.worksheets["Results"].values == [upload_test_results_to_sheets.HEADERS] + rows
+
+
+def test_only_new_rows_are_uploaded(tmp_path):
+    uploader_module = upload_test_results_to_sheets
+    rows = uploader_module.collect_rows([str(SAMPLE_REPORT)], "int", "job")
+    other_run = [[row[0], row[1], "other-job", *row[3:]] for row in rows]
+    spreadsheet = FakeSpreadsheet()
+    index_file = str(tmp_path / "index.json")
+
+    make_uploader(spreadsheet).upload_to_sheets(rows[:1], "Results", index_file=index_file)
+    make_uploader(spreadsheet).upload_to_sheets(rows + other_run, "Results", index_file=index_file)
+    assert spreadsheet.worksheets["Results"].values == [uploader_module.HEADERS] + rows + other_run
+
+    with open(index_file) as f:
+        assert json.load(f)[spreadsheet.id] == {
+            uploader_module.run_key(rows[0]): len(rows),
+            uploader_module.run_key(other_run[0]): len(other_run),
+        }